@@ -23,6 +23,8 @@ export default function MeetingPage() {
   const webrtcClientRef = useRef<WebRTCClient | null>(null);
   const signalingClientRef = useRef<EnhancedSignalingClient | null>(null);
   const remoteAudioRef = useRef<HTMLAudioElement | null>(null);
+  // AI speech arrives as several MP3 segments; each plays once the previous one has ended
+  const aiAudioChainRef = useRef<Promise<void>>(Promise.resolve());
   const [currentUserId] = useState(() => user?.id || 'user-' + Math.random().toString(36).substr(2, 9));
   const [remoteUserId, setRemoteUserId] = useState<string | null>(null);
   const [copied, setCopied] = useState(false);
@@ -244,18 +246,25 @@ export default function MeetingPage() {
         const audioBlob = new Blob([audioArray], { type: 'audio/mp3' });
         const audioUrl = URL.createObjectURL(audioBlob);
 
-        // Create and play audio element
-        const audio = new Audio(audioUrl);
-        audio.volume = 0.8;
-
-        await audio.play();
-
-        // Clean up URL after playing
-        audio.addEventListener('ended', () => {
-          URL.revokeObjectURL(audioUrl);
-        });
+        // Create and play audio element after any segment that is still playing
+        aiAudioChainRef.current = aiAudioChainRef.current.then(() => new Promise<void>((resolve) => {
+          const audio = new Audio(audioUrl);
+          audio.volume = 0.8;
+
+          // Clean up URL after playing
+          const done = () => {
+            URL.revokeObjectURL(audioUrl);
+            resolve();
+          };
+          audio.addEventListener('ended', done);
+          audio.addEventListener('error', done);
+          audio.play().catch((error) => {
+            console.error('Error playing AI voice:', error);
+            done();
+          });
+        }));
 
-        console.log('Playing AI voice message:', message.message);
+        console.log('Playing AI voice message:', message.message ?? `segment ${message.chunk_index}`);
       }
     } catch (error) {
       console.error('Error playing AI voice:', error);
@@ -340,6 +349,18 @@ export default function MeetingPage() {
           }
           break;
 
+        case 'ai_voice_chunk':
+          if (message.from_user === 'ai-assistant') {
+            await playAIVoiceMessage(message);
+          }
+          break;
+
+        case 'ai_voice_stream_end':
+          if (message.from_user === 'ai-assistant') {
+            console.log('AI audio stream complete:', message.chunk_count, 'segments');
+          }
+          break;
+
         case 'ai_speaking_finished':
           if (message.from_user === 'ai-assistant') {
             console.log('AI finished speaking');
@@ -1,4 +1,6 @@
 import os
+import importlib.util
+import httpx
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
@@ -28,4 +30,28 @@ class Settings:
 settings = Settings()
 
 # Initialize Supabase client
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
\ No newline at end of file
+# PostgREST calls go through httpx, which already sends "Accept-Encoding: gzip, deflate"
+# and transparently decodes compressed responses (brotli too, if the package is installed)
+supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+
+
+def _tune_postgrest_pool(client: Client) -> None:
+    """
+    Swap the PostgREST session for one with a larger, longer-lived keep-alive pool.
+    Queries run in worker threads (see app.utils.db), so many can be in flight at once;
+    httpx's defaults keep only 20 idle connections for 5 seconds.
+    HTTP/2 is used when the optional h2 package is installed (httpx[http2]).
+    """
+    session = client.postgrest.session
+    client.postgrest.session = type(session)(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=session.timeout,
+        follow_redirects=True,
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60.0)
+    )
+    session.close()
+
+
+_tune_postgrest_pool(supabase)
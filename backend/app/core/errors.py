@@ -0,0 +1,28 @@
+from fastapi import status
+
+
+class ServiceError(Exception):
+    """
+    Error raised by the service layer that maps directly onto an HTTP response
+    """
+
+    status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ServiceValidationError(ServiceError):
+    """The request was understood but cannot be processed as given"""
+
+    def __init__(self, detail: str):
+        super().__init__(status.HTTP_400_BAD_REQUEST, detail)
+
+
+class ServiceNotFoundError(ServiceError):
+    """The requested meeting, session or transcript does not exist"""
+
+    def __init__(self, detail: str):
+        super().__init__(status.HTTP_404_NOT_FOUND, detail)
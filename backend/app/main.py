@@ -1,6 +1,14 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from .core.errors import ServiceError
+from .services.transcription_service import transcription_service
+from .services.creatio import close_creatio_http_client
+from .services.graph import close_graph_http_client
+from .services.email_service import email_service
+from .services.voice_ai_service import voice_ai_service
+from .services.ai_voice_participant import AI_JOIN_GREETING
+from .services.ai_meeting_orchestrator import ai_meeting_orchestrator, COMPLETION_MESSAGE, NO_QUESTIONS_OPENING
 from .routers import auth, leads, meetings, integrations, ai, teams_auth, signaling, ai_meetings, scheduled_meetings, question_sets, real_time_analysis, voice_ai
 
 app = FastAPI(
@@ -10,9 +18,14 @@ app = FastAPI(
 )
 
 import os
+import asyncio
+import logging
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from starlette.responses import JSONResponse
 
+logger = logging.getLogger(__name__)
+
 # Configure CORS
 allowed_origins = [
     "http://localhost:3000",
@@ -23,9 +36,11 @@ allowed_origins = [
 # Add exception handler to ensure CORS headers are added even for errors
 @app.exception_handler(Exception)
 async def validation_exception_handler(request: Request, exc: Exception):
+    # Details stay in the server log; clients get the same shape as an HTTPException
+    logger.exception(f"Unhandled error on {request.method} {request.url.path}: {exc}")
     return JSONResponse(
         status_code=500,
-        content={"message": str(exc)},
+        content={"detail": "Internal server error"},
         headers={
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Methods": "*",
@@ -33,6 +48,14 @@ async def validation_exception_handler(request: Request, exc: Exception):
         }
     )
 
+# Map service-layer errors to their HTTP status so endpoints don't need their own try/except
+@app.exception_handler(ServiceError)
+async def service_error_handler(request: Request, exc: ServiceError):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail}
+    )
+
 # Add ngrok URL if specified in environment
 ngrok_url = os.getenv("NGROK_URL")
 if ngrok_url:
@@ -48,6 +71,43 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# Compress text-heavy responses (transcript exports, search results); small payloads are sent as-is.
+# Streamed audio sets Content-Encoding: identity so it is passed through unbuffered.
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+@app.on_event("startup")
+async def start_background_jobs():
+    # Sweep expired transcription sessions off the request path
+    app.state.transcription_cleanup_task = asyncio.create_task(
+        transcription_service.run_periodic_cleanup()
+    )
+    # One loop joins scheduled meetings as they come due, driven by the scheduled_meetings table
+    app.state.ai_join_scheduler_task = asyncio.create_task(
+        ai_meeting_orchestrator.run_join_scheduler()
+    )
+    # Drop AI conversations that were abandoned or never cleaned up
+    app.state.conversation_janitor_task = asyncio.create_task(
+        ai_meeting_orchestrator.run_conversation_janitor()
+    )
+    # Synthesize the fixed AI phrases up front so meetings don't wait on TTS for them
+    app.state.tts_warmup_task = asyncio.create_task(
+        voice_ai_service.warm_tts_cache([AI_JOIN_GREETING, NO_QUESTIONS_OPENING, COMPLETION_MESSAGE])
+    )
+    # Write sent-email audit rows in batches
+    app.state.email_log_flush_task = asyncio.create_task(email_service.run_log_flusher())
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    app.state.transcription_cleanup_task.cancel()
+    app.state.ai_join_scheduler_task.cancel()
+    app.state.conversation_janitor_task.cancel()
+    await close_creatio_http_client()
+    await close_graph_http_client()
+    # Let an in-flight log flush finish rather than cancelling it with its rows off the buffer
+    email_service.stop_log_flusher()
+    await app.state.email_log_flush_task
+    await email_service.aclose()
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(leads.router)
@@ -479,6 +479,7 @@ class ScheduledMeetingListResponse(BaseModel):
     total_count: int = Field(..., description="Total number of meetings")
     page: int = Field(..., description="Current page number")
     page_size: int = Field(..., description="Number of items per page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if there is one")
 
 class QuestionSetWithQuestions(QuestionSet):
     """Question set with its questions included"""
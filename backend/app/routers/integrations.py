@@ -3,7 +3,7 @@ from typing import List
 from ..core.auth import get_current_user
 from ..core.config import supabase
 from ..models.schemas import CreatioConfig, CreatioConfigCreate, CreatioConfigResponse, CreatioSyncResponse
-from ..services.creatio import CreatioService, get_user_creatio_config
+from ..services.creatio import CreatioService, get_user_creatio_config, invalidate_user_creatio_config
 
 router = APIRouter(prefix="/integrations", tags=["integrations"])
 
@@ -26,6 +26,8 @@ async def save_creatio_config(config: CreatioConfigCreate, current_user = Depend
             # Create new config
             response = supabase.table("creatio_configs").insert(config_data).execute()
         
+        invalidate_user_creatio_config(current_user.id)
+        
         if not response.data:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -111,11 +111,8 @@ async def get_question_set_with_questions(
         
         questions = await question_service.get_questions_by_set(question_set_id, current_user.id)
         
-        # Create response with questions included
-        question_set_dict = question_set.model_dump()
-        question_set_dict["questions"] = questions
-        
-        return QuestionSetWithQuestions(**question_set_dict)
+        # Create response with questions included (the service returns the row as a dict)
+        return QuestionSetWithQuestions(**question_set, questions=questions)
         
     except HTTPException:
         raise
@@ -144,6 +141,7 @@ async def update_question_set(
                 detail="Failed to update question set"
             )
         
+        question_service.invalidate_question_set(question_set_id, current_user.id)
         return question_set
         
     except Exception as e:
@@ -168,6 +166,7 @@ async def delete_question_set(
                 detail="Failed to delete question set"
             )
         
+        question_service.invalidate_question_set(question_set_id, current_user.id)
         return {"message": "Question set deleted successfully"}
         
     except Exception as e:
@@ -197,6 +196,7 @@ async def create_question(
                 detail="Failed to create question"
             )
         
+        question_service.invalidate_question_set(question_set_id, current_user.id)
         return question
         
     except ValueError as e:
@@ -247,6 +247,7 @@ async def update_question(
                 detail="Failed to update question"
             )
         
+        question_service.invalidate_question_set(question_set_id, current_user.id)
         return question
         
     except ValueError as e:
@@ -277,6 +278,7 @@ async def delete_question(
                 detail="Failed to delete question"
             )
         
+        question_service.invalidate_question_set(question_set_id, current_user.id)
         return {"message": "Question deleted successfully"}
         
     except Exception as e:
@@ -305,6 +307,7 @@ async def create_bulk_questions(
                 detail="Failed to create bulk questions"
             )
         
+        question_service.invalidate_question_set(question_set_id, current_user.id)
         return questions
         
     except ValueError as e:
@@ -337,6 +340,7 @@ async def reorder_questions(
                 detail="Failed to reorder questions"
             )
         
+        question_service.invalidate_question_set(question_set_id, current_user.id)
         return {"message": "Questions reordered successfully"}
         
     except Exception as e:
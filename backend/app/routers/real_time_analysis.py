@@ -1,16 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, status, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
 from typing import List, Dict, Any, Optional
+import hashlib
 import logging
 from datetime import datetime
 from ..core.auth import get_current_user
 from ..services.real_time_analysis import real_time_analysis_service
 from ..services.transcription_service import transcription_service
-from ..services.creatio import sync_meeting_insights_to_creatio
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/real-time-analysis", tags=["real-time-analysis"])
 
+def _etag(*parts: str) -> str:
+    """Build a weak ETag from the state a response was rendered from"""
+    digest = hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+def _is_not_modified(request: Request, etag: str) -> bool:
+    """Check whether the client's cached copy matches the current ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return etag in (tag.strip() for tag in if_none_match.split(","))
+
 class ProcessMessageRequest(BaseModel):
     meeting_id: str
     speaker_type: str  # "human" or "ai"
@@ -33,42 +46,56 @@ class SearchRequest(BaseModel):
     meeting_id: Optional[str] = None
     date_from: Optional[datetime] = None
     date_to: Optional[datetime] = None
+    limit: int = Field(default=50, ge=1, le=100, description="Maximum matches per page")
+    cursor: Optional[str] = Field(None, description="next_cursor from the previous page")
+
+# Validators built once at import so the streaming endpoints can decode raw
+# bodies directly instead of going through FastAPI's generic body resolution
+_ADAPTERS = {
+    model: TypeAdapter(model)
+    for model in (ProcessMessageRequest, TranscriptionChunkRequest, StartTranscriptionRequest, SearchRequest)
+}
+
+def _json_body(model):
+    """Dependency that validates the raw JSON request body against a prebuilt adapter"""
+    adapter = _ADAPTERS[model]
+    
+    async def _parse(request: Request):
+        try:
+            return adapter.validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+    
+    return _parse
+
+def _json_body_openapi(model) -> Dict[str, Any]:
+    """OpenAPI request body for endpoints that use _json_body"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}}
+        }
+    }
 
-@router.post("/process-message")
+@router.post("/process-message", openapi_extra=_json_body_openapi(ProcessMessageRequest))
 async def process_conversation_message(
-    request: ProcessMessageRequest,
+    request: ProcessMessageRequest = Depends(_json_body(ProcessMessageRequest)),
     current_user=Depends(get_current_user)
 ):
     """Process a conversation message for real-time analysis"""
     
-    try:
-        # Verify user has access to the meeting
-        # This would typically check if the user is a participant or organizer
-        
-        result = await real_time_analysis_service.process_conversation_chunk(
-            meeting_id=request.meeting_id,
-            speaker_type=request.speaker_type,
-            message=request.message,
-            speaker_id=request.speaker_id or current_user.id,
-            audio_duration_ms=request.audio_duration_ms
-        )
-        
-        if "error" in result:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=result["error"]
-            )
-        
-        return result
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error processing conversation message: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error processing message: {str(e)}"
-        )
+    # Verify user has access to the meeting
+    # This would typically check if the user is a participant or organizer
+    
+    result = await real_time_analysis_service.process_conversation_chunk(
+        meeting_id=request.meeting_id,
+        speaker_type=request.speaker_type,
+        message=request.message,
+        speaker_id=request.speaker_id or current_user.id,
+        audio_duration_ms=request.audio_duration_ms
+    )
+    
+    return result
 
 @router.post("/generate-analysis/{meeting_id}")
 async def generate_meeting_analysis(
@@ -78,78 +105,34 @@ async def generate_meeting_analysis(
 ):
     """Generate comprehensive meeting analysis"""
     
-    try:
-        # Generate analysis
-        analysis = await real_time_analysis_service.generate_meeting_analysis(meeting_id)
-        
-        if "error" in analysis:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=analysis["error"]
-            )
-        
-        # Update lead status based on analysis
-        context = await real_time_analysis_service._get_meeting_context(meeting_id)
-        if context:
-            await real_time_analysis_service.update_lead_status_from_analysis(
-                context["lead_id"], analysis
-            )
-            
-            # Sync to Creatio CRM if requested and lead has external_id
-            if sync_to_crm and context["lead_data"].get("external_id"):
-                try:
-                    await sync_meeting_insights_to_creatio(
-                        user_id=current_user.id,
-                        meeting_analysis=analysis,
-                        lead_external_id=context["lead_data"]["external_id"]
-                    )
-                    analysis["crm_sync_status"] = "success"
-                except Exception as e:
-                    logger.error(f"Failed to sync to CRM: {str(e)}")
-                    analysis["crm_sync_status"] = "failed"
-                    analysis["crm_sync_error"] = str(e)
-        
-        return analysis
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error generating meeting analysis: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error generating analysis: {str(e)}"
-        )
+    return await real_time_analysis_service.finalize_meeting(
+        meeting_id=meeting_id,
+        user_id=current_user.id,
+        sync_to_crm=sync_to_crm
+    )
 
 @router.get("/meeting-transcript/{meeting_id}")
 async def get_meeting_transcript(
     meeting_id: str,
+    request: Request,
+    response: Response,
     format_type: str = Query(default="text", description="Format: text, json, or summary"),
     current_user=Depends(get_current_user)
 ):
     """Get meeting transcript in various formats"""
     
-    try:
-        transcript = await real_time_analysis_service.get_meeting_transcript(
-            meeting_id=meeting_id,
-            format_type=format_type
-        )
-        
-        if "error" in transcript:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=transcript["error"]
-            )
-        
-        return transcript
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting meeting transcript: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error getting transcript: {str(e)}"
-        )
+    fingerprint = await real_time_analysis_service.get_transcript_fingerprint(meeting_id)
+    etag = _etag(meeting_id, fingerprint, format_type)
+    if _is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    transcript = await real_time_analysis_service.get_meeting_transcript(
+        meeting_id=meeting_id,
+        format_type=format_type
+    )
+    
+    response.headers["ETag"] = etag
+    return transcript
 
 @router.post("/search-conversations")
 async def search_conversations(
@@ -158,94 +141,50 @@ async def search_conversations(
 ):
     """Search across conversation content"""
     
-    try:
-        results = await real_time_analysis_service.search_conversation_content(
-            user_id=current_user.id,
-            search_query=request.query,
-            meeting_id=request.meeting_id
-        )
-        
-        if "error" in results:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=results["error"]
-            )
-        
-        return results
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error searching conversations: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error searching: {str(e)}"
-        )
+    results = await real_time_analysis_service.search_conversation_content(
+        user_id=current_user.id,
+        search_query=request.query,
+        meeting_id=request.meeting_id,
+        date_from=request.date_from,
+        date_to=request.date_to,
+        limit=request.limit,
+        cursor=request.cursor
+    )
+    
+    return results
 
 # Transcription endpoints
 
-@router.post("/transcription/start")
+@router.post("/transcription/start", openapi_extra=_json_body_openapi(StartTranscriptionRequest))
 async def start_transcription(
-    request: StartTranscriptionRequest,
+    request: StartTranscriptionRequest = Depends(_json_body(StartTranscriptionRequest)),
     current_user=Depends(get_current_user)
 ):
     """Start a transcription session for a meeting"""
     
-    try:
-        result = await transcription_service.start_transcription_session(
-            meeting_id=request.meeting_id,
-            user_id=current_user.id
-        )
-        
-        if "error" in result:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=result["error"]
-            )
-        
-        return result
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error starting transcription: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error starting transcription: {str(e)}"
-        )
+    result = await transcription_service.start_transcription_session(
+        meeting_id=request.meeting_id,
+        user_id=current_user.id
+    )
+    
+    return result
 
-@router.post("/transcription/process-chunk")
+@router.post("/transcription/process-chunk", openapi_extra=_json_body_openapi(TranscriptionChunkRequest))
 async def process_transcription_chunk(
-    request: TranscriptionChunkRequest,
+    request: TranscriptionChunkRequest = Depends(_json_body(TranscriptionChunkRequest)),
     current_user=Depends(get_current_user)
 ):
     """Process a chunk of transcribed text"""
     
-    try:
-        result = await transcription_service.process_transcription_chunk(
-            session_id=request.session_id,
-            transcript_text=request.transcript_text,
-            is_final=request.is_final,
-            confidence=request.confidence,
-            audio_duration_ms=request.audio_duration_ms
-        )
-        
-        if "error" in result:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=result["error"]
-            )
-        
-        return result
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error processing transcription chunk: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error processing transcription: {str(e)}"
-        )
+    result = await transcription_service.process_transcription_chunk(
+        session_id=request.session_id,
+        transcript_text=request.transcript_text,
+        is_final=request.is_final,
+        confidence=request.confidence,
+        audio_duration_ms=request.audio_duration_ms
+    )
+    
+    return result
 
 @router.post("/transcription/end/{session_id}")
 async def end_transcription(
@@ -254,115 +193,77 @@ async def end_transcription(
 ):
     """End a transcription session"""
     
-    try:
-        result = await transcription_service.end_transcription_session(session_id)
-        
-        if "error" in result:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=result["error"]
-            )
-        
-        return result
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error ending transcription: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error ending transcription: {str(e)}"
-        )
+    result = await transcription_service.end_transcription_session(session_id)
+    
+    return result
 
 @router.get("/transcription/status/{session_id}")
 async def get_transcription_status(
     session_id: str,
+    request: Request,
+    response: Response,
     current_user=Depends(get_current_user)
 ):
     """Get transcription session status"""
     
-    try:
-        result = await transcription_service.get_session_status(session_id)
-        
-        if "error" in result:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=result["error"]
-            )
-        
-        return result
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting transcription status: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error getting status: {str(e)}"
-        )
+    etag = None
+    fingerprint = transcription_service.get_session_fingerprint(session_id)
+    if fingerprint:
+        etag = _etag(session_id, fingerprint, "status")
+        if _is_not_modified(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    result = await transcription_service.get_session_status(session_id)
+    
+    if etag:
+        response.headers["ETag"] = etag
+    return result
 
 @router.get("/transcription/live/{meeting_id}")
 async def get_live_transcript(
     meeting_id: str,
+    request: Request,
+    response: Response,
     current_user=Depends(get_current_user)
 ):
     """Get live transcript for a meeting"""
     
-    try:
-        result = await transcription_service.get_meeting_transcript_live(
-            meeting_id=meeting_id,
-            user_id=current_user.id
-        )
-        
-        if "error" in result:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=result["error"]
-            )
-        
-        return result
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting live transcript: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error getting live transcript: {str(e)}"
-        )
+    # Partial text is only on the worker holding the session; it is part of the ETag too
+    fingerprint = await real_time_analysis_service.get_transcript_fingerprint(meeting_id)
+    partial = transcription_service.get_partial_fingerprint(meeting_id, current_user.id)
+    etag = _etag(meeting_id, fingerprint, partial, f"live:{current_user.id}")
+    if _is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    result = await transcription_service.get_meeting_transcript_live(
+        meeting_id=meeting_id,
+        user_id=current_user.id
+    )
+    
+    response.headers["ETag"] = etag
+    return result
 
 @router.post("/transcription/search")
 async def search_transcripts(
     request: SearchRequest,
     current_user=Depends(get_current_user)
 ):
-    """Search across meeting transcripts"""
-    
-    try:
-        results = await transcription_service.search_transcripts(
-            user_id=current_user.id,
-            search_query=request.query,
-            meeting_id=request.meeting_id,
-            date_from=request.date_from,
-            date_to=request.date_to
-        )
-        
-        if "error" in results:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=results["error"]
-            )
-        
-        return results
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error searching transcripts: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error searching transcripts: {str(e)}"
-        )
+    """Search across meeting transcripts
+    
+    Result pages are compressed by the app-level GZipMiddleware.
+    """
+    
+    results = await transcription_service.search_transcripts(
+        user_id=current_user.id,
+        search_query=request.query,
+        meeting_id=request.meeting_id,
+        date_from=request.date_from,
+        date_to=request.date_to,
+        limit=request.limit,
+        cursor=request.cursor
+    )
+    
+    return results
 
 @router.get("/transcription/export/{meeting_id}")
 async def export_transcript(
@@ -370,51 +271,40 @@ async def export_transcript(
     format_type: str = Query(default="text", description="Export format: text, json, or summary"),
     current_user=Depends(get_current_user)
 ):
-    """Export meeting transcript"""
-    
-    try:
-        result = await transcription_service.export_transcript(
-            meeting_id=meeting_id,
-            user_id=current_user.id,
-            format_type=format_type
-        )
-        
-        if "error" in result:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=result["error"]
-            )
-        
-        return result
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error exporting transcript: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error exporting transcript: {str(e)}"
-        )
+    """Export meeting transcript
+    
+    Exports can be large; they rely on the app-level GZipMiddleware for compression.
+    """
+    
+    result = await transcription_service.export_transcript(
+        meeting_id=meeting_id,
+        user_id=current_user.id,
+        format_type=format_type
+    )
+    
+    return result
 
 @router.post("/transcription/cleanup")
 async def cleanup_expired_sessions(
     max_age_hours: int = Query(default=24, description="Maximum age in hours for active sessions"),
     current_user=Depends(get_current_user)
 ):
-    """Clean up expired transcription sessions (admin only)"""
+    """Trigger a sweep of expired transcription sessions (admin only)
     
-    try:
-        # Note: In a real implementation, you'd want to check if the user has admin privileges
-        cleaned_count = await transcription_service.cleanup_expired_sessions(max_age_hours)
-        
+    The same sweep also runs hourly in the background; concurrent triggers
+    are collapsed into the sweep that is already in progress.
+    """
+    
+    # Note: In a real implementation, you'd want to check if the user has admin privileges
+    cleaned_count = await transcription_service.cleanup_expired_sessions(max_age_hours)
+    
+    if cleaned_count is None:
         return {
-            "cleaned_sessions": cleaned_count,
+            "status": "already_running",
             "max_age_hours": max_age_hours
         }
-        
-    except Exception as e:
-        logger.error(f"Error cleaning up sessions: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error cleaning up sessions: {str(e)}"
-        )
\ No newline at end of file
+    
+    return {
+        "cleaned_sessions": cleaned_count,
+        "max_age_hours": max_age_hours
+    }
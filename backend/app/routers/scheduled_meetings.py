@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import PlainTextResponse
 from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime, timezone, timedelta
 from ..core.auth import get_current_user
 from ..core.config import supabase
+from ..utils.db import run_query
 from ..services.meeting_scheduler import meeting_scheduler_service
 from ..services.question_service import question_service
 from ..services.gemini import gemini_service
@@ -16,6 +18,31 @@ from ..models.enhanced_schemas import (
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/scheduled-meetings", tags=["scheduled-meetings"])
 
+# Lead columns the AI participant and question generation actually read
+_LEAD_CONTEXT_COLUMNS = "id, name, email, company, status, score"
+
+async def verified_meeting(
+    meeting_id: str,
+    current_user=Depends(get_current_user)
+) -> Dict[str, Any]:
+    """Resolve the meeting in the path, raising 404 unless the current user owns it"""
+    try:
+        meeting = await meeting_scheduler_service.get_owned_meeting_summary(meeting_id, current_user.id)
+    except Exception as e:
+        logger.error(f"Error verifying meeting ownership: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+    
+    if not meeting:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Meeting not found"
+        )
+    
+    return meeting
+
 @router.post("/", response_model=ScheduledMeeting)
 async def create_scheduled_meeting(
     meeting_data: ScheduledMeetingCreate,
@@ -55,37 +82,34 @@ async def get_scheduled_meetings(
     status_filter: Optional[MeetingStatus] = Query(None, description="Filter by meeting status"),
     start_date: Optional[datetime] = Query(None, description="Filter meetings from this date"),
     end_date: Optional[datetime] = Query(None, description="Filter meetings until this date"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; takes precedence over page"),
     current_user=Depends(get_current_user)
 ):
     """Get scheduled meetings for the current user"""
     try:
-        if start_date and end_date:
-            meetings = await meeting_scheduler_service.get_meetings_by_date_range(
-                current_user.id, start_date, end_date, status_filter
-            )
-        else:
-            # Get all meetings and filter by status if provided
-            query = supabase.table("scheduled_meetings").select("*").eq("user_id", current_user.id)
-            
-            if status_filter:
-                query = query.eq("status", status_filter.value)
-            
-            response = query.order("scheduled_time", desc=True).execute()
-            meetings = [ScheduledMeeting(**m) for m in response.data]
-        
-        # Apply pagination
-        total_count = len(meetings)
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated_meetings = meetings[start_idx:end_idx]
+        meetings, total_count, next_cursor = await meeting_scheduler_service.get_meetings_page(
+            current_user.id,
+            offset=(page - 1) * page_size,
+            limit=page_size,
+            status_filter=status_filter,
+            start_date=start_date,
+            end_date=end_date,
+            cursor=cursor
+        )
         
         return ScheduledMeetingListResponse(
-            meetings=paginated_meetings,
+            meetings=meetings,
             total_count=total_count,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            next_cursor=next_cursor
         )
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error getting scheduled meetings: {str(e)}")
         raise HTTPException(
@@ -117,7 +141,7 @@ async def get_scheduled_meeting(
 ):
     """Get a specific scheduled meeting with participants and lead data"""
     try:
-        meeting = await meeting_scheduler_service.get_scheduled_meeting(meeting_id, current_user.id)
+        meeting = await meeting_scheduler_service.get_meeting_with_details(meeting_id, current_user.id)
         
         if not meeting:
             raise HTTPException(
@@ -125,30 +149,7 @@ async def get_scheduled_meeting(
                 detail="Meeting not found"
             )
         
-        # Get participants
-        participants_response = supabase.table("meeting_participants").select("*").eq("meeting_id", meeting_id).execute()
-        participants = participants_response.data or []
-        
-        # Get lead data
-        lead_response = supabase.table("leads").select("*").eq("id", meeting.lead_id).eq("user_id", current_user.id).execute()
-        lead_data = lead_response.data[0] if lead_response.data else None
-        
-        # Get question set data if available
-        question_set_data = None
-        if meeting.question_set_id:
-            question_set = await question_service.get_question_set(meeting.question_set_id, current_user.id)
-            if question_set:
-                question_set_data = question_set.model_dump()
-        
-        # Create response with additional data
-        meeting_dict = meeting.model_dump()
-        meeting_dict.update({
-            "participants": participants,
-            "lead": lead_data,
-            "question_set": question_set_data
-        })
-        
-        return MeetingWithParticipants(**meeting_dict)
+        return meeting
         
     except HTTPException:
         raise
@@ -274,18 +275,10 @@ async def complete_scheduled_meeting(
 @router.post("/{meeting_id}/ai-join")
 async def ai_join_meeting(
     meeting_id: str,
-    current_user=Depends(get_current_user)
+    meeting: Dict[str, Any] = Depends(verified_meeting)
 ):
     """Mark AI as joined to the meeting (for automated AI joining)"""
     try:
-        # Verify user owns the meeting
-        meeting = await meeting_scheduler_service.get_scheduled_meeting(meeting_id, current_user.id)
-        if not meeting:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Meeting not found"
-            )
-        
         success = await meeting_scheduler_service.join_meeting_as_ai(meeting_id)
         
         if not success:
@@ -308,21 +301,16 @@ async def ai_join_meeting(
 @router.post("/{meeting_id}/ai-force-join")
 async def ai_force_join_meeting(
     meeting_id: str,
+    meeting: Dict[str, Any] = Depends(verified_meeting),
     current_user=Depends(get_current_user)
 ):
     """Force AI to join the meeting immediately with voice."""
     try:
-        meeting = await meeting_scheduler_service.get_scheduled_meeting(meeting_id, current_user.id)
-        if not meeting:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Meeting not found"
-            )
         # Fetch lead data for context
-        lead_response = supabase.table("leads").select("*").eq("id", meeting.lead_id).eq("user_id", current_user.id).execute()
-        lead_data = lead_response.data[0] if lead_response.data else None
+        lead_response = await run_query(supabase.table("leads").select(_LEAD_CONTEXT_COLUMNS).eq("id", meeting["lead_id"]).eq("user_id", current_user.id).maybe_single())
+        lead_data = lead_response.data
 
-        ok = await ai_meeting_orchestrator.join_scheduled_meeting(meeting_id, meeting.meeting_room_id, lead_data)
+        ok = await ai_meeting_orchestrator.join_scheduled_meeting(meeting_id, meeting["meeting_room_id"], lead_data)
         if not ok:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -341,24 +329,16 @@ async def ai_force_join_meeting(
 @router.get("/{meeting_id}/join-link")
 async def get_meeting_join_link(
     meeting_id: str,
-    current_user=Depends(get_current_user)
+    meeting: Dict[str, Any] = Depends(verified_meeting)
 ):
     """Get the join link for a meeting"""
     try:
-        meeting = await meeting_scheduler_service.get_scheduled_meeting(meeting_id, current_user.id)
-        
-        if not meeting:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Meeting not found"
-            )
-        
         from ..core.config import settings
-        join_url = f"{settings.FRONTEND_URL}/meetings/join/{meeting.meeting_room_id}"
+        join_url = f"{settings.FRONTEND_URL}/meetings/join/{meeting['meeting_room_id']}"
         
         return {
             "join_url": join_url,
-            "meeting_room_id": meeting.meeting_room_id,
+            "meeting_room_id": meeting["meeting_room_id"],
             "meeting_id": meeting_id
         }
         
@@ -374,20 +354,13 @@ async def get_meeting_join_link(
 @router.get("/{meeting_id}/questions")
 async def get_meeting_questions(
     meeting_id: str,
+    meeting: Dict[str, Any] = Depends(verified_meeting),
     current_user=Depends(get_current_user)
 ):
     """Get questions for a meeting (from question set + AI generated)"""
     try:
-        meeting = await meeting_scheduler_service.get_scheduled_meeting(meeting_id, current_user.id)
-        
-        if not meeting:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Meeting not found"
-            )
-        
         # Get lead data
-        lead_response = supabase.table("leads").select("*").eq("id", meeting.lead_id).eq("user_id", current_user.id).execute()
+        lead_response = await run_query(supabase.table("leads").select(_LEAD_CONTEXT_COLUMNS).eq("id", meeting["lead_id"]).eq("user_id", current_user.id).maybe_single())
         
         if not lead_response.data:
             raise HTTPException(
@@ -395,18 +368,18 @@ async def get_meeting_questions(
                 detail="Lead not found"
             )
         
-        lead_data = lead_response.data[0]
+        lead_data = lead_response.data
         
         # Generate questions for this lead and meeting
         questions = await question_service.generate_questions_for_lead(
             lead_data, 
-            meeting.question_set_id
+            meeting["question_set_id"]
         )
         
         return {
             "questions": questions,
-            "question_set_id": meeting.question_set_id,
-            "lead_id": meeting.lead_id
+            "question_set_id": meeting["question_set_id"],
+            "lead_id": meeting["lead_id"]
         }
         
     except HTTPException:
@@ -421,20 +394,12 @@ async def get_meeting_questions(
 @router.get("/{meeting_id}/analysis")
 async def get_meeting_analysis(
     meeting_id: str,
-    current_user=Depends(get_current_user)
+    meeting: Dict[str, Any] = Depends(verified_meeting)
 ):
     """Get meeting analysis and insights"""
     try:
-        # Verify user owns the meeting
-        meeting = await meeting_scheduler_service.get_scheduled_meeting(meeting_id, current_user.id)
-        if not meeting:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Meeting not found"
-            )
-        
         # Get analysis data
-        analysis_response = supabase.table("meeting_analyses").select("*").eq("meeting_id", meeting_id).execute()
+        analysis_response = await run_query(supabase.table("meeting_analyses").select("analysis_data, transcript, lead_score_before, lead_score_after, created_at").eq("meeting_id", meeting_id).order("created_at", desc=True).limit(1).maybe_single())
         
         if not analysis_response.data:
             raise HTTPException(
@@ -442,7 +407,7 @@ async def get_meeting_analysis(
                 detail="Meeting analysis not found"
             )
         
-        analysis = analysis_response.data[0]
+        analysis = analysis_response.data
         
         return {
             "meeting_id": meeting_id,
@@ -465,49 +430,46 @@ async def get_meeting_analysis(
 @router.get("/{meeting_id}/transcript")
 async def get_meeting_transcript(
     meeting_id: str,
-    format_type: str = Query("text", description="Format: text, json"),
-    current_user=Depends(get_current_user)
+    format_type: str = Query("text", description="Format: text, json, or plain (raw text body)"),
+    meeting: Dict[str, Any] = Depends(verified_meeting)
 ):
     """Get meeting transcript"""
     try:
-        # Verify user owns the meeting
-        meeting = await meeting_scheduler_service.get_scheduled_meeting(meeting_id, current_user.id)
-        if not meeting:
+        # Get transcript from analysis, or the conversation events if there is none yet (see migration 010)
+        transcript_response = await run_query(
+            supabase.rpc("get_transcript_or_events", {"p_meeting": meeting_id})
+        )
+        
+        if not transcript_response.data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Meeting not found"
+                detail="Transcript not found"
             )
         
-        # Get transcript from analysis
-        analysis_response = supabase.table("meeting_analyses").select("transcript, analysis_data").eq("meeting_id", meeting_id).execute()
-        
-        if not analysis_response.data:
-            # Try to get from conversation events
-            events_response = supabase.table("conversation_events").select("*").eq("meeting_id", meeting_id).order("timestamp").execute()
-            
-            if not events_response.data:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Transcript not found"
-                )
+        if "events" in transcript_response.data:
+            events = transcript_response.data["events"]
             
             # Generate transcript from events
             if format_type == "json":
-                return {"events": events_response.data}
+                return {"events": events}
             else:
-                transcript = ""
-                for event in events_response.data:
-                    speaker = "AI Assistant" if event["speaker_type"] == "ai" else "Participant"
-                    transcript += f"{speaker}: {event['message_text']}\n"
+                transcript = "".join(
+                    f"{'AI Assistant' if event['speaker_type'] == 'ai' else 'Participant'}: {event['message_text']}\n"
+                    for event in events
+                )
+                if format_type == "plain":
+                    return PlainTextResponse(transcript)
                 return {"transcript": transcript}
         
-        analysis = analysis_response.data[0]
+        analysis = transcript_response.data
         
         if format_type == "json":
             return {
                 "transcript": analysis.get("transcript", ""),
                 "analysis": analysis.get("analysis_data", {})
             }
+        elif format_type == "plain":
+            return PlainTextResponse(analysis.get("transcript") or "")
         else:
             return {"transcript": analysis.get("transcript", "")}
         
@@ -21,7 +21,8 @@ async def websocket_signaling_endpoint(
     room_id: str,
     token: str = Query(..., description="Authentication token"),
     user_id: str = Query(None),
-    participant_type: str = Query("human")
+    participant_type: str = Query("human"),
+    binary_audio: bool = Query(False, description="Receive AI voice audio as binary frames instead of base64")
 ):
     """Enhanced WebSocket endpoint for multi-user meeting rooms with participant tracking"""
     # Authenticate user before accepting connection
@@ -34,4 +35,4 @@ async def websocket_signaling_endpoint(
     if not user_id:
         user_id = user.id
     
-    await websocket_endpoint(websocket, room_id, user_id, participant_type)
\ No newline at end of file
+    await websocket_endpoint(websocket, room_id, user_id, participant_type, binary_audio)
\ No newline at end of file
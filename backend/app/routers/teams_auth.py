@@ -4,11 +4,15 @@ Microsoft Teams OAuth authentication endpoints
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.responses import RedirectResponse
 from urllib.parse import urlencode
+import asyncio
 import logging
+import uuid
+from typing import Any, Dict
 from datetime import datetime, timedelta
 from ..core.auth import get_current_user
 from ..core.config import settings, supabase
 from ..services.graph import graph_service
+from ..utils.db import run_query
 from datetime import datetime, timedelta, timezone
 from dateutil import parser as date_parser 
 
@@ -16,6 +20,30 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth/teams", tags=["teams-auth"])
 
+# In-flight status checks, keyed by user id
+_status_checks: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+# Everything in the authorize URL except the per-user state is fixed at startup
+# Use specific tenant ID from settings (NOT common)
+_TEAMS_AUTH_URL_PREFIX = (
+    f"https://login.microsoftonline.com/{settings.MICROSOFT_TENANT_ID}/oauth2/v2.0/authorize?"
+    + urlencode({
+        "client_id": settings.MICROSOFT_CLIENT_ID,
+        "response_type": "code",
+        "redirect_uri": "http://localhost:3000/integrations/teams/callback",
+        "scope": "https://graph.microsoft.com/Calendars.Read https://graph.microsoft.com/User.Read offline_access",
+        "response_mode": "query"
+    })
+)
+
+def _is_uuid(value: str) -> bool:
+    """Check that the OAuth state is a canonical hyphenated UUID"""
+    try:
+        # uuid.UUID ignores hyphens and braces, so compare against its canonical form
+        return str(uuid.UUID(value)) == value.lower()
+    except ValueError:
+        return False
+
 @router.post("/login")
 async def teams_login(current_user = Depends(get_current_user)):
     """
@@ -23,23 +51,7 @@ async def teams_login(current_user = Depends(get_current_user)):
     Returns redirect URL for Microsoft login
     """
     try:
-        # Use specific tenant ID from settings (NOT common)
-        tenant_id = settings.MICROSOFT_TENANT_ID
-        auth_url = f"https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/authorize"
-        
-        logger.info(f"Using tenant ID: {tenant_id}")
-        
-        # OAuth parameters
-        params = {
-            "client_id": settings.MICROSOFT_CLIENT_ID,
-            "response_type": "code",
-            "redirect_uri": "http://localhost:3000/integrations/teams/callback",
-            "scope": "https://graph.microsoft.com/Calendars.Read https://graph.microsoft.com/User.Read offline_access",
-            "response_mode": "query",
-            "state": current_user.id
-        }
-        
-        redirect_url = f"{auth_url}?{urlencode(params)}"
+        redirect_url = f"{_TEAMS_AUTH_URL_PREFIX}&state={current_user.id}"
         
         logger.info(f"OAuth URL: {redirect_url}")
         
@@ -76,10 +88,8 @@ async def teams_callback(code: str, state: str, error: str = None):
     
     logger.info(f"Received OAuth callback with code={code[:10]}..., state={state}")
 
-    # Validate state looks like a UUID (Supabase user_id is UUID)
-    import re
-    uuid_regex = re.compile(r"^[0-9a-fA-F-]{36}$")
-    if not uuid_regex.match(state):
+    # Validate state is a UUID (Supabase user_id is UUID)
+    if not _is_uuid(state):
         logger.error(f"Invalid state format received: {state}")
         return RedirectResponse(
             url=f"{settings.FRONTEND_URL}/integrations?teams_error=invalid_state",
@@ -112,7 +122,7 @@ async def teams_callback(code: str, state: str, error: str = None):
             "microsoft_refresh_token": refresh_token,
             "microsoft_token_expires_at": expires_at.isoformat()
         }
-        response = supabase.table("profiles").update(update_data).eq("id", state).execute()
+        response = await run_query(supabase.table("profiles").update(update_data).eq("id", state))
 
         if not response.data:
             logger.error(f"Failed to update Supabase profile for id={state}")
@@ -141,16 +151,31 @@ async def teams_status(current_user = Depends(get_current_user)):
     Check if user has connected their Microsoft Teams account
     and refresh token if needed
     """
+    # Concurrent polls for the same user (e.g. several tabs) share one check,
+    # so only one of them can refresh and store new tokens
+    check = _status_checks.get(current_user.id)
+    if check is None:
+        check = asyncio.create_task(_check_teams_status(current_user.id))
+        _status_checks[current_user.id] = check
+        check.add_done_callback(lambda _: _status_checks.pop(current_user.id, None))
+    
+    # Shielded so one caller disconnecting does not cancel the check for the others
+    return await asyncio.shield(check)
+
+async def _check_teams_status(user_id: str) -> Dict[str, Any]:
+    """Load, refresh and validate the user's stored Microsoft tokens"""
     try:
         # Get profile from Supabase
-        resp = supabase.table("profiles").select(
-            "microsoft_access_token, microsoft_refresh_token, microsoft_token_expires_at"
-        ).eq("id", current_user.id).execute()
+        resp = await run_query(
+            supabase.table("profiles").select(
+                "microsoft_access_token, microsoft_refresh_token, microsoft_token_expires_at"
+            ).eq("id", user_id).maybe_single()
+        )
 
-        if not resp.data or len(resp.data) == 0:
+        if not resp.data:
             return {"connected": False, "message": "Microsoft Teams not connected"}
 
-        config = resp.data[0]
+        config = resp.data
 
         if not config.get("microsoft_access_token"):
             return {"connected": False, "message": "No Teams token stored"}
@@ -168,6 +193,7 @@ async def teams_status(current_user = Depends(get_current_user)):
                 }
 
         access_token = config["microsoft_access_token"]
+        refreshed_tokens = None
 
         # Refresh if expired
         if expires_at and expires_at <= datetime.now(timezone.utc):
@@ -175,12 +201,11 @@ async def teams_status(current_user = Depends(get_current_user)):
                 new_tokens = await graph_service.refresh_access_token(config["microsoft_refresh_token"])
                 new_expires_at = datetime.now(timezone.utc) + timedelta(seconds=new_tokens["expires_in"])
 
-                supabase.table("profiles").update({
+                refreshed_tokens = {
                     "microsoft_access_token": new_tokens["access_token"],
                     "microsoft_refresh_token": new_tokens.get("refresh_token", config["microsoft_refresh_token"]),
                     "microsoft_token_expires_at": new_expires_at.isoformat()
-                }).eq("id", current_user.id).execute()
-
+                }
                 access_token = new_tokens["access_token"]
                 expires_at = new_expires_at
             except Exception as e:
@@ -190,24 +215,40 @@ async def teams_status(current_user = Depends(get_current_user)):
                     "message": f"Failed to refresh token: {str(e)}"
                 }
 
-        # Validate Graph token
-        try:
-            logger.info("Validating Microsoft Graph token")
-            ms_user = await graph_service.get_user_info(access_token)
-            logger.info(f"Token validation successful for user: {ms_user.get('userPrincipalName')}")
-        except Exception as e:
-            logger.error(f"Token validation failed: {str(e)}")
+        # Validate Graph token, storing any refreshed tokens in parallel
+        logger.info("Validating Microsoft Graph token")
+        if refreshed_tokens:
+            stored, ms_user = await asyncio.gather(
+                run_query(supabase.table("profiles").update(refreshed_tokens).eq("id", user_id)),
+                graph_service.get_user_info_cached(access_token),
+                return_exceptions=True
+            )
+            if isinstance(stored, Exception):
+                return {
+                    "connected": True,
+                    "token_expired": True,
+                    "message": f"Failed to refresh token: {str(stored)}"
+                }
+        else:
+            try:
+                ms_user = await graph_service.get_user_info_cached(access_token)
+            except Exception as e:
+                ms_user = e
+
+        if isinstance(ms_user, Exception):
+            logger.error(f"Token validation failed: {str(ms_user)}")
             # Update profile to clear invalid tokens
-            supabase.table("profiles").update({
+            await run_query(supabase.table("profiles").update({
                 "microsoft_access_token": None,
                 "microsoft_refresh_token": None,
                 "microsoft_token_expires_at": None
-            }).eq("id", current_user.id).execute()
+            }).eq("id", user_id))
             return {
                 "connected": False,
                 "message": "Teams connection is invalid. Please reconnect your account.",
-                "error": str(e)
+                "error": str(ms_user)
             }
+        logger.info(f"Token validation successful for user: {ms_user.get('userPrincipalName')}")
 
         return {
             "connected": True,
@@ -229,11 +270,11 @@ async def teams_disconnect(current_user = Depends(get_current_user)):
     Disconnect Microsoft Teams integration
     """
     try:
-        response = supabase.table("profiles").update({
+        response = await run_query(supabase.table("profiles").update({
             "microsoft_access_token": None,
             "microsoft_refresh_token": None,
             "microsoft_token_expires_at": None
-        }).eq("id", current_user.id).execute()
+        }).eq("id", current_user.id))
         
         return {
             "status": "success",
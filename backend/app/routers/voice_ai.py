@@ -4,8 +4,8 @@ Voice AI Router
 Endpoints for testing and managing voice AI functionality
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import Response
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 import logging
 from ..core.auth import get_current_user
 from ..services.voice_ai_service import voice_ai_service
@@ -19,16 +19,30 @@ async def test_text_to_speech(
     voice_id: str = "en-US-AriaNeural",
     current_user=Depends(get_current_user)
 ):
-    """Test text-to-speech functionality"""
+    """Test text-to-speech functionality
+    
+    Audio is streamed to the client as it is synthesized.
+    """
     try:
-        audio_data = await voice_ai_service.text_to_speech(text, voice_id=voice_id)
+        audio_stream = voice_ai_service.text_to_speech_stream(text, voice_id=voice_id)
         
-        if audio_data:
-            return Response(
-                content=audio_data,
+        # Wait for the first chunk so a failed synthesis can still become an error response
+        first_chunk = await anext(audio_stream, None)
+        
+        if first_chunk:
+            async def audio_body():
+                yield first_chunk
+                async for chunk in audio_stream:
+                    yield chunk
+            
+            return StreamingResponse(
+                audio_body(),
                 media_type="audio/mpeg",
                 headers={
-                    "Content-Disposition": "attachment; filename=test_tts.mp3"
+                    "Content-Disposition": "attachment; filename=test_tts.mp3",
+                    # MP3 is already compressed, and GZipMiddleware would hold chunks back to
+                    # fill its buffer; it passes responses with an explicit encoding through
+                    "Content-Encoding": "identity"
                 }
             )
         else:
@@ -37,6 +51,8 @@ async def test_text_to_speech(
                 detail="Failed to generate speech"
             )
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"TTS test error: {e}")
         raise HTTPException(
@@ -92,10 +108,14 @@ async def get_voice_ai_status(current_user=Depends(get_current_user)):
 async def make_ai_speak(
     meeting_id: str,
     text: str,
+    background_tasks: BackgroundTasks,
     voice_id: str = "en-US-AriaNeural",
     current_user=Depends(get_current_user)
 ):
-    """Make AI speak in a specific meeting"""
+    """Make AI speak in a specific meeting
+    
+    Returns as soon as speech is queued; synthesis and playback run after the response.
+    """
     try:
         from ..services.ai_voice_participant import get_ai_voice_participant
         
@@ -109,10 +129,11 @@ async def make_ai_speak(
             )
         
         # Update voice settings if different
-        await ai_participant.set_voice_settings(voice_id=voice_id)
+        if voice_id != ai_participant.voice_id:
+            await ai_participant.set_voice_settings(voice_id=voice_id)
         
-        # Make AI speak
-        await ai_participant.speak_message(text)
+        # Make AI speak once the response has gone out
+        background_tasks.add_task(ai_participant.speak_message, text)
         
         return {
             "message": "AI speech initiated",
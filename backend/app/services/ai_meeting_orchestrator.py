@@ -12,17 +12,75 @@ Handles AI participation in scheduled meetings including:
 import asyncio
 import logging
 import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Set
 from ..core.config import supabase
+from ..utils.db import run_query
+from ..utils.ttl_cache import TTLCache
 from ..services.gemini import gemini_service
 from ..services.question_service import question_service
 from ..services.email_service import email_service
+from ..services.voice_ai_service import voice_ai_service
 from ..signaling import enhanced_manager, ParticipantType
 from ..models.enhanced_schemas import ConversationState, MeetingStatus
 
 logger = logging.getLogger(__name__)
 
+OPENING_TEMPLATE = "Hello! I'm an AI assistant here to learn more about {company}. {question}"
+NO_QUESTIONS_OPENING = "Hello! I'd like to learn more about your business needs. Can you tell me about your company?"
+SILENCE_PROMPT = "I'm here when you're ready to continue. Would you like me to repeat the question?"
+COMPLETION_MESSAGE = "Thank you for sharing all that information with me. Let me analyze what we've discussed and provide you with a summary."
+
+# conversation_events rows are buffered and written in batches instead of one insert per message
+EVENT_FLUSH_INTERVAL_SECONDS = 2.0
+EVENT_FLUSH_BATCH_SIZE = 8
+
+# How long end_meeting_gracefully waits for the background analysis before running its own
+ANALYSIS_WAIT_TIMEOUT_SECONDS = 30
+
+# Follow-up questions only need the recent turns; the full history is kept for analysis and transcripts
+NEXT_QUESTION_CONTEXT_MESSAGES = 6
+
+# Pre-generated questions are synthesized this many turns ahead so their audio is cached when asked
+PREFETCH_QUESTION_COUNT = 2
+
+# Fire-and-forget work (joins, analyses, evictions). The event loop only keeps weak references
+# to tasks, so they are held here until they finish
+_background_tasks: Set[asyncio.Task] = set()
+
+def _spawn(coro) -> asyncio.Task:
+    """Start a background task and keep it referenced until it is done"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+# Organizer emails change rarely; cache them for the post-meeting email path
+_profile_email_cache = TTLCache(maxsize=1024, ttl=600)
+
+async def _get_profile_email(user_id: str) -> Optional[str]:
+    """Look up a user's profile email, using the in-process cache when possible"""
+    email = _profile_email_cache.get(user_id)
+    if email is None:
+        response = await run_query(supabase.table("profiles").select("email").eq("id", user_id).maybe_single())
+        email = response.data["email"] if response.data else None
+        if email:
+            _profile_email_cache.set(user_id, email)
+    return email
+
+# The join scheduler re-checks the next due meeting at least this often, so
+# meetings created or moved by other workers are picked up without a signal
+JOIN_SCHEDULER_MAX_SLEEP_SECONDS = 60
+# Meetings further in the past than this are not joined late (e.g. after downtime)
+JOIN_GRACE_PERIOD = timedelta(minutes=60)
+
+# Bounds on in-memory conversations, in case a monitor dies or a meeting is abandoned
+MAX_ACTIVE_CONVERSATIONS = 1024
+STALE_CONVERSATION_SECONDS = 2 * 3600
+CONVERSATION_JANITOR_INTERVAL_SECONDS = 300
+
 class ConversationFlow:
     """Manages conversation flow and turn-taking logic"""
     
@@ -37,11 +95,23 @@ class ConversationFlow:
         self.silence_timeout = 5.0  # seconds
         self.ai_response_delay = 2.0  # seconds
         self.max_questions = 7
-        self.last_activity = datetime.now()
+        self.last_activity = time.monotonic()  # monotonic seconds, only used for silence detection
+        self._pending_events: List[Dict[str, Any]] = []
+        self._flush_requested = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._activity_event = asyncio.Event()
+        self._prefetched_until = 1  # questions[0] is spoken as part of the opening message
+        self._prefetch_task: Optional[asyncio.Task] = None
+        self.analysis: Optional[Dict[str, Any]] = None
+        self.transcript: Optional[str] = None
+        self._analysis_done = asyncio.Event()
+        # Keeps the meeting's AI voice participant alive; the registry only holds it weakly
+        self.voice_participant = None
         
     async def initialize(self, lead_data: Dict, question_set_id: Optional[str] = None):
         """Initialize conversation with lead data and questions"""
         self.lead_data = lead_data
+        self._flush_task = asyncio.create_task(self._flush_events_periodically())
         
         # Generate questions for this lead
         self.questions = await question_service.generate_questions_for_lead(
@@ -50,13 +120,34 @@ class ConversationFlow:
         
         logger.info(f"Initialized conversation for meeting {self.meeting_id} with {len(self.questions)} questions")
         
+        self._prefetch_question_audio(1)
+        
+    def _prefetch_question_audio(self, next_index: int):
+        """Synthesize the next few pre-generated questions in the background"""
+        start = max(next_index, self._prefetched_until)
+        end = min(next_index + PREFETCH_QUESTION_COUNT, len(self.questions))
+        if start >= end:
+            return
+            
+        self._prefetched_until = end
+        # Warm the cache under the key the voice participant will look up
+        voice_kwargs = {}
+        if self.voice_participant:
+            voice_kwargs = {"voice_id": self.voice_participant.voice_id, "speed": self.voice_participant.speaking_speed}
+        self._prefetch_task = asyncio.create_task(
+            voice_ai_service.warm_tts_cache(self.questions[start:end], **voice_kwargs)
+        )
+        
     async def start_conversation(self) -> str:
         """Start the conversation with opening message"""
         if not self.questions:
-            return "Hello! I'd like to learn more about your business needs. Can you tell me about your company?"
+            return NO_QUESTIONS_OPENING
             
         self.state = ConversationState.AI_SPEAKING
-        opening_message = f"Hello! I'm an AI assistant here to learn more about {self.lead_data.get('company', 'your business')}. {self.questions[0]}"
+        opening_message = OPENING_TEMPLATE.format(
+            company=self.lead_data.get('company', 'your business'),
+            question=self.questions[0]
+        )
         
         # Save opening message
         await self._save_conversation_message("ai", opening_message)
@@ -69,7 +160,8 @@ class ConversationFlow:
         # Save user message
         await self._save_conversation_message("human", user_message, user_id)
         
-        self.last_activity = datetime.now()
+        self.last_activity = time.monotonic()
+        self._activity_event.set()
         
         # Add delay for natural conversation flow
         await asyncio.sleep(self.ai_response_delay)
@@ -87,13 +179,14 @@ class ConversationFlow:
         self.current_question_index += 1
         
         if self.current_question_index < len(self.questions):
-            # Use pre-generated question
+            # Use pre-generated question (its audio was prefetched a turn or two ago)
             next_question = self.questions[self.current_question_index]
+            self._prefetch_question_audio(self.current_question_index + 1)
         else:
             # Generate contextual follow-up question
             remaining_questions = self.questions[self.current_question_index:]
             next_question = await gemini_service.generate_next_question(
-                self.conversation_history, remaining_questions, self.lead_data
+                self._llm_context(), remaining_questions, self.lead_data
             )
             
         self.state = ConversationState.AI_SPEAKING
@@ -103,65 +196,81 @@ class ConversationFlow:
         
         return next_question
         
+    def _llm_context(self) -> List[Dict]:
+        """Recent messages to send with follow-up question prompts"""
+        return self.conversation_history[-NEXT_QUESTION_CONTEXT_MESSAGES:]
+        
     async def _complete_conversation(self) -> str:
         """Complete the conversation and generate summary"""
         self.state = ConversationState.COMPLETED
+        self._activity_event.set()
         
-        completion_message = "Thank you for sharing all that information with me. Let me analyze what we've discussed and provide you with a summary."
+        completion_message = COMPLETION_MESSAGE
         
         # Save completion message
         await self._save_conversation_message("ai", completion_message)
         
         # Analyze conversation in background
-        asyncio.create_task(self._analyze_and_complete())
+        _spawn(self._analyze_and_complete())
         
         return completion_message
         
     async def _analyze_and_complete(self):
         """Analyze conversation and update meeting status"""
+        # Make sure every message is stored before the transcript is built from them
+        await self._close_event_buffer()
+        
         try:
-            # Generate analysis
-            analysis = await gemini_service.analyze_conversation(
-                self.conversation_history, self.lead_data
-            )
-            
-            # Generate transcript
-            transcript = await gemini_service.generate_meeting_transcript(
-                self.conversation_history, self.lead_data
+            # Analysis and transcript are independent Gemini calls on the same history
+            analysis, transcript = await asyncio.gather(
+                gemini_service.analyze_conversation(self.conversation_history, self.lead_data),
+                gemini_service.generate_meeting_transcript(self.conversation_history, self.lead_data)
             )
-            
-            # Save analysis to database
-            supabase.table("meeting_analyses").insert({
-                "meeting_id": self.meeting_id,
-                "lead_id": self.lead_data.get("id"),
-                "analysis_data": analysis,
-                "transcript": transcript,
-                "lead_score_before": self.lead_data.get("score", 0),
-                "lead_score_after": analysis.get("lead_score", 0),
-                "created_at": datetime.now().isoformat()
-            }).execute()
-            
-            # Update lead record with new information
-            await self._update_lead_record(analysis)
-            
-            # Update scheduled meeting status
-            supabase.table("scheduled_meetings").update({
-                "status": MeetingStatus.COMPLETED.value,
-                "completed_at": datetime.now().isoformat()
-            }).eq("id", self.meeting_id).execute()
-            
-            # Send email notifications
-            await self._send_post_meeting_emails(analysis, transcript)
-            
-            # Broadcast analysis to participants
-            await enhanced_manager.broadcast_to_room(self.room_id, {
-                "type": "meeting_completed",
-                "analysis": analysis,
-                "summary": analysis.get("summary", "Meeting completed successfully.")
-            })
+            self.analysis, self.transcript = analysis, transcript
+            self._analysis_done.set()
+            
+            # Everything below only needs the analysis, so it runs concurrently
+            now_iso = datetime.now().isoformat()
+            post_meeting_steps = {
+                "save analysis": run_query(supabase.table("meeting_analyses").insert({
+                    "meeting_id": self.meeting_id,
+                    "lead_id": self.lead_data.get("id"),
+                    "analysis_data": analysis,
+                    "transcript": transcript,
+                    "lead_score_before": self.lead_data.get("score", 0),
+                    "lead_score_after": analysis.get("lead_score", 0),
+                    "created_at": now_iso
+                })),
+                "update lead": self._update_lead_record(analysis),
+                "update meeting status": run_query(supabase.table("scheduled_meetings").update({
+                    "status": MeetingStatus.COMPLETED.value,
+                    "completed_at": now_iso
+                }).eq("id", self.meeting_id)),
+                "send emails": self._send_post_meeting_emails(analysis, transcript),
+                "broadcast analysis": enhanced_manager.broadcast_to_room(self.room_id, {
+                    "type": "meeting_completed",
+                    "analysis": analysis,
+                    "summary": analysis.get("summary", "Meeting completed successfully.")
+                })
+            }
+            results = await asyncio.gather(*post_meeting_steps.values(), return_exceptions=True)
+            for step, result in zip(post_meeting_steps, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Post-meeting step '{step}' failed for meeting {self.meeting_id}: {result}")
             
         except Exception as e:
             logger.error(f"Failed to analyze conversation: {e}")
+        finally:
+            # Wake anyone waiting even if the analysis failed; they will see analysis is None
+            self._analysis_done.set()
+            
+    async def wait_for_analysis(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait for the post-meeting analysis started by _complete_conversation"""
+        try:
+            await asyncio.wait_for(self._analysis_done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out waiting for analysis of meeting {self.meeting_id}")
+        return self.analysis
             
     async def _update_lead_record(self, analysis: Dict[str, Any]):
         """Update lead record with meeting insights"""
@@ -171,12 +280,13 @@ class ConversationFlow:
                 return
                 
             # Prepare update data
+            now_iso = datetime.now().isoformat()
             update_data = {
                 "score": analysis.get("lead_score", self.lead_data.get("score", 0)),
                 "status": self._determine_lead_status(analysis),
                 "notes": self._format_meeting_notes(analysis),
-                "last_contact": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
+                "last_contact": now_iso,
+                "updated_at": now_iso
             }
             
             # Add qualification fields if available
@@ -188,7 +298,7 @@ class ConversationFlow:
                 update_data["decision_maker_notes"] = analysis["decision_makers"]
                 
             # Update lead record
-            supabase.table("leads").update(update_data).eq("id", lead_id).execute()
+            await run_query(supabase.table("leads").update(update_data).eq("id", lead_id))
             
             logger.info(f"Updated lead record {lead_id} with meeting insights")
             
@@ -211,48 +321,45 @@ class ConversationFlow:
             
     def _format_meeting_notes(self, analysis: Dict[str, Any]) -> str:
         """Format meeting notes from analysis"""
-        notes = f"AI Meeting Summary ({datetime.now().strftime('%Y-%m-%d')})\n\n"
-        notes += f"Summary: {analysis.get('summary', 'No summary available')}\n\n"
+        parts = [
+            f"AI Meeting Summary ({datetime.now().strftime('%Y-%m-%d')})\n\n",
+            f"Summary: {analysis.get('summary', 'No summary available')}\n\n"
+        ]
         
         if analysis.get('key_insights'):
-            notes += "Key Insights:\n"
-            for insight in analysis['key_insights']:
-                notes += f"• {insight}\n"
-            notes += "\n"
+            parts.append("Key Insights:\n")
+            parts.extend(f"• {insight}\n" for insight in analysis['key_insights'])
+            parts.append("\n")
             
         if analysis.get('pain_points'):
-            notes += "Pain Points:\n"
-            for pain in analysis['pain_points']:
-                notes += f"• {pain}\n"
-            notes += "\n"
+            parts.append("Pain Points:\n")
+            parts.extend(f"• {pain}\n" for pain in analysis['pain_points'])
+            parts.append("\n")
             
         if analysis.get('next_steps'):
-            notes += "Next Steps:\n"
-            for step in analysis['next_steps']:
-                notes += f"• {step}\n"
+            parts.append("Next Steps:\n")
+            parts.extend(f"• {step}\n" for step in analysis['next_steps'])
                 
-        return notes
+        return "".join(parts)
         
     async def _send_post_meeting_emails(self, analysis: Dict[str, Any], transcript: str):
         """Send post-meeting emails to user"""
         try:
-            # Get meeting and user data
-            meeting_response = supabase.table("scheduled_meetings").select("*, leads(*)").eq("id", self.meeting_id).execute()
+            # Get meeting data (lead details come from self.lead_data)
+            meeting_response = await run_query(supabase.table("scheduled_meetings").select("id, user_id, scheduled_time").eq("id", self.meeting_id).maybe_single())
             
             if not meeting_response.data:
                 logger.error(f"Meeting {self.meeting_id} not found for email sending")
                 return
                 
-            meeting_data = meeting_response.data[0]
+            meeting_data = meeting_response.data
             
             # Get user email
-            user_response = supabase.table("profiles").select("email").eq("id", meeting_data["user_id"]).execute()
+            user_email = await _get_profile_email(meeting_data["user_id"])
             
-            if not user_response.data:
+            if not user_email:
                 logger.error(f"User profile not found for meeting {self.meeting_id}")
                 return
-                
-            user_email = user_response.data[0]["email"]
             
             # Prepare meeting data for email
             email_meeting_data = {
@@ -296,63 +403,143 @@ class ConversationFlow:
         
         self.conversation_history.append(message_data)
         
-        # Save to database
+        # Queue for the next batched insert
+        self._pending_events.append({
+            "meeting_id": self.meeting_id,
+            "speaker_type": speaker_type,
+            "speaker_id": speaker_id,
+            "message_text": message,
+            "timestamp": message_data["timestamp"]
+        })
+        if len(self._pending_events) >= EVENT_FLUSH_BATCH_SIZE:
+            self._flush_requested.set()
+            
+    async def _flush_events(self):
+        """Write buffered conversation events to the database in one insert"""
+        if not self._pending_events:
+            return
+            
+        events, self._pending_events = self._pending_events, []
         try:
-            supabase.table("conversation_events").insert({
-                "meeting_id": self.meeting_id,
-                "speaker_type": speaker_type,
-                "speaker_id": speaker_id,
-                "message_text": message,
-                "timestamp": datetime.now().isoformat()
-            }).execute()
+            await run_query(supabase.table("conversation_events").insert(events))
         except Exception as e:
-            logger.error(f"Failed to save conversation message: {e}")
-            
+            logger.error(f"Failed to save {len(events)} conversation messages: {e}")
+            
+    async def _flush_events_periodically(self):
+        """Flush buffered events every few seconds, or sooner once a batch fills up"""
+        while self.state != ConversationState.COMPLETED:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=EVENT_FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self._flush_events()
+            
+    async def _close_event_buffer(self):
+        """Stop the periodic flush and write whatever is still buffered"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        await self._flush_events()
+            
+    async def wait_for_activity(self, timeout: float) -> bool:
+        """Wait for the next user message or completion; False if the timeout passes first"""
+        try:
+            await asyncio.wait_for(self._activity_event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._activity_event.clear()
+        return True
+        
     def should_prompt_user(self) -> bool:
         """Check if we should prompt user due to silence"""
         if self.state == ConversationState.WAITING_FOR_RESPONSE:
-            silence_duration = (datetime.now() - self.last_activity).total_seconds()
+            silence_duration = time.monotonic() - self.last_activity
             return silence_duration > self.silence_timeout
         return False
         
     async def handle_silence_timeout(self) -> Optional[str]:
         """Handle silence timeout with gentle prompt"""
         if self.should_prompt_user():
-            prompt_message = "I'm here when you're ready to continue. Would you like me to repeat the question?"
-            await self._save_conversation_message("ai", prompt_message)
-            return prompt_message
+            await self._save_conversation_message("ai", SILENCE_PROMPT)
+            return SILENCE_PROMPT
         return None
 
 class AIMeetingOrchestrator:
     """Main orchestrator for AI meeting participation"""
     
     def __init__(self):
-        self.active_conversations: Dict[str, ConversationFlow] = {}
-        self.scheduled_joins: Dict[str, asyncio.Task] = {}
-        
-    async def schedule_ai_join(self, meeting_id: str, scheduled_time: datetime, room_id: str, lead_data: Optional[Dict[str, Any]] = None):
-        """Schedule AI to join a meeting at the specified time"""
-        
-        async def join_at_scheduled_time():
-            # Wait until scheduled time
-            now = datetime.now()
-            if scheduled_time > now:
-                wait_seconds = (scheduled_time - now).total_seconds()
-                await asyncio.sleep(wait_seconds)
-                
-            # Join the meeting
-            await self.join_scheduled_meeting(meeting_id, room_id, lead_data)
-            
-        task = asyncio.create_task(join_at_scheduled_time())
-        self.scheduled_joins[meeting_id] = task
+        self.active_conversations: "OrderedDict[str, ConversationFlow]" = OrderedDict()
+        self._schedule_changed = asyncio.Event()
+        
+    async def schedule_ai_join(self, meeting_id: str, scheduled_time: datetime):
+        """Let the join scheduler know a meeting was scheduled or moved"""
+        # The meeting row itself is the schedule; just wake the scheduler to re-check
+        self._schedule_changed.set()
         
         logger.info(f"Scheduled AI to join meeting {meeting_id} at {scheduled_time}")
         
+    async def _next_due_meeting(self) -> Optional[Dict[str, Any]]:
+        """Earliest scheduled meeting the AI has not joined yet"""
+        response = await run_query(
+            supabase.table("scheduled_meetings")
+            .select("id, meeting_room_id, scheduled_time")
+            .eq("status", MeetingStatus.SCHEDULED.value)
+            .is_("ai_joined_at", "null")
+            .gte("scheduled_time", (datetime.now(timezone.utc) - JOIN_GRACE_PERIOD).isoformat())
+            .order("scheduled_time")
+            .limit(1)
+        )
+        return response.data[0] if response.data else None
+        
+    async def _claim_meeting(self, meeting_id: str) -> bool:
+        """Mark a due meeting as taken so no other worker (or loop pass) joins it too"""
+        response = await run_query(
+            supabase.table("scheduled_meetings")
+            .update({"ai_joined_at": datetime.now(timezone.utc).isoformat()})
+            .eq("id", meeting_id)
+            .is_("ai_joined_at", "null")
+        )
+        return bool(response.data)
+        
+    async def run_join_scheduler(self):
+        """Single background loop that joins scheduled meetings as they come due"""
+        while True:
+            try:
+                meeting = await self._next_due_meeting()
+                
+                if meeting:
+                    scheduled_time = datetime.fromisoformat(meeting["scheduled_time"].replace("Z", "+00:00"))
+                    wait_seconds = (scheduled_time - datetime.now(timezone.utc)).total_seconds()
+                else:
+                    wait_seconds = JOIN_SCHEDULER_MAX_SLEEP_SECONDS
+                
+                if wait_seconds > 0:
+                    # Sleep until the meeting is due, waking early if the schedule changes
+                    try:
+                        await asyncio.wait_for(
+                            self._schedule_changed.wait(),
+                            timeout=min(wait_seconds, JOIN_SCHEDULER_MAX_SLEEP_SECONDS)
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                    self._schedule_changed.clear()
+                    continue
+                
+                if await self._claim_meeting(meeting["id"]):
+                    _spawn(self.join_scheduled_meeting(meeting["id"], meeting["meeting_room_id"]))
+                    
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"AI join scheduler error: {e}")
+                await asyncio.sleep(JOIN_SCHEDULER_MAX_SLEEP_SECONDS)
+        
     async def join_scheduled_meeting(self, meeting_id: str, room_id: str, lead_data: Optional[Dict[str, Any]] = None) -> bool:
         """AI joins a scheduled meeting"""
         try:
             # Get meeting details
-            meeting_response = supabase.table("scheduled_meetings").select("*").eq("id", meeting_id).execute()
+            meeting_response = await run_query(supabase.table("scheduled_meetings").select("*").eq("id", meeting_id))
             
             if not meeting_response.data:
                 logger.error(f"Meeting {meeting_id} not found")
@@ -362,7 +549,7 @@ class AIMeetingOrchestrator:
             
             # Get lead data if not provided
             if not lead_data:
-                lead_response = supabase.table("leads").select("*").eq("id", meeting_data["lead_id"]).execute()
+                lead_response = await run_query(supabase.table("leads").select("*").eq("id", meeting_data["lead_id"]))
                 
                 if not lead_response.data:
                     logger.error(f"Lead {meeting_data['lead_id']} not found")
@@ -376,13 +563,13 @@ class AIMeetingOrchestrator:
             # Initialize conversation flow
             conversation = ConversationFlow(meeting_id, room_id)
             await conversation.initialize(lead_data, meeting_data.get("question_set_id"))
-            self.active_conversations[meeting_id] = conversation
+            self._register_conversation(meeting_id, conversation)
             
             # Update meeting status
-            supabase.table("scheduled_meetings").update({
+            await run_query(supabase.table("scheduled_meetings").update({
                 "status": MeetingStatus.ACTIVE.value,
                 "ai_joined_at": datetime.now().isoformat()
-            }).eq("id", meeting_id).execute()
+            }).eq("id", meeting_id))
             
             # Announce AI joining
             await enhanced_manager.broadcast_to_room(room_id, {
@@ -393,6 +580,7 @@ class AIMeetingOrchestrator:
             # Create AI voice participant
             from .ai_voice_participant import create_ai_voice_participant
             ai_voice_participant = await create_ai_voice_participant(meeting_id, room_id)
+            conversation.voice_participant = ai_voice_participant
             
             # Join meeting with voice capabilities
             await ai_voice_participant.join_meeting()
@@ -404,7 +592,7 @@ class AIMeetingOrchestrator:
             await ai_voice_participant.speak_message(opening_message)
             
             # Start monitoring conversation flow
-            asyncio.create_task(self._monitor_conversation_flow(meeting_id, room_id))
+            _spawn(self._monitor_conversation_flow(meeting_id, room_id))
             
             logger.info(f"AI successfully joined meeting {meeting_id}")
             return True
@@ -413,19 +601,46 @@ class AIMeetingOrchestrator:
             logger.error(f"Failed to join meeting {meeting_id}: {e}")
             return False
             
-    async def _wait_for_participants(self, room_id: str, timeout_minutes: int = 10):
-        """Wait for human participants to join the meeting"""
-        timeout_time = datetime.now() + timedelta(minutes=timeout_minutes)
+    def _register_conversation(self, meeting_id: str, conversation: ConversationFlow):
+        """Track a conversation, evicting the least recently started ones past the cap"""
+        self.active_conversations[meeting_id] = conversation
+        self.active_conversations.move_to_end(meeting_id)
         
-        while datetime.now() < timeout_time:
-            participants = await enhanced_manager.get_room_participants(room_id)
-            human_participants = [p for p in participants if p["participant_type"] == "human"]
+        while len(self.active_conversations) > MAX_ACTIVE_CONVERSATIONS:
+            evicted_id, evicted = self.active_conversations.popitem(last=False)
+            logger.warning(f"Too many active conversations; evicting meeting {evicted_id}")
+            self._retire_conversation(evicted)
             
-            if human_participants:
-                logger.info(f"Found {len(human_participants)} human participants in room {room_id}")
-                return True
-                
-            await asyncio.sleep(5)  # Check every 5 seconds
+    def _retire_conversation(self, conversation: ConversationFlow):
+        """Complete a dropped conversation so its analysis is saved and its background loops stop"""
+        if conversation.state != ConversationState.COMPLETED:
+            _spawn(conversation._complete_conversation())
+        if conversation.voice_participant:
+            from .ai_voice_participant import remove_ai_voice_participant
+            _spawn(remove_ai_voice_participant(conversation.meeting_id))
+            
+    async def run_conversation_janitor(self):
+        """Periodically drop conversations that finished without cleanup or went quiet"""
+        while True:
+            await asyncio.sleep(CONVERSATION_JANITOR_INTERVAL_SECONDS)
+            
+            now = time.monotonic()
+            stale_ids = [
+                meeting_id for meeting_id, conversation in self.active_conversations.items()
+                if conversation.state == ConversationState.COMPLETED
+                or now - conversation.last_activity > STALE_CONVERSATION_SECONDS
+            ]
+            for meeting_id in stale_ids:
+                conversation = self.active_conversations.pop(meeting_id, None)
+                if conversation:
+                    logger.warning(f"Cleaning up stale conversation for meeting {meeting_id}")
+                    self._retire_conversation(conversation)
+            
+    async def _wait_for_participants(self, room_id: str, timeout_minutes: int = 10):
+        """Wait for human participants to join the meeting"""
+        if await enhanced_manager.wait_for_human_participant(room_id, timeout=timeout_minutes * 60):
+            logger.info(f"Human participant present in room {room_id}")
+            return True
             
         logger.warning(f"No human participants found in room {room_id} after {timeout_minutes} minutes")
         return False
@@ -437,7 +652,9 @@ class AIMeetingOrchestrator:
             return
             
         while conversation.state != ConversationState.COMPLETED:
-            await asyncio.sleep(2)  # Check every 2 seconds
+            # Sleep until the user speaks; only a full silent period can need a prompt
+            if await conversation.wait_for_activity(conversation.silence_timeout):
+                continue
             
             # Check for silence timeout
             prompt_message = await conversation.handle_silence_timeout()
@@ -448,9 +665,13 @@ class AIMeetingOrchestrator:
                     "is_prompt": True
                 })
                 
-        # Clean up when conversation is complete
-        if meeting_id in self.active_conversations:
+        # Clean up when conversation is complete. The closing message was queued in the same step
+        # that completed the conversation, so let it play out before the participant leaves.
+        # If the entry is already gone, whoever removed it also removed the participant.
+        if self.active_conversations.get(meeting_id) is conversation:
             del self.active_conversations[meeting_id]
+            from .ai_voice_participant import remove_ai_voice_participant
+            await remove_ai_voice_participant(meeting_id, drain=True)
             
     async def process_user_message(self, meeting_id: str, room_id: str, user_message: str, user_id: str) -> Optional[str]:
         """Process user message and generate AI response"""
@@ -489,14 +710,18 @@ class AIMeetingOrchestrator:
         if conversation.state != ConversationState.COMPLETED:
             await conversation._complete_conversation()
             
-        # Generate final analysis
-        analysis = await gemini_service.analyze_conversation(
-            conversation.conversation_history, conversation.lead_data
-        )
+        # Reuse the analysis _analyze_and_complete produces; only run one here if it failed or stalled
+        analysis = await conversation.wait_for_analysis(ANALYSIS_WAIT_TIMEOUT_SECONDS)
+        if analysis is None:
+            analysis = await gemini_service.analyze_conversation(
+                conversation.conversation_history, conversation.lead_data
+            )
         
         # Clean up
         if meeting_id in self.active_conversations:
             del self.active_conversations[meeting_id]
+        from .ai_voice_participant import remove_ai_voice_participant
+        await remove_ai_voice_participant(meeting_id)
             
         return analysis
 
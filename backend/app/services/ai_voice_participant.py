@@ -6,23 +6,104 @@ Creates a virtual AI participant that can speak in WebRTC meetings using Camb.ai
 
 import asyncio
 import logging
-import base64
-from typing import Dict, Any, Optional
+import weakref
+from typing import Dict, Any, Optional, Set
 import json
 from ..signaling import enhanced_manager, ParticipantType
 from .voice_ai_service import voice_ai_service
+from ..utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+AI_JOIN_GREETING = "Hello! I'm your AI meeting assistant. I'm here to learn about your business and help qualify this opportunity. Let's get started!"
+
+# Speech is broadcast in segments as it is synthesized: a small first segment so
+# playback starts quickly, then doubling sizes to keep the message count low
+FIRST_AUDIO_SEGMENT_BYTES = 4096
+MAX_AUDIO_SEGMENT_BYTES = 65536
+
+# Utterances waiting to be spoken per participant; producers wait once this many are queued
+SPEECH_QUEUE_MAX_MESSAGES = 16
+# Longest a departing participant waits for its queued messages to finish playing
+SPEECH_DRAIN_TIMEOUT_SECONDS = 60
+
+# Segments of recently spoken phrases as [audio bytes, base64 or None, seconds], keyed like
+# voice_ai_service's audio cache, so repeated lines skip both synthesis and re-encoding
+_speech_segment_cache = TTLCache(maxsize=128, ttl=24 * 3600)
+
+def _mp3_frame_boundary(buffer: bytearray, start: int) -> int:
+    """Offset of the first MP3 frame header at or after start, or len(buffer) if none yet"""
+    index = buffer.find(b"\xff", start)
+    while index != -1 and index + 1 < len(buffer):
+        if buffer[index + 1] & 0xE0 == 0xE0:
+            return index
+        index = buffer.find(b"\xff", index + 1)
+    return len(buffer)
+
+# MPEG audio layer III tables used to work out clip durations
+_MP3_BITRATES_KBPS = {
+    "v1": (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    "v2": (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+def _mp3_duration_seconds(audio: bytes) -> float:
+    """Play time of an MP3 clip, summed from its frame headers (0.0 if none are found)"""
+    position = 0
+    # Skip an ID3v2 tag if present
+    if audio[:3] == b"ID3" and len(audio) >= 10:
+        position = 10 + ((audio[6] & 0x7F) << 21 | (audio[7] & 0x7F) << 14 | (audio[8] & 0x7F) << 7 | (audio[9] & 0x7F))
+    
+    duration = 0.0
+    while position + 4 <= len(audio):
+        b1, b2 = audio[position + 1], audio[position + 2]
+        version = (b1 >> 3) & 0x03
+        bitrate_index = b2 >> 4
+        sample_rate_index = (b2 >> 2) & 0x03
+        is_frame = (
+            audio[position] == 0xFF and b1 & 0xE0 == 0xE0
+            and version != 1 and (b1 >> 1) & 0x03 == 1  # known version, layer III
+            and 0 < bitrate_index < 15 and sample_rate_index < 3
+        )
+        if not is_frame:
+            next_sync = audio.find(b"\xff", position + 1)
+            if next_sync == -1:
+                break
+            position = next_sync
+            continue
+        
+        bitrate = _MP3_BITRATES_KBPS["v1" if version == 3 else "v2"][bitrate_index] * 1000
+        sample_rate = _MP3_SAMPLE_RATES[version][sample_rate_index]
+        samples_per_frame = 1152 if version == 3 else 576
+        padding = (b2 >> 1) & 0x01
+        
+        duration += samples_per_frame / sample_rate
+        position += samples_per_frame // 8 * bitrate // sample_rate + padding
+    
+    return duration
+
 class AIVoiceParticipant:
     """AI participant that can speak in meetings using Camb.ai TTS"""
     
     def __init__(self, meeting_id: str, room_id: str):
         self.meeting_id = meeting_id
         self.room_id = room_id
-        self.is_speaking = False
         self.voice_id = "en-US-AriaNeural"  # Professional female voice
         self.speaking_speed = 1.0
+        # Held from the start of an utterance until its audio has finished playing
+        self._speaking_lock = asyncio.Lock()
+        self._speech_queue: asyncio.Queue = asyncio.Queue(maxsize=SPEECH_QUEUE_MAX_MESSAGES)
+        self._speech_consumer: Optional[asyncio.Task] = None
+        # Timer that ends the current utterance once its audio has played, and the
+        # "speaking finished" broadcasts it starts (kept so they aren't collected mid-send)
+        self._finish_handle: Optional[asyncio.TimerHandle] = None
+        self._broadcast_tasks: Set[asyncio.Task] = set()
+        self._closed = False
+    
+    @property
+    def is_speaking(self) -> bool:
+        """Whether an utterance is being synthesized or is still playing"""
+        return self._speaking_lock.locked()
         
     async def join_meeting(self):
         """Join the meeting as an AI voice participant"""
@@ -42,7 +123,7 @@ class AIVoiceParticipant:
                 logger.info(f"AI voice participant joined meeting {self.meeting_id}")
                 
                 # Announce AI joining with voice
-                await self._speak_message("Hello! I'm your AI meeting assistant. I'm here to learn about your business and help qualify this opportunity. Let's get started!")
+                await self.speak_message(AI_JOIN_GREETING)
                     
             return success
             
@@ -51,51 +132,70 @@ class AIVoiceParticipant:
             return False
     
     async def speak_message(self, text: str):
-        """Public method to make AI speak a message"""
-        await self._speak_message(text)
+        """Public method to make AI speak a message; queued behind any earlier ones"""
+        if self._closed:
+            logger.warning(f"AI voice participant for meeting {self.meeting_id} has left; not speaking: {text[:50]}")
+            return
+        if self._speech_consumer is None or self._speech_consumer.done():
+            self._speech_consumer = asyncio.create_task(self._consume_speech_queue())
+        await self._speech_queue.put(text)
+    
+    async def _consume_speech_queue(self):
+        """Speak queued messages one at a time, in order"""
+        while True:
+            text = await self._speech_queue.get()
+            try:
+                await self._speak_message(text)
+            finally:
+                self._speech_queue.task_done()
+    
+    async def drain(self, timeout: float = SPEECH_DRAIN_TIMEOUT_SECONDS) -> bool:
+        """Wait until queued messages have been spoken and the last one has finished playing;
+        False if the timeout passes first"""
+        async def _wait_until_quiet():
+            await self._speech_queue.join()
+            # The finish timer holds the lock until the last clip has played
+            async with self._speaking_lock:
+                pass
+        
+        try:
+            await asyncio.wait_for(_wait_until_quiet(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"AI voice participant for meeting {self.meeting_id} still speaking after {timeout}s")
+            return False
+        return True
+    
+    async def close(self):
+        """Stop speaking and drop any queued messages"""
+        self._closed = True
+        if self._speech_consumer and not self._speech_consumer.done():
+            self._speech_consumer.cancel()
+        self._speech_consumer = None
+        # Don't tell the room we finished speaking after we've left it
+        if self._finish_handle is not None:
+            self._finish_handle.cancel()
+            self._finish_handle = None
+            self._speaking_lock.release()
     
     async def _speak_message(self, text: str):
         """Convert text to speech and broadcast to meeting"""
+        # Wait for the previous utterance to finish playing
+        await self._speaking_lock.acquire()
+        finish_scheduled = False
+        
         try:
-            if self.is_speaking:
-                logger.warning("AI is already speaking, queuing message")
-                await asyncio.sleep(1)  # Wait for current speech to finish
-                
-            self.is_speaking = True
             logger.info(f"AI speaking: {text[:100]}...")
             
-            # Generate speech audio using Camb.ai
-            audio_data = await voice_ai_service.text_to_speech(
-                text, 
-                voice_id=self.voice_id,
-                speed=self.speaking_speed
-            )
+            # Generate speech audio using Camb.ai, broadcasting segments as they arrive
+            speaking_duration = await self._stream_speech(text)
             
-            if audio_data:
-                # Convert audio to base64 for transmission
-                audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-                
-                # Broadcast AI speaking with audio
-                await enhanced_manager.broadcast_to_room(self.room_id, {
-                    "type": "ai_voice_message",
-                    "message": text,
-                    "audio_data": audio_base64,
-                    "audio_format": "mp3",
-                    "voice_id": self.voice_id,
-                    "from_user": "ai-assistant",
-                    "timestamp": asyncio.get_event_loop().time()
-                })
-                
-                # Calculate speaking duration based on audio length
-                # Rough estimate: 1 second per 150 characters
-                speaking_duration = max(len(text) / 150, 2.0)  # Minimum 2 seconds
-                await asyncio.sleep(speaking_duration)
-                
-                # Broadcast speaking finished
-                await enhanced_manager.broadcast_to_room(self.room_id, {
-                    "type": "ai_speaking_finished",
-                    "from_user": "ai-assistant"
-                })
+            if speaking_duration is not None:
+                # Signal the end of speech once the clip has played, without holding this coroutine
+                if not speaking_duration:
+                    # Rough estimate: 1 second per 150 characters
+                    speaking_duration = max(len(text) / 150, 2.0)  # Minimum 2 seconds
+                self._finish_handle = asyncio.get_running_loop().call_later(speaking_duration, self._finish_speaking)
+                finish_scheduled = True
                 
             else:
                 logger.error("Failed to generate speech audio")
@@ -106,11 +206,98 @@ class AIVoiceParticipant:
                     "from_user": "ai-assistant"
                 })
             
-            self.is_speaking = False
-            
         except Exception as e:
             logger.error(f"AI speaking error: {e}")
-            self.is_speaking = False
+        finally:
+            if not finish_scheduled:
+                self._speaking_lock.release()
+    
+    def _finish_speaking(self):
+        """Mark playback finished: free the next utterance and tell the room"""
+        self._finish_handle = None
+        self._speaking_lock.release()
+        task = asyncio.create_task(enhanced_manager.broadcast_to_room(self.room_id, {
+            "type": "ai_speaking_finished",
+            "from_user": "ai-assistant"
+        }))
+        self._broadcast_tasks.add(task)
+        task.add_done_callback(self._broadcast_tasks.discard)
+    
+    async def _stream_speech(self, text: str) -> Optional[float]:
+        """Broadcast synthesized speech in progressively larger MP3 segments; returns its play time,
+        or None if no audio was sent"""
+        cache_key = voice_ai_service.tts_cache_key(text, self.voice_id, self.speaking_speed)
+        cached_segments = _speech_segment_cache.get(cache_key)
+        if cached_segments is not None:
+            for segment_index, segment in enumerate(cached_segments):
+                segment[1] = await self._broadcast_audio_segment(text, segment[0], segment[1], segment_index)
+            await self._broadcast_stream_end(len(cached_segments))
+            return sum(segment[2] for segment in cached_segments)
+        
+        segments = []
+        segment_size = FIRST_AUDIO_SEGMENT_BYTES
+        buffer = bytearray()
+        
+        async for chunk in voice_ai_service.text_to_speech_stream(
+            text,
+            voice_id=self.voice_id,
+            speed=self.speaking_speed
+        ):
+            buffer += chunk
+            while len(buffer) > segment_size:
+                # Cut on a frame header so each segment decodes on its own
+                cut = _mp3_frame_boundary(buffer, segment_size)
+                if cut >= len(buffer):
+                    break
+                # Copy the segment out through a view so the slice isn't materialized twice
+                with memoryview(buffer) as view:
+                    segment = bytes(view[:cut])
+                del buffer[:cut]
+                segments.append(await self._send_new_segment(text, segment, len(segments)))
+                segment_size = min(segment_size * 2, MAX_AUDIO_SEGMENT_BYTES)
+        
+        if buffer:
+            segments.append(await self._send_new_segment(text, bytes(buffer), len(segments)))
+        
+        if not segments:
+            return None
+        
+        await self._broadcast_stream_end(len(segments))
+        
+        # Only keep real audio; the mock fallback clip is never cached upstream either
+        if voice_ai_service.has_cached_speech(cache_key):
+            _speech_segment_cache.set(cache_key, segments)
+        
+        return sum(segment[2] for segment in segments)
+    
+    async def _send_new_segment(self, text: str, audio: bytes, segment_index: int) -> list:
+        """Broadcast a freshly synthesized segment and return its cache entry"""
+        encoded_audio = await self._broadcast_audio_segment(text, audio, None, segment_index)
+        return [audio, encoded_audio, _mp3_duration_seconds(audio)]
+    
+    async def _broadcast_audio_segment(self, text: str, audio: bytes, encoded_audio: Optional[str], segment_index: int) -> Optional[str]:
+        """Send one MP3 segment; the first carries the text, the rest are ai_voice_chunk messages"""
+        message = {
+            "type": "ai_voice_message" if segment_index == 0 else "ai_voice_chunk",
+            "audio_format": "mp3",
+            "chunk_index": segment_index,
+            "voice_id": self.voice_id,
+            "from_user": "ai-assistant"
+        }
+        if segment_index == 0:
+            message["message"] = text
+        # The AI's own placeholder socket doesn't need its audio echoed back
+        return await enhanced_manager.broadcast_audio_to_room(
+            self.room_id, message, audio, encoded_audio, sender_user_id="ai-assistant"
+        )
+    
+    async def _broadcast_stream_end(self, chunk_count: int):
+        """Tell clients the current utterance has no further audio segments"""
+        await enhanced_manager.broadcast_to_room(self.room_id, {
+            "type": "ai_voice_stream_end",
+            "chunk_count": chunk_count,
+            "from_user": "ai-assistant"
+        }, sender_user_id="ai-assistant")
     
     async def process_user_message(self, user_message: str, user_id: str):
         """Process user message and generate AI voice response"""
@@ -125,7 +312,7 @@ class AIVoiceParticipant:
             
             if ai_response:
                 # Speak the AI response
-                await self._speak_message(ai_response)
+                await self.speak_message(ai_response)
                 return ai_response
                 
             return None
@@ -147,7 +334,7 @@ class AIWebSocketMock:
     """Mock WebSocket for AI participant"""
     
     def __init__(self, ai_participant: AIVoiceParticipant):
-        self.ai_participant = ai_participant
+        self.ai_participant = weakref.ref(ai_participant)  # the room must not keep the participant alive
         self.closed = False
         
     async def send_text(self, data: str):
@@ -164,21 +351,26 @@ class AIWebSocketMock:
         self.closed = True
         logger.info(f"AI participant disconnected: {reason}")
 
-# Global AI voice participant manager
-ai_voice_participants: Dict[str, AIVoiceParticipant] = {}
+# Global AI voice participant manager. Entries are weak: the meeting's conversation
+# holds the participant, so one that is never removed explicitly still goes away with it
+ai_voice_participants: "weakref.WeakValueDictionary[str, AIVoiceParticipant]" = weakref.WeakValueDictionary()
 
 async def create_ai_voice_participant(meeting_id: str, room_id: str) -> AIVoiceParticipant:
-    """Create and register an AI voice participant"""
+    """Create and register an AI voice participant; the caller must keep a reference to it"""
     ai_participant = AIVoiceParticipant(meeting_id, room_id)
     ai_voice_participants[meeting_id] = ai_participant
+    weakref.finalize(ai_participant, logger.info, f"AI voice participant for meeting {meeting_id} finalized")
     return ai_participant
 
 async def get_ai_voice_participant(meeting_id: str) -> Optional[AIVoiceParticipant]:
     """Get existing AI voice participant"""
     return ai_voice_participants.get(meeting_id)
 
-async def remove_ai_voice_participant(meeting_id: str):
-    """Remove AI voice participant"""
-    if meeting_id in ai_voice_participants:
-        del ai_voice_participants[meeting_id]
+async def remove_ai_voice_participant(meeting_id: str, drain: bool = False):
+    """Remove AI voice participant, optionally letting it finish what it has queued first"""
+    ai_participant = ai_voice_participants.pop(meeting_id, None)
+    if ai_participant:
+        if drain:
+            await ai_participant.drain()
+        await ai_participant.close()
         logger.info(f"Removed AI voice participant for meeting {meeting_id}")
\ No newline at end of file
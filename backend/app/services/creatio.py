@@ -1,108 +1,287 @@
 # app/services/creatio.py
+import hashlib
 import httpx
 import json
 import logging
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from ..models.schemas import CreatioConfig
 from ..core.config import supabase
+from ..utils.db import run_query
+from ..utils.ttl_cache import TTLCache
 import inspect
 import asyncio
+import random
+import importlib.util
 
 logger = logging.getLogger("app.services.creatio")
 
+# Commentary block appended to a lead after each analysed meeting
+_MEETING_SUMMARY_TEMPLATE = (
+    "AI Meeting Analysis - {timestamp}\n\n"
+    "Key Insights:\n{insights}\n\n"
+    "Pain Points Identified:\n{pain_points}\n\n"
+    "Buying Signals:\n{buying_signals}\n\n"
+    "Lead Score: {score}\n"
+    "Qualification: {qualification}\n"
+    "Priority: {priority}"
+)
+
+
+def _bullet_list(items: List[Any]) -> str:
+    """Render items as one bullet per line"""
+    return "\n".join([f"• {item}" for item in items])
+
+
+# Lead fields pulled into our leads table; owner filtering and paging happen server-side
+LEAD_SELECT_FIELDS = "Id,LeadName,Account,Contact,Email,MobilePhone,BusinesPhone,Website,Address,CreatedOn,ModifiedOn,StatusId,QualifyStatusId,Budget,Score,Commentary,FullJobTitle"
+LEADS_PAGE_SIZE = 200
+
+
+# Shared connection pool for Creatio calls so repeated syncs reuse open
+# connections instead of paying a new TCP/TLS handshake every time
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_creatio_http_client() -> httpx.AsyncClient:
+    """Return the process-wide HTTP client used for Creatio requests"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=30.0,
+            # Transport retries only cover failed connection attempts; CreatioService._request handles the rest
+            transport=httpx.AsyncHTTPTransport(
+                http2=importlib.util.find_spec("h2") is not None,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+                retries=2
+            )
+        )
+    return _http_client
+
+
+async def close_creatio_http_client() -> None:
+    """Close the shared Creatio HTTP client (called on app shutdown)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# OAuth tokens shared by every CreatioService for the same identity server and client
+# credentials, as (access_token, expires_at on the monotonic clock). The key includes a
+# digest of the client secret, so knowing another tenant's client_id is not enough to reuse its token.
+_token_cache: Dict[Tuple[str, str, str], Tuple[str, float]] = {}
+_token_locks: Dict[Tuple[str, str, str], asyncio.Lock] = {}
+# Refresh a little before the identity server's expiry so in-flight requests don't race it
+TOKEN_EXPIRY_MARGIN_SECONDS = 30
+
+# Creatio answers 429/5xx under load; such requests are retried with jittered exponential backoff
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+MAX_REQUEST_RETRIES = 3
+RETRY_BACKOFF_BASE_SECONDS = 0.1
+
+# Per-user Creatio settings change rarely; cleared for a user whenever they save new ones
+_config_cache = TTLCache(maxsize=1000, ttl=300)
+
+# Last known (commentary, etag) per lead, keyed by (base_url, collection, lead id), so an
+# insights update can PATCH with If-Match instead of re-reading the lead first
+_lead_commentary_cache = TTLCache(maxsize=1000, ttl=3600)
+
+
+def _token_cache_key(config: CreatioConfig) -> Tuple[str, str, str]:
+    """Key for a client's cached OAuth token"""
+    secret_digest = hashlib.blake2b(config.client_secret.encode(), digest_size=16).hexdigest()
+    return (config.base_identity_url, config.client_id, secret_digest)
+
+
+def _drop_token(cache_key: Tuple[str, str, str]) -> None:
+    """Forget a client's cached token, and its refresh lock unless a refresh is running"""
+    _token_cache.pop(cache_key, None)
+    lock = _token_locks.get(cache_key)
+    if lock is not None and not lock.locked():
+        del _token_locks[cache_key]
+
+
+def _evict_expired_tokens() -> None:
+    """Drop expired tokens and idle locks of clients that have no live token"""
+    now = time.monotonic()
+    for cache_key in [key for key, (_, expires_at) in _token_cache.items() if expires_at <= now]:
+        del _token_cache[cache_key]
+    for cache_key in [key for key, lock in _token_locks.items() if key not in _token_cache and not lock.locked()]:
+        del _token_locks[cache_key]
+
 
 class CreatioService:
-    def __init__(self, config: CreatioConfig):
+    def __init__(self, config: CreatioConfig, http_client: Optional[httpx.AsyncClient] = None):
         self.config = config
         self.access_token: Optional[str] = None
+        self.http_client = http_client or get_creatio_http_client()
 
     async def get_oauth_token(self) -> str:
-        """Get OAuth token from Creatio identity service"""
-        token_url = f"{self.config.base_identity_url}/connect/token"
-        logger.debug(f"Requesting OAuth token from: {token_url}")
-        logger.debug(f"Client ID: {self.config.client_id}")
+        """Get OAuth token from Creatio identity service, reusing a cached one while it is valid"""
+        cache_key = _token_cache_key(self.config)
+        cached = _token_cache.get(cache_key)
+        if cached and time.monotonic() < cached[1]:
+            self.access_token = cached[0]
+            return self.access_token
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                token_url,
-                data={
-                    "client_id": self.config.client_id,
-                    "client_secret": self.config.client_secret,
-                    "grant_type": "client_credentials"
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-                timeout=30.0
-            )
+        # One request per client refreshes the token; the rest wait and reuse it
+        lock = _token_locks.setdefault(cache_key, asyncio.Lock())
+        async with lock:
+            cached = _token_cache.get(cache_key)
+            if cached and time.monotonic() < cached[1]:
+                self.access_token = cached[0]
+                return self.access_token
 
-            logger.debug(f"OAuth response status: {response.status_code}")
-            logger.debug(f"OAuth response: {response.text[:1000]}")
+            return await self._request_oauth_token(cache_key)
 
-            if response.status_code != 200:
-                raise Exception(f"Failed to get OAuth token (Status {response.status_code}): {response.text}")
+    async def _request_oauth_token(self, cache_key: Tuple[str, str, str]) -> str:
+        """Request a new OAuth token and cache it until shortly before it expires"""
+        token_url = f"{self.config.base_identity_url}/connect/token"
+        logger.debug(f"Requesting OAuth token from: {token_url}")
+        logger.debug(f"Client ID: {self.config.client_id}")
 
-            token_data = response.json()
-            self.access_token = token_data["access_token"]
-            logger.info("Successfully obtained access token")
-            return self.access_token
+        response = await self._request(
+            "POST",
+            token_url,
+            authorized=False,
+            data={
+                "client_id": self.config.client_id,
+                "client_secret": self.config.client_secret,
+                "grant_type": "client_credentials"
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            timeout=30.0
+        )
+
+        logger.debug(f"OAuth response status: {response.status_code}")
+        logger.debug(f"OAuth response: {response.text[:1000]}")
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to get OAuth token (Status {response.status_code}): {response.text}")
+
+        token_data = response.json()
+        self.access_token = token_data["access_token"]
+        expires_in = token_data.get("expires_in", 3600)
+        _evict_expired_tokens()
+        _token_cache[cache_key] = (self.access_token, time.monotonic() + expires_in - TOKEN_EXPIRY_MARGIN_SECONDS)
+        logger.info("Successfully obtained access token")
+        return self.access_token
+
+    async def _request(self, method: str, url: str, *, authorized: bool = True, **kwargs) -> httpx.Response:
+        """Send a Creatio request, retrying transient failures and re-authenticating once on 401"""
+        headers = dict(kwargs.pop("headers", None) or {})
+        reauthenticated = False
+        attempt = 0
+        while True:
+            if authorized:
+                headers["Authorization"] = f"Bearer {self.access_token}"
+            try:
+                response = await self.http_client.request(method, url, headers=headers, **kwargs)
+            except httpx.TransportError as e:
+                if attempt >= MAX_REQUEST_RETRIES:
+                    raise
+                logger.warning(f"Creatio {method} {url} failed ({e!r}), retrying")
+            else:
+                if response.status_code == 401 and authorized and not reauthenticated:
+                    # The token was revoked or expired early; drop it unless another request already replaced it
+                    reauthenticated = True
+                    cache_key = _token_cache_key(self.config)
+                    cached = _token_cache.get(cache_key)
+                    if cached and cached[0] == self.access_token:
+                        _drop_token(cache_key)
+                    await self.get_oauth_token()
+                    continue
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= MAX_REQUEST_RETRIES:
+                    return response
+                logger.warning(f"Creatio {method} {url} returned {response.status_code}, retrying")
+
+            attempt += 1
+            await asyncio.sleep(random.uniform(0, RETRY_BACKOFF_BASE_SECONDS * 2 ** attempt))
 
     async def get_leads_by_owner_email(self, owner_email: str) -> List[Dict]:
         """Fetch leads from Creatio based on lead owner's email"""
         if not self.access_token:
             await self.get_oauth_token()
 
-        # Select important fields from Creatio Lead entity
-        select_query = "$select=Id,LeadName,Account,Contact,Email,MobilePhone,BusinesPhone,Website,Address,CreatedOn,ModifiedOn,StatusId,QualifyStatusId,Budget,Score,Commentary,FullJobTitle"
-
-        # For now, get all leads since Owner filtering might need different approach
-        url = f"{self.config.base_url}/0/odata/{self.config.collection_name}?{select_query}"
+        # OData string literals escape a single quote by doubling it
+        owner_literal = owner_email.replace("'", "''")
+        params = {
+            "$select": LEAD_SELECT_FIELDS,
+            "$filter": f"Owner/Email eq '{owner_literal}'",
+            # $skip paging needs a stable order; ModifiedOn moves leads edited mid-sync between pages
+            "$orderby": "CreatedOn asc,Id asc",
+            "$top": str(LEADS_PAGE_SIZE),
+        }
+        url = f"{self.config.base_url}/0/odata/{self.config.collection_name}"
 
         logger.debug(f"Creatio API URL: {url}")
         logger.debug(f"Using collection: {self.config.collection_name}")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
+        leads: List[Dict] = []
+        skip = 0
+        next_link: Optional[str] = None
+        while True:
+            if next_link:
+                # nextLink already carries the query, including the server's paging token
+                page_url, page_params = next_link, None
+            else:
+                page_url, page_params = url, {**params, "$skip": str(skip)} if skip else params
+            response = await self._request(
+                "GET",
+                page_url,
+                params=page_params,
                 headers={
-                    "Accept": "application/json",
-                    "Authorization": f"Bearer {self.access_token}"
+                    "Accept": "application/json"
                 },
                 timeout=30.0
             )
 
             logger.debug(f"Creatio API response status: {response.status_code}")
-            logger.debug(f"Creatio API response (truncated): {response.text[:500]}...")
 
             if response.status_code != 200:
                 raise Exception(f"Failed to fetch leads (Status {response.status_code}): {response.text}")
 
-            data = response.json()
-            return data.get("value", [])
+            body = response.json()
+            page = body.get("value", [])
+            leads.extend(page)
+            # Server-driven paging takes precedence; otherwise keep skipping until a page comes
+            # back empty, since the server may cap pages below LEADS_PAGE_SIZE
+            if body.get("@odata.nextLink"):
+                next_link = str(httpx.URL(next_link or url).join(body["@odata.nextLink"]))
+            elif next_link or not page:
+                return leads
+            else:
+                skip += len(page)
 
     def transform_creatio_lead(self, creatio_lead: Dict) -> Dict:
         """Transform Creatio lead format to our internal format"""
+        # Called once per lead on bulk syncs, so this stays a literal dict over a bound get
+        get = creatio_lead.get
+        lead_name = get("LeadName", "")
+        contact_name = get("Contact", "")
         return {
-            "name": creatio_lead.get("LeadName", "") or creatio_lead.get("Contact", ""),
-            "email": creatio_lead.get("Email", ""),
-            "business_phone": creatio_lead.get("MobilePhone", "") or creatio_lead.get("BusinesPhone", ""),
-            "company": creatio_lead.get("Account", ""),
+            "name": lead_name or contact_name,
+            "email": get("Email", ""),
+            "business_phone": get("MobilePhone", "") or get("BusinesPhone", ""),
+            "company": get("Account", ""),
             "status": "new",  # We'll map StatusId later if needed
-            "external_id": creatio_lead.get("Id", ""),
+            "external_id": get("Id", ""),
             "source": "creatio",
             # Additional Creatio fields
-            "lead_name": creatio_lead.get("LeadName", ""),
-            "contact_name": creatio_lead.get("Contact", ""),
-            "business_phone": creatio_lead.get("BusinesPhone", ""),
-            "website": creatio_lead.get("Website", ""),
-            "address": creatio_lead.get("Address", ""),
-            "job_title": creatio_lead.get("FullJobTitle", ""),
-            "budget": creatio_lead.get("Budget", 0),
-            "score": creatio_lead.get("Score", 0),
-            "commentary": creatio_lead.get("Commentary", ""),
-            "creatio_created_on": creatio_lead.get("CreatedOn", ""),
-            "creatio_modified_on": creatio_lead.get("ModifiedOn", ""),
-            "status_id": creatio_lead.get("StatusId", ""),
-            "qualify_status_id": creatio_lead.get("QualifyStatusId", "")
+            "lead_name": lead_name,
+            "contact_name": contact_name,
+            "website": get("Website", ""),
+            "address": get("Address", ""),
+            "job_title": get("FullJobTitle", ""),
+            "budget": get("Budget", 0),
+            "score": get("Score", 0),
+            "commentary": get("Commentary", ""),
+            "creatio_created_on": get("CreatedOn", ""),
+            "creatio_modified_on": get("ModifiedOn", ""),
+            "status_id": get("StatusId", ""),
+            "qualify_status_id": get("QualifyStatusId", "")
         }
 
     async def update_lead_with_meeting_insights(self, lead_external_id: str, meeting_analysis: Dict[str, Any]) -> bool:
@@ -112,6 +291,10 @@ class CreatioService:
             await self.get_oauth_token()
 
         try:
+            # The lead's commentary and ETag may already be known from an earlier read or write
+            cache_key = (self.config.base_url, self.config.collection_name, lead_external_id)
+            cached_commentary = _lead_commentary_cache.get(cache_key)
+
             # Prepare update data for Creatio
             update_data = {}
 
@@ -132,55 +315,146 @@ class CreatioService:
             pain_points = meeting_analysis.get("pain_points", []) or []
             buying_signals = meeting_analysis.get("buying_signals", []) or []
 
-            meeting_summary = f"""
-AI Meeting Analysis - {datetime.now().strftime('%Y-%m-%d %H:%M')}
-
-Key Insights:
-{chr(10).join(f"• {insight}" for insight in insights)}
-
-Pain Points Identified:
-{chr(10).join(f"• {pain}" for pain in pain_points)}
-
-Buying Signals:
-{chr(10).join(f"• {signal}" for signal in buying_signals)}
-
-Lead Score: {enhanced_scoring.get('new_lead_score', 'N/A')}
-Qualification: {qualification_status}
-Priority: {enhanced_scoring.get('priority_level', 'medium')}
-            """.strip()
-
-            # Get current commentary and append
-            current_lead = await self.get_lead_by_id(lead_external_id)
-            if current_lead and current_lead.get("Commentary"):
-                update_data["Commentary"] = current_lead["Commentary"] + "\n\n" + meeting_summary
-            else:
-                update_data["Commentary"] = meeting_summary
+            meeting_summary = _MEETING_SUMMARY_TEMPLATE.format(
+                timestamp=datetime.now().strftime('%Y-%m-%d %H:%M'),
+                insights=_bullet_list(insights),
+                pain_points=_bullet_list(pain_points),
+                buying_signals=_bullet_list(buying_signals),
+                score=enhanced_scoring.get('new_lead_score', 'N/A'),
+                qualification=qualification_status,
+                priority=enhanced_scoring.get('priority_level', 'medium')
+            )
 
             # Make update request to Creatio
             url = f"{self.config.base_url}/0/odata/{self.config.collection_name}(guid'{lead_external_id}')"
 
-            async with httpx.AsyncClient() as client:
-                response = await client.patch(
-                    url,
-                    json=update_data,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Authorization": f"Bearer {self.access_token}"
-                    },
-                    timeout=30.0
-                )
-
-                if response.status_code in [200, 204]:
-                    logger.info(f"Successfully updated Creatio lead {lead_external_id} with meeting insights")
-                    return True
+            for attempt in range(2):
+                if cached_commentary is None:
+                    cached_commentary = await self._get_lead_commentary(lead_external_id)
+
+                # Get current commentary and append
+                current_commentary, etag = cached_commentary
+                if current_commentary:
+                    update_data["Commentary"] = current_commentary + "\n\n" + meeting_summary
+                else:
+                    update_data["Commentary"] = meeting_summary
+
+                headers = {
+                    "Content-Type": "application/json",
+                    "Prefer": "return=minimal"
+                }
+                if etag:
+                    headers["If-Match"] = etag
+
+                response = await self._request("PATCH", url, json=update_data, headers=headers, timeout=30.0)
+
+                if response.status_code == 412 and attempt == 0:
+                    # The lead changed since we cached it; re-read and try once more
+                    logger.info(f"Creatio lead {lead_external_id} changed since last read, refetching")
+                    _lead_commentary_cache.pop(cache_key)
+                    cached_commentary = None
+                    continue
+                break
+
+            if response.status_code in [200, 204]:
+                new_etag = response.headers.get("ETag")
+                if new_etag:
+                    _lead_commentary_cache.set(cache_key, (update_data["Commentary"], new_etag))
                 else:
-                    logger.error(f"Failed to update Creatio lead: {response.status_code} - {response.text}")
-                    return False
+                    _lead_commentary_cache.pop(cache_key)
+                logger.info(f"Successfully updated Creatio lead {lead_external_id} with meeting insights")
+                return True
+            else:
+                _lead_commentary_cache.pop(cache_key)
+                logger.error(f"Failed to update Creatio lead: {response.status_code} - {response.text}")
+                return False
 
         except Exception as e:
             logger.exception(f"Error updating Creatio lead with meeting insights: {str(e)}")
             return False
 
+    async def batch_update_leads(self, updates: List[Tuple[str, Dict[str, Any]]]) -> List[bool]:
+        """PATCH several leads in one OData $batch request; returns per-lead success"""
+
+        if not updates:
+            return []
+
+        if not self.access_token:
+            await self.get_oauth_token()
+
+        try:
+            batch_requests = [
+                {
+                    "id": str(index),
+                    "method": "PATCH",
+                    "url": f"{self.config.collection_name}(guid'{lead_id}')",
+                    "headers": {"Content-Type": "application/json", "Prefer": "return=minimal"},
+                    "body": update_data
+                }
+                for index, (lead_id, update_data) in enumerate(updates)
+            ]
+            # These writes change the leads' ETags, so cached ones would only cause a 412 later
+            for lead_id, _ in updates:
+                _lead_commentary_cache.pop((self.config.base_url, self.config.collection_name, lead_id))
+
+            response = await self._request(
+                "POST",
+                f"{self.config.base_url}/0/odata/$batch",
+                json={"requests": batch_requests},
+                headers={
+                    "Accept": "application/json"
+                },
+                timeout=60.0
+            )
+
+            if response.status_code != 200:
+                logger.error(f"Creatio batch update failed: {response.status_code} - {response.text}")
+                return [False] * len(updates)
+
+            statuses = {
+                item.get("id"): item.get("status")
+                for item in response.json().get("responses", [])
+            }
+            results = [statuses.get(str(index)) in (200, 204) for index in range(len(updates))]
+            logger.info(f"Creatio batch update: {sum(results)}/{len(updates)} leads updated")
+            return results
+
+        except Exception as e:
+            logger.exception(f"Error batch updating Creatio leads: {str(e)}")
+            return [False] * len(updates)
+
+    async def _get_lead_commentary(self, lead_id: str) -> Tuple[Optional[str], Optional[str]]:
+        """Fetch only the Commentary field of a lead, as (commentary, etag)"""
+
+        try:
+            url = f"{self.config.base_url}/0/odata/{self.config.collection_name}(guid'{lead_id}')"
+
+            response = await self._request(
+                "GET",
+                url,
+                params={"$select": "Commentary"},
+                headers={
+                    "Accept": "application/json"
+                },
+                timeout=30.0
+            )
+
+            if response.status_code == 200:
+                lead = response.json()
+                commentary = lead.get("Commentary")
+                etag = response.headers.get("ETag") or lead.get("@odata.etag")
+                if etag:
+                    _lead_commentary_cache.set(
+                        (self.config.base_url, self.config.collection_name, lead_id), (commentary, etag)
+                    )
+                return commentary, etag
+            logger.error(f"Failed to get Creatio lead commentary: {response.status_code} - {response.text}")
+            return None, None
+
+        except Exception as e:
+            logger.exception(f"Error getting Creatio lead commentary: {str(e)}")
+            return None, None
+
     async def get_lead_by_id(self, lead_id: str) -> Optional[Dict]:
         """Get a specific lead by ID from Creatio"""
 
@@ -190,21 +464,20 @@ Priority: {enhanced_scoring.get('priority_level', 'medium')}
         try:
             url = f"{self.config.base_url}/0/odata/{self.config.collection_name}(guid'{lead_id}')"
 
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    headers={
-                        "Accept": "application/json",
-                        "Authorization": f"Bearer {self.access_token}"
-                    },
-                    timeout=30.0
-                )
-
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    logger.error(f"Failed to get Creatio lead: {response.status_code} - {response.text}")
-                    return None
+            response = await self._request(
+                "GET",
+                url,
+                headers={
+                    "Accept": "application/json"
+                },
+                timeout=30.0
+            )
+
+            if response.status_code == 200:
+                return response.json()
+            else:
+                logger.error(f"Failed to get Creatio lead: {response.status_code} - {response.text}")
+                return None
 
         except Exception as e:
             logger.exception(f"Error getting Creatio lead: {str(e)}")
@@ -235,41 +508,80 @@ Priority: {enhanced_scoring.get('priority_level', 'medium')}
 
 async def get_user_creatio_config(user_id: str) -> Optional[CreatioConfig]:
     """Get user's Creatio configuration from database"""
+    cached = _config_cache.get(user_id)
+    if cached is not None:
+        return cached
+
     try:
-        # Note: supabase client here is synchronous; if it becomes blocking you can run it in an executor
-        response = supabase.table("creatio_configs").select("*").eq("user_id", user_id).execute()
+        response = await run_query(supabase.table("creatio_configs").select("*").eq("user_id", user_id))
         if response.data:
             config_data = response.data[0]
-            return CreatioConfig(
+            config = CreatioConfig(
                 base_url=config_data["base_url"],
                 base_identity_url=config_data["base_identity_url"],
                 client_id=config_data["client_id"],
                 client_secret=config_data["client_secret"],
                 collection_name=config_data.get("collection_name", "LeadCollection")
             )
+            _config_cache.set(user_id, config)
+            return config
         return None
     except Exception:
         logger.exception("Error fetching user creatio config")
         return None
 
 
+def invalidate_user_creatio_config(user_id: str) -> None:
+    """Drop a user's cached Creatio configuration, and the token issued for it, after it changes"""
+    config = _config_cache.get(user_id)
+    if config is not None:
+        _drop_token(_token_cache_key(config))
+    _config_cache.pop(user_id)
+
+
 # Module-level wrapper so other modules can import this function directly
-async def sync_meeting_insights_to_creatio(user_id: str, meeting_analysis: Dict[str, Any], lead_external_id: str) -> bool:
+async def sync_meeting_insights_to_creatio(
+    user_id: str,
+    meeting_analysis: Dict[str, Any],
+    lead_external_id: str,
+    http_client: Optional[httpx.AsyncClient] = None
+) -> bool:
     """
     Convenience wrapper exported at module-level so callers can:
       from app.services.creatio import sync_meeting_insights_to_creatio
+
+    Uses the shared Creatio HTTP client unless one is passed in.
     """
     config = await get_user_creatio_config(user_id)
     if not config:
         logger.warning(f"No Creatio config for user {user_id} — cannot sync insights")
         return False
 
-    svc = CreatioService(config)
+    svc = CreatioService(config, http_client)
     return await svc.update_lead_with_meeting_insights(lead_external_id, meeting_analysis)
 
 
+async def batch_update_creatio_leads(
+    user_id: str,
+    updates: List[Tuple[str, Dict[str, Any]]],
+    http_client: Optional[httpx.AsyncClient] = None
+) -> List[bool]:
+    """Apply (lead_external_id, fields) updates for a user's Creatio leads in one $batch request"""
+    config = await get_user_creatio_config(user_id)
+    if not config:
+        logger.warning(f"No Creatio config for user {user_id} — cannot batch update leads")
+        return [False] * len(updates)
+
+    svc = CreatioService(config, http_client)
+    return await svc.batch_update_leads(updates)
+
+
 __all__ = [
     "CreatioService",
     "get_user_creatio_config",
+    "invalidate_user_creatio_config",
     "sync_meeting_insights_to_creatio",
+    "batch_update_creatio_leads",
+    "get_creatio_http_client",
+    "close_creatio_http_client",
 ]
@@ -4,21 +4,167 @@ Email Service for AI Meeting System
 Handles sending meeting summaries, follow-up questions, and notifications
 """
 
+import asyncio
 import logging
 import smtplib
+import socket
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from html import escape
+from string import Template
+from typing import Dict, List, Optional, Any, Tuple, Union
 import json
 import os
 
 from ..core.config import supabase
+from ..utils.db import run_query
 
 logger = logging.getLogger(__name__)
 
+# The SMTP session is kept open between emails; after this much idle time it is
+# checked with NOOP before use, since servers drop idle clients
+SMTP_IDLE_CHECK_SECONDS = 30
+SMTP_TIMEOUT_SECONDS = 30
+# Port 465 is implicit TLS (SMTPS); other ports connect in plain text and upgrade with STARTTLS
+SMTP_SSL_PORT = 465
+# Sessions are recycled after this many messages so long bulk runs don't hold one forever
+SMTP_MESSAGES_PER_SESSION = 100
+
+# email_notifications rows are buffered and written in one insert per batch or interval
+EMAIL_LOG_FLUSH_INTERVAL_SECONDS = 2.0
+EMAIL_LOG_FLUSH_BATCH_SIZE = 50
+
+# Meetings are usually summarized to several people, so each distinct time is formatted once
+MEETING_DATE_FORMAT = '%B %d, %Y at %I:%M %p'
+
+@lru_cache(maxsize=256)
+def _format_meeting_date(meeting_date: str) -> str:
+    """Display form of an ISO meeting time, or the escaped raw value if it isn't ISO"""
+    try:
+        return datetime.fromisoformat(meeting_date).strftime(MEETING_DATE_FORMAT)
+    except ValueError:
+        return escape(meeting_date)
+
+# Email skeletons are built once; only the escaped, per-meeting values are substituted in
+_SUMMARY_EMAIL_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Meeting Summary</title>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: #2563eb; color: white; padding: 20px; border-radius: 8px 8px 0 0; }
+        .content { background: #f8fafc; padding: 20px; border-radius: 0 0 8px 8px; }
+        .section { margin-bottom: 20px; }
+        .section h3 { color: #1e40af; margin-bottom: 10px; }
+        .score { background: #10b981; color: white; padding: 5px 10px; border-radius: 20px; display: inline-block; }
+        .insights { background: white; padding: 15px; border-radius: 6px; border-left: 4px solid #2563eb; }
+        .transcript { background: white; padding: 15px; border-radius: 6px; max-height: 300px; overflow-y: auto; }
+        ul { padding-left: 20px; }
+        li { margin-bottom: 5px; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🤖 AI Meeting Summary</h1>
+            <p>Meeting with ${lead_name} from ${company}</p>
+            <p>${formatted_date}</p>
+        </div>
+
+        <div class="content">
+            <div class="section">
+                <h3>📊 Lead Score</h3>
+                <span class="score">${lead_score}/100</span>
+            </div>
+
+            <div class="section">
+                <h3>📝 Meeting Summary</h3>
+                <div class="insights">
+                    <p>${summary}</p>
+                </div>
+            </div>
+
+            <div class="section">
+                <h3>💡 Key Insights</h3>
+                <div class="insights">
+                    <ul>
+                    ${insights_html}
+                    </ul>
+                </div>
+            </div>
+
+            <div class="section">
+                <h3>🎯 Recommended Next Steps</h3>
+                <div class="insights">
+                    <ul>
+                    ${next_steps_html}
+                    </ul>
+                </div>
+            </div>
+
+            <div class="section">
+                <h3>📋 Full Transcript</h3>
+                <div class="transcript">
+                    <pre>${transcript}</pre>
+                </div>
+            </div>
+
+            <div class="section">
+                <p><em>This summary was generated by your AI meeting assistant. Please review and take appropriate follow-up actions.</em></p>
+            </div>
+        </div>
+    </div>
+</body>
+</html>
+""")
+
+_FOLLOWUP_EMAIL_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Follow-up Questions</title>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: #7c3aed; color: white; padding: 20px; border-radius: 8px 8px 0 0; }
+        .content { background: #f8fafc; padding: 20px; border-radius: 0 0 8px 8px; }
+        .section { margin-bottom: 20px; }
+        .question { background: white; padding: 15px; border-radius: 6px; margin-bottom: 10px; border-left: 4px solid #7c3aed; }
+        .question-number { color: #7c3aed; font-weight: bold; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>❓ Follow-up Questions</h1>
+            <p>Additional questions for ${lead_name} from ${company}</p>
+        </div>
+
+        <div class="content">
+            <div class="section">
+                <p>Based on your recent AI meeting, here are some follow-up questions you might want to ask ${lead_name}:</p>
+            </div>
+
+            <div class="section">
+                ${questions_html}
+            </div>
+
+            <div class="section">
+                <p><em>These questions were generated by your AI assistant to help you gather more information and move the lead forward in your sales process.</em></p>
+            </div>
+        </div>
+    </div>
+</body>
+</html>
+""")
+
 class EmailService:
     """Service for sending emails related to AI meetings"""
     
@@ -28,15 +174,24 @@ class EmailService:
         self.smtp_username = os.getenv("SMTP_USERNAME")
         self.smtp_password = os.getenv("SMTP_PASSWORD")
         self.from_email = os.getenv("FROM_EMAIL", self.smtp_username)
+        # Name sent in EHLO; smtplib would otherwise resolve our FQDN on every connect
+        self.smtp_local_hostname = os.getenv("SMTP_LOCAL_HOSTNAME") or socket.gethostname()
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_last_used = 0.0
+        self._smtp_sent = 0
+        self._smtp_lock = asyncio.Lock()
+        self._pending_logs: List[Dict[str, Any]] = []
+        self._log_flush_requested = asyncio.Event()
+        self._log_flusher_stopping = False
         
     async def send_meeting_summary(
         self, 
-        user_email: str, 
+        user_email: Union[str, List[str]], 
         meeting_data: Dict[str, Any], 
         analysis: Dict[str, Any],
         transcript: str
     ) -> bool:
-        """Send meeting summary email to user"""
+        """Send meeting summary email to a user, or to each of a list of recipients"""
         try:
             subject = f"Meeting Summary - {meeting_data.get('lead_name', 'Lead Meeting')}"
             
@@ -44,22 +199,27 @@ class EmailService:
             html_content = self._generate_summary_email_html(meeting_data, analysis, transcript)
             
             # Send email
-            success = await self._send_email(
-                to_email=user_email,
-                subject=subject,
-                html_content=html_content
-            )
+            recipients = [user_email] if isinstance(user_email, str) else list(user_email)
+            if len(recipients) == 1:
+                results = [await self._send_email(
+                    to_email=recipients[0],
+                    subject=subject,
+                    html_content=html_content
+                )]
+            else:
+                results = await self.send_bulk([(recipient, subject, html_content) for recipient in recipients])
             
-            if success:
-                # Log email sent
-                await self._log_email_sent(
-                    user_email=user_email,
-                    meeting_id=meeting_data.get('id'),
-                    email_type='meeting_summary',
-                    subject=subject
-                )
+            for recipient, success in zip(recipients, results):
+                if success:
+                    # Log email sent
+                    self._log_email_sent(
+                        user_email=recipient,
+                        meeting_id=meeting_data.get('id'),
+                        email_type='meeting_summary',
+                        subject=subject
+                    )
                 
-            return success
+            return all(results)
             
         except Exception as e:
             logger.error(f"Failed to send meeting summary email: {e}")
@@ -87,7 +247,7 @@ class EmailService:
             
             if success:
                 # Log email sent
-                await self._log_email_sent(
+                self._log_email_sent(
                     user_email=user_email,
                     meeting_id=meeting_data.get('id'),
                     email_type='follow_up_questions',
@@ -107,21 +267,11 @@ class EmailService:
                 logger.warning("SMTP credentials not configured, skipping email send")
                 return True  # Return True to not block the flow
                 
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # Add HTML content
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
+            msg = self._build_message(to_email, subject, html_content)
             
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
+            # smtplib blocks, so the SMTP exchange runs in a worker thread
+            async with self._smtp_lock:
+                await asyncio.to_thread(self._deliver, msg)
                 
             logger.info(f"Email sent successfully to {to_email}")
             return True
@@ -130,116 +280,135 @@ class EmailService:
             logger.error(f"Failed to send email to {to_email}: {e}")
             return False
             
-    def _generate_summary_email_html(
-        self, 
-        meeting_data: Dict[str, Any], 
-        analysis: Dict[str, Any],
-        transcript: str
-    ) -> str:
-        """Generate HTML content for meeting summary email"""
+    async def send_bulk(self, messages: List[Tuple[str, str, str]]) -> List[bool]:
+        """Send (to_email, subject, html_content) messages back to back over the shared session;
+        returns whether each one was sent"""
+        if not self.smtp_username or not self.smtp_password:
+            logger.warning("SMTP credentials not configured, skipping email send")
+            return [True] * len(messages)  # Same as _send_email: don't block the flow
+            
+        async with self._smtp_lock:
+            results = await asyncio.to_thread(self._deliver_all, messages)
+                    
+        logger.info(f"Bulk email: {sum(results)}/{len(messages)} sent")
+        return results
         
-        lead_name = meeting_data.get('lead_name', 'Unknown Lead')
-        company = meeting_data.get('company', 'Unknown Company')
-        meeting_date = meeting_data.get('scheduled_time', datetime.now().isoformat())
+    def _deliver_all(self, messages: List[Tuple[str, str, str]]) -> List[bool]:
+        """Send each message in turn; the caller holds _smtp_lock"""
+        results = []
+        for to_email, subject, html_content in messages:
+            try:
+                self._deliver(self._build_message(to_email, subject, html_content))
+                results.append(True)
+            except Exception as e:
+                logger.error(f"Failed to send email to {to_email}: {e}")
+                results.append(False)
+        return results
         
-        # Parse meeting date
+    def _build_message(self, to_email: str, subject: str, html_content: str) -> MIMEMultipart:
+        """Build an HTML email message"""
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self.from_email
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        msg.attach(MIMEText(html_content, 'html'))
+        return msg
+        
+    def _deliver(self, msg: MIMEMultipart):
+        """Send one message over the shared session; the caller holds _smtp_lock"""
         try:
-            meeting_dt = datetime.fromisoformat(meeting_date.replace('Z', '+00:00'))
-            formatted_date = meeting_dt.strftime('%B %d, %Y at %I:%M %p')
-        except:
-            formatted_date = meeting_date
+            self._get_smtp().send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # The server hung up on the idle session; reconnect and try once more
+            self._close_smtp()
+            self._get_smtp().send_message(msg)
+        self._smtp_last_used = time.monotonic()
+        self._smtp_sent += 1
+        if self._smtp_sent >= SMTP_MESSAGES_PER_SESSION:
+            self._close_smtp()
+            
+    def _get_smtp(self) -> smtplib.SMTP:
+        """Return the open SMTP session, connecting and logging in if there isn't a live one"""
+        if self._smtp is not None:
+            if time.monotonic() - self._smtp_last_used < SMTP_IDLE_CHECK_SECONDS:
+                return self._smtp
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close_smtp()
             
-        summary = analysis.get('summary', 'No summary available')
-        key_insights = analysis.get('key_insights', [])
-        lead_score = analysis.get('lead_score', 0)
-        next_steps = analysis.get('next_steps', [])
+        smtp_class = smtplib.SMTP_SSL if self.smtp_port == SMTP_SSL_PORT else smtplib.SMTP
+        server = smtp_class(
+            self.smtp_server,
+            self.smtp_port,
+            local_hostname=self.smtp_local_hostname,
+            timeout=SMTP_TIMEOUT_SECONDS
+        )
+        try:
+            # SMTP commands are small; don't let Nagle hold them back waiting for more data
+            server.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # starttls() and login() send EHLO themselves when they need it
+            if smtp_class is smtplib.SMTP:
+                server.starttls()
+            server.login(self.smtp_username, self.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        self._smtp = server
+        return server
         
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Meeting Summary</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: #2563eb; color: white; padding: 20px; border-radius: 8px 8px 0 0; }}
-                .content {{ background: #f8fafc; padding: 20px; border-radius: 0 0 8px 8px; }}
-                .section {{ margin-bottom: 20px; }}
-                .section h3 {{ color: #1e40af; margin-bottom: 10px; }}
-                .score {{ background: #10b981; color: white; padding: 5px 10px; border-radius: 20px; display: inline-block; }}
-                .insights {{ background: white; padding: 15px; border-radius: 6px; border-left: 4px solid #2563eb; }}
-                .transcript {{ background: white; padding: 15px; border-radius: 6px; max-height: 300px; overflow-y: auto; }}
-                ul {{ padding-left: 20px; }}
-                li {{ margin-bottom: 5px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🤖 AI Meeting Summary</h1>
-                    <p>Meeting with {lead_name} from {company}</p>
-                    <p>{formatted_date}</p>
-                </div>
-                
-                <div class="content">
-                    <div class="section">
-                        <h3>📊 Lead Score</h3>
-                        <span class="score">{lead_score}/100</span>
-                    </div>
-                    
-                    <div class="section">
-                        <h3>📝 Meeting Summary</h3>
-                        <div class="insights">
-                            <p>{summary}</p>
-                        </div>
-                    </div>
-                    
-                    <div class="section">
-                        <h3>💡 Key Insights</h3>
-                        <div class="insights">
-                            <ul>
-        """
+    def _close_smtp(self):
+        """Drop the SMTP session, saying QUIT if the server is still listening"""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+        self._smtp_sent = 0
         
-        for insight in key_insights:
-            html_content += f"<li>{insight}</li>"
+    async def aclose(self):
+        """Write buffered log rows and close the SMTP session (called on app shutdown)"""
+        await self._flush_email_logs()
+        async with self._smtp_lock:
+            await asyncio.to_thread(self._close_smtp)
             
-        html_content += f"""
-                            </ul>
-                        </div>
-                    </div>
-                    
-                    <div class="section">
-                        <h3>🎯 Recommended Next Steps</h3>
-                        <div class="insights">
-                            <ul>
-        """
+    def _generate_summary_email_html(
+        self, 
+        meeting_data: Dict[str, Any], 
+        analysis: Dict[str, Any],
+        transcript: str
+    ) -> str:
+        """Generate HTML content for meeting summary email"""
         
-        for step in next_steps:
-            html_content += f"<li>{step}</li>"
+        # Lead details, analysis and transcript are user or model supplied, so everything is escaped
+        lead_name = escape(str(meeting_data.get('lead_name', 'Unknown Lead')))
+        company = escape(str(meeting_data.get('company', 'Unknown Company')))
+        meeting_date = meeting_data.get('scheduled_time')
+        if meeting_date:
+            formatted_date = _format_meeting_date(str(meeting_date))
+        else:
+            formatted_date = datetime.now().strftime(MEETING_DATE_FORMAT)
             
-        html_content += f"""
-                            </ul>
-                        </div>
-                    </div>
-                    
-                    <div class="section">
-                        <h3>📋 Full Transcript</h3>
-                        <div class="transcript">
-                            <pre>{transcript}</pre>
-                        </div>
-                    </div>
-                    
-                    <div class="section">
-                        <p><em>This summary was generated by your AI meeting assistant. Please review and take appropriate follow-up actions.</em></p>
-                    </div>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        summary = escape(str(analysis.get('summary', 'No summary available')))
+        insights_html = "".join([f"<li>{escape(str(insight))}</li>" for insight in analysis.get('key_insights', [])])
+        lead_score = escape(str(analysis.get('lead_score', 0)))
+        next_steps_html = "".join([f"<li>{escape(str(step))}</li>" for step in analysis.get('next_steps', [])])
+        transcript = escape(transcript or '')
         
-        return html_content
+        return _SUMMARY_EMAIL_TEMPLATE.substitute(
+            lead_name=lead_name,
+            company=company,
+            formatted_date=formatted_date,
+            lead_score=lead_score,
+            summary=summary,
+            insights_html=insights_html,
+            next_steps_html=next_steps_html,
+            transcript=transcript
+        )
         
     def _generate_followup_email_html(
         self, 
@@ -248,81 +417,75 @@ class EmailService:
     ) -> str:
         """Generate HTML content for follow-up questions email"""
         
-        lead_name = meeting_data.get('lead_name', 'Unknown Lead')
-        company = meeting_data.get('company', 'Unknown Company')
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Follow-up Questions</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: #7c3aed; color: white; padding: 20px; border-radius: 8px 8px 0 0; }}
-                .content {{ background: #f8fafc; padding: 20px; border-radius: 0 0 8px 8px; }}
-                .section {{ margin-bottom: 20px; }}
-                .question {{ background: white; padding: 15px; border-radius: 6px; margin-bottom: 10px; border-left: 4px solid #7c3aed; }}
-                .question-number {{ color: #7c3aed; font-weight: bold; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>❓ Follow-up Questions</h1>
-                    <p>Additional questions for {lead_name} from {company}</p>
-                </div>
-                
-                <div class="content">
-                    <div class="section">
-                        <p>Based on your recent AI meeting, here are some follow-up questions you might want to ask {lead_name}:</p>
-                    </div>
-                    
-                    <div class="section">
-        """
-        
-        for i, question in enumerate(questions, 1):
-            html_content += f"""
+        lead_name = escape(str(meeting_data.get('lead_name', 'Unknown Lead')))
+        company = escape(str(meeting_data.get('company', 'Unknown Company')))
+        questions_html = "".join([
+            f"""
                         <div class="question">
-                            <span class="question-number">Q{i}:</span> {question}
+                            <span class="question-number">Q{i}:</span> {escape(str(question))}
                         </div>
             """
-            
-        html_content += """
-                    </div>
-                    
-                    <div class="section">
-                        <p><em>These questions were generated by your AI assistant to help you gather more information and move the lead forward in your sales process.</em></p>
-                    </div>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+            for i, question in enumerate(questions, 1)
+        ])
         
-        return html_content
+        return _FOLLOWUP_EMAIL_TEMPLATE.substitute(
+            lead_name=lead_name,
+            company=company,
+            questions_html=questions_html
+        )
         
-    async def _log_email_sent(
+    def _log_email_sent(
         self,
         user_email: str,
         meeting_id: str,
         email_type: str,
         subject: str
     ):
-        """Log email sent to database"""
-        try:
-            supabase.table("email_notifications").insert({
-                "meeting_id": meeting_id,
-                "recipient_email": user_email,
-                "email_type": email_type,
-                "subject": subject,
-                "sent_at": datetime.now().isoformat(),
-                "delivery_status": "sent"
-            }).execute()
+        """Queue an email_notifications row for the next batched insert"""
+        self._pending_logs.append({
+            "meeting_id": meeting_id,
+            "recipient_email": user_email,
+            "email_type": email_type,
+            "subject": subject,
+            "sent_at": datetime.now().isoformat(),
+            "delivery_status": "sent"
+        })
+        if len(self._pending_logs) >= EMAIL_LOG_FLUSH_BATCH_SIZE:
+            self._log_flush_requested.set()
             
+    async def _flush_email_logs(self):
+        """Write buffered email_notifications rows to the database in one insert"""
+        if not self._pending_logs:
+            return
+            
+        rows, self._pending_logs = self._pending_logs, []
+        try:
+            await run_query(supabase.table("email_notifications").insert(rows))
+            return
         except Exception as e:
-            logger.error(f"Failed to log email sent: {e}")
+            logger.warning(f"Failed to log {len(rows)} sent emails in one insert, retrying one by one: {e}")
+            
+        # One bad row (e.g. an unknown meeting_id) must not take the rest of the batch with it
+        for row in rows:
+            try:
+                await run_query(supabase.table("email_notifications").insert(row))
+            except Exception as e:
+                logger.error(f"Failed to log {row['email_type']} email to {row['recipient_email']}: {e}")
+            
+    async def run_log_flusher(self):
+        """Flush buffered log rows every few seconds, or sooner once a batch fills up"""
+        while not self._log_flusher_stopping:
+            try:
+                await asyncio.wait_for(self._log_flush_requested.wait(), timeout=EMAIL_LOG_FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._log_flush_requested.clear()
+            await self._flush_email_logs()
+            
+    def stop_log_flusher(self):
+        """Ask run_log_flusher to finish its current flush and exit (called on app shutdown)"""
+        self._log_flusher_stopping = True
+        self._log_flush_requested.set()
 
 # Global email service instance
 email_service = EmailService()
\ No newline at end of file
@@ -4,15 +4,257 @@ Gemini AI Service for Meeting Analysis and Question Generation
 Handles AI-powered conversation analysis, question generation, and insights extraction
 """
 
+import asyncio
 import logging
 import json
 import os
-from typing import Dict, List, Optional, Any
+import random
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Any, Callable
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from datetime import datetime
+from ..utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-pro")
+# Smaller, faster model for the in-meeting next-question turn, where latency matters most
+GEMINI_FAST_MODEL = os.getenv("GEMINI_FAST_MODEL", "gemini-1.5-flash")
+# A next question is one sentence; capping output keeps decoding short
+NEXT_QUESTION_MAX_OUTPUT_TOKENS = 60
+
+# Structured-output schemas; models that support JSON mode return exactly this shape
+_STRING_LIST_SCHEMA = {"type": "ARRAY", "items": {"type": "STRING"}}
+QUESTIONS_RESPONSE_SCHEMA = _STRING_LIST_SCHEMA
+ANALYSIS_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "summary": {"type": "STRING"},
+        "lead_score": {"type": "INTEGER"},
+        "key_insights": _STRING_LIST_SCHEMA,
+        "pain_points": _STRING_LIST_SCHEMA,
+        "opportunities": _STRING_LIST_SCHEMA,
+        "budget_indicators": {"type": "STRING"},
+        "timeline_indicators": {"type": "STRING"},
+        "decision_makers": {"type": "STRING"},
+        "next_steps": _STRING_LIST_SCHEMA,
+        "follow_up_questions": _STRING_LIST_SCHEMA,
+        "qualification_status": {"type": "STRING"},
+        "notes": {"type": "STRING"},
+    },
+    "required": ["summary", "lead_score", "key_insights", "next_steps"],
+}
+
+def _supports_json_mode(model_name: str) -> bool:
+    """Gemini 1.0 models reject response_mime_type; later ones accept a response schema"""
+    return not model_name.startswith(("gemini-pro", "gemini-1.0"))
+
+# Concurrent Gemini calls are limited adaptively (AIMD): the limit grows by a
+# half step per fast success and halves on quota/overload errors or slow replies
+GEMINI_MIN_CONCURRENCY = 1
+GEMINI_MAX_CONCURRENCY = 16
+GEMINI_INITIAL_CONCURRENCY = 4
+GEMINI_LATENCY_TARGET_SECONDS = 20.0
+# After this many overload errors in a row, calls fail fast for a while instead of piling on
+GEMINI_CIRCUIT_BREAKER_FAILURES = 5
+GEMINI_CIRCUIT_OPEN_SECONDS = 30
+
+# Per-minute quota for the API key; calls wait for room in the window instead of drawing 429s
+GEMINI_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+GEMINI_TOKENS_PER_MINUTE = int(os.getenv("GEMINI_TOKENS_PER_MINUTE", "120000"))
+# Rough prompt size estimate used against the token quota
+GEMINI_CHARS_PER_TOKEN = 4
+
+# Conversation context sent with each prompt, newest messages first until the budget is spent
+NEXT_QUESTION_CONTEXT_TOKENS = 1500
+ANALYSIS_CONTEXT_TOKENS = 24000
+
+# Overload errors and unparseable analyses are retried with jittered exponential backoff
+GEMINI_MAX_ATTEMPTS = 3
+GEMINI_RETRY_BASE_SECONDS = 1.5
+GEMINI_RETRY_MAX_SECONDS = 30
+
+# Errors that mean Gemini is rate limiting or struggling, as opposed to a bad request
+GEMINI_OVERLOAD_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+)
+
+def _retry_delay(attempt: int) -> float:
+    """Backoff before retry number attempt + 1"""
+    return min(GEMINI_RETRY_MAX_SECONDS, GEMINI_RETRY_BASE_SECONDS * 2 ** attempt) + random.uniform(0, 0.5)
+
+def _recent_messages(conversation_history: List[Dict[str, Any]], budget_tokens: int) -> List[Dict[str, Any]]:
+    """Latest messages whose estimated size fits in budget_tokens, oldest first"""
+    used = 0
+    start = len(conversation_history)
+    while start > 0:
+        used += len(conversation_history[start - 1]['message']) // GEMINI_CHARS_PER_TOKEN + 1
+        if used > budget_tokens and start < len(conversation_history):
+            break
+        start -= 1
+    return conversation_history[start:]
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _extract_json(text: str, opening: str) -> Any:
+    """Decode the JSON value that starts at the first `opening` bracket in text"""
+    start = text.find(opening)
+    if start == -1:
+        raise json.JSONDecodeError(f"No {opening!r} in response", text, 0)
+    value, _ = _JSON_DECODER.raw_decode(text, start)
+    return value
+
+# A question line from a plain-text answer: optional bullet/bold markers and numbering, then text with a '?'.
+# Markdown headings are skipped.
+_QUESTION_LINE_RE = re.compile(r'^[ \t]*(?!#)(?:[-*•][ \t]*)*(?:\d+[.)][ \t]*)?(.*\?.*)$', re.MULTILINE)
+
+class GeminiUnavailableError(Exception):
+    """Raised without calling Gemini while the circuit breaker is open"""
+
+class _AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit with a circuit breaker for blocking Gemini calls"""
+    
+    def __init__(self, min_limit: int, max_limit: int, initial_limit: int):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(initial_limit)
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        # Gemini calls get their own threads so slow generations can't starve the
+        # default executor that database and SMTP work runs on
+        self._executor = ThreadPoolExecutor(max_workers=max_limit, thread_name_prefix="gemini")
+        
+    async def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run func on the Gemini thread pool once a concurrency slot is free"""
+        if time.monotonic() < self._open_until:
+            raise GeminiUnavailableError("Gemini circuit breaker is open")
+            
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+            
+        started = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+        except GEMINI_OVERLOAD_ERRORS as e:
+            self._decrease(f"{type(e).__name__}")
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= GEMINI_CIRCUIT_BREAKER_FAILURES:
+                self._open_until = time.monotonic() + GEMINI_CIRCUIT_OPEN_SECONDS
+                logger.error(f"Gemini failing repeatedly; pausing calls for {GEMINI_CIRCUIT_OPEN_SECONDS}s")
+            raise
+        finally:
+            async with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+                
+        self._consecutive_failures = 0
+        latency = time.monotonic() - started
+        if latency > GEMINI_LATENCY_TARGET_SECONDS:
+            self._decrease(f"slow response ({latency:.1f}s)")
+        else:
+            self.limit = min(self.max_limit, self.limit + 0.5)
+        return result
+        
+    def _decrease(self, reason: str):
+        self.limit = max(self.min_limit, self.limit * 0.5)
+        logger.warning(f"Gemini concurrency limit lowered to {int(self.limit)}: {reason}")
+
+class _SlidingWindowThrottle:
+    """Blocks callers until a request and its tokens fit in the last minute's quota"""
+    
+    def __init__(self, requests_per_window: int, tokens_per_window: int, window_seconds: float = 60.0):
+        self.requests_per_window = requests_per_window
+        self.tokens_per_window = tokens_per_window
+        self.window_seconds = window_seconds
+        self._requests: deque = deque()  # monotonic send times
+        self._tokens: deque = deque()  # (monotonic send time, estimated tokens)
+        self._token_total = 0
+        self._lock = asyncio.Lock()  # waiters are admitted in arrival order
+        
+    async def acquire(self, tokens: int):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                cutoff = now - self.window_seconds
+                while self._requests and self._requests[0] <= cutoff:
+                    self._requests.popleft()
+                while self._tokens and self._tokens[0][0] <= cutoff:
+                    self._token_total -= self._tokens.popleft()[1]
+                    
+                wait = 0.0
+                if len(self._requests) >= self.requests_per_window:
+                    wait = self._requests[0] - cutoff
+                if self._tokens and self._token_total + tokens > self.tokens_per_window:
+                    wait = max(wait, self._tokens[0][0] - cutoff)
+                if wait <= 0:
+                    break
+                logger.info(f"Gemini per-minute quota reached; waiting {wait:.1f}s")
+                await asyncio.sleep(wait)
+                
+            self._requests.append(now)
+            self._tokens.append((now, tokens))
+            self._token_total += tokens
+
+# Shared by every GeminiService call site, since the quota is per API key
+_gemini_throttle = _SlidingWindowThrottle(GEMINI_REQUESTS_PER_MINUTE, GEMINI_TOKENS_PER_MINUTE)
+_gemini_limiter = _AdaptiveConcurrencyLimiter(
+    GEMINI_MIN_CONCURRENCY, GEMINI_MAX_CONCURRENCY, GEMINI_INITIAL_CONCURRENCY
+)
+
+# Generated questions are reused for leads whose prompt inputs match exactly
+QUESTION_PROMPT_FIELDS = ("name", "company", "industry", "status", "email")
+_questions_cache = TTLCache(maxsize=512, ttl=3600)
+
+# Fallbacks used when Gemini is unavailable or its answer can't be used
+_DEFAULT_QUESTIONS = (
+    "Can you tell me about your company and what you do?",
+    "What are the main challenges you're facing in your business right now?",
+    "How are you currently handling [relevant process/area]?",
+    "What would an ideal solution look like for you?",
+    "What's your timeline for making a decision on this?",
+    "Who else would be involved in the decision-making process?",
+    "What budget range are you working with for this project?"
+)
+
+_DEFAULT_ANALYSIS_TEXT = {
+    "budget_indicators": "Budget discussion needed",
+    "timeline_indicators": "Timeline to be determined",
+    "decision_makers": "Decision makers to be identified",
+    "qualification_status": "partially_qualified",
+}
+
+_DEFAULT_ANALYSIS_LISTS = {
+    "pain_points": (
+        "Specific pain points to be identified in follow-up",
+    ),
+    "opportunities": (
+        "Potential sales opportunity identified",
+        "Needs further qualification"
+    ),
+    "next_steps": (
+        "Schedule follow-up call",
+        "Send additional information",
+        "Qualify budget and timeline"
+    ),
+    "follow_up_questions": (
+        "What's your budget range for this type of solution?",
+        "When would you like to have this implemented?",
+        "Who else would be involved in making this decision?"
+    ),
+}
+
 class GeminiService:
     """Service for AI-powered meeting analysis using Google Gemini"""
     
@@ -20,10 +262,40 @@ class GeminiService:
         self.api_key = os.getenv("GEMINI_API_KEY")
         if self.api_key:
             genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
+            self.model = genai.GenerativeModel(GEMINI_MODEL)
+            self.fast_model = genai.GenerativeModel(GEMINI_FAST_MODEL)
         else:
             logger.warning("GEMINI_API_KEY not configured, AI features will be limited")
             self.model = None
+            self.fast_model = None
+            
+    def _json_config(self, schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Generation config asking for JSON in the given shape, if the model supports it"""
+        if not _supports_json_mode(GEMINI_MODEL):
+            return None
+        return {"response_mime_type": "application/json", "response_schema": schema}
+        
+    async def _generate_content(
+        self,
+        prompt: str,
+        generation_config: Optional[Dict[str, Any]] = None,
+        model: Optional[Any] = None
+    ):
+        """Call Gemini (self.model unless another model is given) off the event loop, within the
+        per-minute quota and adaptive concurrency limit"""
+        model = model or self.model
+        for attempt in range(GEMINI_MAX_ATTEMPTS):
+            await _gemini_throttle.acquire(len(prompt) // GEMINI_CHARS_PER_TOKEN + 1)
+            try:
+                return await _gemini_limiter.call(
+                    model.generate_content, prompt, generation_config=generation_config
+                )
+            except GEMINI_OVERLOAD_ERRORS as e:
+                if attempt + 1 >= GEMINI_MAX_ATTEMPTS:
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning(f"Gemini {type(e).__name__}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
             
     async def generate_questions_for_lead(
         self, 
@@ -31,10 +303,27 @@ class GeminiService:
         question_set_id: Optional[str] = None
     ) -> List[str]:
         """Generate personalized questions for a lead"""
+        if not self.model:
+            return self._get_default_questions()
+            
+        # Keyed on every lead field the prompt uses, so a hit is the answer Gemini was asked for
+        cache_key = tuple(lead_data.get(field) for field in QUESTION_PROMPT_FIELDS)
+        cached = _questions_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+            
+        questions = await self._request_questions_for_lead(lead_data)
+        if questions != list(_DEFAULT_QUESTIONS):
+            _questions_cache.set(cache_key, tuple(questions))
+        return questions
+        
+    def invalidate_lead_questions(self, lead_data: Dict[str, Any]):
+        """Forget cached questions for a lead, e.g. after its details change"""
+        _questions_cache.pop(tuple(lead_data.get(field) for field in QUESTION_PROMPT_FIELDS))
+            
+    async def _request_questions_for_lead(self, lead_data: Dict[str, Any]) -> List[str]:
+        """Ask Gemini for discovery questions, falling back to the defaults"""
         try:
-            if not self.model:
-                return self._get_default_questions()
-                
             company = lead_data.get('company', 'the company')
             industry = lead_data.get('industry', 'their industry')
             lead_name = lead_data.get('name', 'the prospect')
@@ -59,40 +348,28 @@ class GeminiService:
             Return exactly 7 questions as a JSON array of strings.
             """
             
-            response = self.model.generate_content(prompt)
+            response = await self._generate_content(prompt, self._json_config(QUESTIONS_RESPONSE_SCHEMA))
             
-            # Parse the response
+            # Parse the response; with JSON mode it is the array itself
             questions_text = response.text.strip()
             
             # Try to extract JSON from the response
             try:
                 # Look for JSON array in the response
-                start_idx = questions_text.find('[')
-                end_idx = questions_text.rfind(']') + 1
+                questions = _extract_json(questions_text, '[')
                 
-                if start_idx != -1 and end_idx != -1:
-                    json_str = questions_text[start_idx:end_idx]
-                    questions = json.loads(json_str)
+                if isinstance(questions, list) and len(questions) > 0:
+                    return questions[:7]  # Ensure max 7 questions
                     
-                    if isinstance(questions, list) and len(questions) > 0:
-                        return questions[:7]  # Ensure max 7 questions
-                        
             except json.JSONDecodeError:
                 pass
                 
-            # Fallback: split by lines and clean up
-            lines = questions_text.split('\n')
-            questions = []
-            
-            for line in lines:
-                line = line.strip()
-                if line and not line.startswith('#') and '?' in line:
-                    # Clean up the line
-                    line = line.replace('**', '').replace('*', '').strip()
-                    if line.startswith(('1.', '2.', '3.', '4.', '5.', '6.', '7.')):
-                        line = line[2:].strip()
-                    questions.append(line)
-                    
+            # Fallback: pick the question lines out of the plain text
+            questions = [
+                match.group(1).replace('*', '').strip()
+                for match in _QUESTION_LINE_RE.finditer(questions_text)
+            ]
+            
             return questions[:7] if questions else self._get_default_questions()
             
         except Exception as e:
@@ -113,10 +390,10 @@ class GeminiService:
                 return "Can you tell me more about your current challenges?"
                 
             # Format conversation history
-            conversation_text = ""
-            for msg in conversation_history[-6:]:  # Last 6 messages for context
-                speaker = "AI" if msg['speaker'] == 'ai' else "Human"
-                conversation_text += f"{speaker}: {msg['message']}\n"
+            conversation_text = "".join([
+                f"{'AI' if msg['speaker'] == 'ai' else 'Human'}: {msg['message']}\n"
+                for msg in _recent_messages(conversation_history, NEXT_QUESTION_CONTEXT_TOKENS)
+            ])
                 
             prompt = f"""
             Based on this conversation with {lead_data.get('name', 'the prospect')} from {lead_data.get('company', 'their company')}, generate the next most appropriate question.
@@ -137,7 +414,11 @@ class GeminiService:
             Return only the question, no additional text.
             """
             
-            response = self.model.generate_content(prompt)
+            response = await self._generate_content(
+                prompt,
+                {"max_output_tokens": NEXT_QUESTION_MAX_OUTPUT_TOKENS},
+                model=self.fast_model
+            )
             question = response.text.strip()
             
             # Clean up the response
@@ -161,10 +442,11 @@ class GeminiService:
                 return self._get_default_analysis(conversation_history, lead_data)
                 
             # Format conversation for analysis
-            conversation_text = ""
-            for msg in conversation_history:
-                speaker = "AI Assistant" if msg['speaker'] == 'ai' else f"{lead_data.get('name', 'Prospect')}"
-                conversation_text += f"{speaker}: {msg['message']}\n"
+            prospect = str(lead_data.get('name', 'Prospect'))
+            conversation_text = "".join([
+                f"{'AI Assistant' if msg['speaker'] == 'ai' else prospect}: {msg['message']}\n"
+                for msg in _recent_messages(conversation_history, ANALYSIS_CONTEXT_TOKENS)
+            ])
                 
             prompt = f"""
             Analyze this sales discovery conversation with {lead_data.get('name', 'the prospect')} from {lead_data.get('company', 'their company')}.
@@ -219,26 +501,27 @@ class GeminiService:
             Return only valid JSON.
             """
             
-            response = self.model.generate_content(prompt)
-            analysis_text = response.text.strip()
-            
-            # Try to extract JSON from response
-            try:
-                # Look for JSON object in the response
-                start_idx = analysis_text.find('{')
-                end_idx = analysis_text.rfind('}') + 1
+            generation_config = self._json_config(ANALYSIS_RESPONSE_SCHEMA)
+            for attempt in range(GEMINI_MAX_ATTEMPTS):
+                response = await self._generate_content(prompt, generation_config)
+                analysis_text = response.text.strip()
                 
-                if start_idx != -1 and end_idx != -1:
-                    json_str = analysis_text[start_idx:end_idx]
-                    analysis = json.loads(json_str)
+                # Try to extract JSON from response
+                try:
+                    # Look for JSON object in the response
+                    analysis = _extract_json(analysis_text, '{')
                     
                     # Validate required fields
                     required_fields = ['summary', 'lead_score', 'key_insights', 'next_steps']
-                    if all(field in analysis for field in required_fields):
+                    if isinstance(analysis, dict) and all(field in analysis for field in required_fields):
                         return analysis
                         
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse AI analysis JSON: {e}")
+                except json.JSONDecodeError as e:
+                    logger.error(f"Failed to parse AI analysis JSON: {e}")
+                    
+                # A malformed answer is usually a one-off, so ask again before giving up
+                if attempt + 1 < GEMINI_MAX_ATTEMPTS:
+                    await asyncio.sleep(_retry_delay(attempt))
                 
             # Fallback to default analysis
             return self._get_default_analysis(conversation_history, lead_data)
@@ -254,27 +537,30 @@ class GeminiService:
     ) -> str:
         """Generate a formatted transcript of the meeting"""
         try:
-            transcript = f"AI Discovery Meeting Transcript\n"
-            transcript += f"Date: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}\n"
-            transcript += f"Participant: {lead_data.get('name', 'Unknown')} from {lead_data.get('company', 'Unknown Company')}\n"
-            transcript += f"AI Assistant: Discovery Bot\n\n"
-            transcript += "=" * 50 + "\n\n"
+            participant = lead_data.get('name', 'Participant')
+            parts = [
+                "AI Discovery Meeting Transcript\n",
+                f"Date: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}\n",
+                f"Participant: {lead_data.get('name', 'Unknown')} from {lead_data.get('company', 'Unknown Company')}\n",
+                "AI Assistant: Discovery Bot\n\n",
+                "=" * 50 + "\n\n"
+            ]
             
             for msg in conversation_history:
-                timestamp = msg.get('timestamp', datetime.now().isoformat())
+                timestamp = msg.get('timestamp')
                 try:
-                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00')) if timestamp else datetime.now()
                     time_str = dt.strftime('%I:%M %p')
                 except:
                     time_str = "Unknown"
                     
-                speaker = "AI Assistant" if msg['speaker'] == 'ai' else lead_data.get('name', 'Participant')
-                transcript += f"[{time_str}] {speaker}: {msg['message']}\n\n"
+                speaker = "AI Assistant" if msg['speaker'] == 'ai' else participant
+                parts.append(f"[{time_str}] {speaker}: {msg['message']}\n\n")
                 
-            transcript += "=" * 50 + "\n"
-            transcript += "End of Transcript"
+            parts.append("=" * 50 + "\n")
+            parts.append("End of Transcript")
             
-            return transcript
+            return "".join(parts)
             
         except Exception as e:
             logger.error(f"Failed to generate transcript: {e}")
@@ -282,15 +568,7 @@ class GeminiService:
             
     def _get_default_questions(self) -> List[str]:
         """Get default discovery questions when AI is not available"""
-        return [
-            "Can you tell me about your company and what you do?",
-            "What are the main challenges you're facing in your business right now?",
-            "How are you currently handling [relevant process/area]?",
-            "What would an ideal solution look like for you?",
-            "What's your timeline for making a decision on this?",
-            "Who else would be involved in the decision-making process?",
-            "What budget range are you working with for this project?"
-        ]
+        return list(_DEFAULT_QUESTIONS)
         
     def _get_default_analysis(
         self, 
@@ -305,7 +583,11 @@ class GeminiService:
         # Basic scoring
         base_score = min(message_count * 10, 70)  # Up to 70 points for engagement
         
-        return {
+        analysis = dict(_DEFAULT_ANALYSIS_TEXT)
+        # Fresh lists, since callers may extend the analysis they get back
+        for field, items in _DEFAULT_ANALYSIS_LISTS.items():
+            analysis[field] = list(items)
+        analysis.update({
             "summary": f"Had a discovery conversation with {lead_data.get('name', 'the prospect')} from {lead_data.get('company', 'their company')}. They provided {message_count} responses during our discussion.",
             "lead_score": base_score,
             "key_insights": [
@@ -313,29 +595,9 @@ class GeminiService:
                 f"Provided {message_count} detailed responses",
                 "Showed interest in discussing their business"
             ],
-            "pain_points": [
-                "Specific pain points to be identified in follow-up"
-            ],
-            "opportunities": [
-                "Potential sales opportunity identified",
-                "Needs further qualification"
-            ],
-            "budget_indicators": "Budget discussion needed",
-            "timeline_indicators": "Timeline to be determined",
-            "decision_makers": "Decision makers to be identified",
-            "next_steps": [
-                "Schedule follow-up call",
-                "Send additional information",
-                "Qualify budget and timeline"
-            ],
-            "follow_up_questions": [
-                "What's your budget range for this type of solution?",
-                "When would you like to have this implemented?",
-                "Who else would be involved in making this decision?"
-            ],
-            "qualification_status": "partially_qualified",
             "notes": f"Initial discovery completed with {message_count} responses. Needs follow-up for full qualification."
-        }
+        })
+        return analysis
 
 # Global Gemini service instance
 gemini_service = GeminiService()
\ No newline at end of file
@@ -2,13 +2,48 @@
 Microsoft Graph API service for Teams integration
 """
 import httpx
+import hashlib
+import importlib.util
 import logging
-from typing import Dict, List, Optional
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# How long a successful /me lookup vouches for an access token
+USER_INFO_CACHE_TTL_SECONDS = 300
+USER_INFO_CACHE_MAX_ENTRIES = 10_000
+
+# Delegated permissions requested for Teams integration
+GRAPH_SCOPES = "offline_access https://graph.microsoft.com/User.Read https://graph.microsoft.com/Calendars.Read https://graph.microsoft.com/OnlineMeetings.Read"
+
+# One client for the whole process keeps connections to login.microsoftonline.com
+# and graph.microsoft.com alive between calls instead of handshaking on each one
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_graph_http_client() -> httpx.AsyncClient:
+    """Return the process-wide HTTP client used for Microsoft identity and Graph requests"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=30.0,
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+    return _http_client
+
+
+async def close_graph_http_client() -> None:
+    """Close the shared Graph HTTP client (called on app shutdown)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 class GraphAPIService:
     """Microsoft Graph API wrapper for Teams integration"""
@@ -16,73 +51,95 @@ class GraphAPIService:
     def __init__(self):
         self.base_url = "https://graph.microsoft.com/v1.0"
         self.auth_url = "https://login.microsoftonline.com"
+        self.token_url = f"{self.auth_url}/{settings.MICROSOFT_TENANT_ID}/oauth2/v2.0/token"
+        # token hash -> (expiry on the monotonic clock, /me payload), oldest first
+        self._user_info_cache: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+
+    @staticmethod
+    def _token_cache_key(access_token: str) -> str:
+        """Key cache entries by a digest so raw tokens are not kept around"""
+        return hashlib.blake2b(access_token.encode(), digest_size=16).hexdigest()
+
+    def invalidate_user_info(self, access_token: str) -> None:
+        """Forget a cached validation, e.g. after Graph rejected the token"""
+        if access_token:
+            self._user_info_cache.pop(self._token_cache_key(access_token), None)
+
+    async def get_user_info_cached(self, access_token: str) -> Dict:
+        """Get user information, reusing a recent successful lookup for the same token"""
+        key = self._token_cache_key(access_token)
+        cached = self._user_info_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            self._user_info_cache.move_to_end(key)
+            return cached[1]
+
+        user_info = await self.get_user_info(access_token)
+
+        self._user_info_cache[key] = (time.monotonic() + USER_INFO_CACHE_TTL_SECONDS, user_info)
+        self._user_info_cache.move_to_end(key)
+        while len(self._user_info_cache) > USER_INFO_CACHE_MAX_ENTRIES:
+            self._user_info_cache.popitem(last=False)
+
+        return user_info
 
     async def exchange_code_for_tokens(self, code: str, redirect_uri: str) -> Dict:
         """Exchange authorization code for access and refresh tokens"""
-        tenant_id = settings.MICROSOFT_TENANT_ID
-        token_url = f"{self.auth_url}/{tenant_id}/oauth2/v2.0/token"
-
         data = {
             "client_id": settings.MICROSOFT_CLIENT_ID,
             "client_secret": settings.MICROSOFT_CLIENT_SECRET,
             "code": code,
             "redirect_uri": redirect_uri,
             "grant_type": "authorization_code",
-            "scope": "offline_access https://graph.microsoft.com/User.Read https://graph.microsoft.com/Calendars.Read https://graph.microsoft.com/OnlineMeetings.Read"
+            "scope": GRAPH_SCOPES
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=data)
+        response = await get_graph_http_client().post(self.token_url, data=data)
 
-            if response.status_code != 200:
-                logger.error(f"Token exchange failed: {response.text}")
-                raise Exception(f"Token exchange failed: {response.status_code} {response.text}")
+        if response.status_code != 200:
+            logger.error(f"Token exchange failed: {response.text}")
+            raise Exception(f"Token exchange failed: {response.status_code} {response.text}")
 
-            token_data = response.json()
-            logger.info("Successfully exchanged code for tokens")
+        token_data = response.json()
+        logger.info("Successfully exchanged code for tokens")
 
-            return token_data
+        return token_data
 
     async def refresh_access_token(self, refresh_token: str) -> Dict:
         """Refresh access token using refresh token"""
         if not refresh_token:
             raise Exception("No refresh token provided")
 
-        tenant_id = settings.MICROSOFT_TENANT_ID
-        token_url = f"{self.auth_url}/{tenant_id}/oauth2/v2.0/token"
-
         data = {
             "client_id": settings.MICROSOFT_CLIENT_ID,
             "client_secret": settings.MICROSOFT_CLIENT_SECRET,
             "refresh_token": refresh_token,
             "grant_type": "refresh_token",
-            "scope": "offline_access https://graph.microsoft.com/User.Read https://graph.microsoft.com/Calendars.Read https://graph.microsoft.com/OnlineMeetings.Read"
+            "scope": GRAPH_SCOPES
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=data)
+        response = await get_graph_http_client().post(self.token_url, data=data)
 
-            if response.status_code != 200:
-                logger.error(f"Token refresh failed: {response.text}")
-                raise Exception(f"Token refresh failed: {response.status_code} {response.text}")
+        if response.status_code != 200:
+            logger.error(f"Token refresh failed: {response.text}")
+            raise Exception(f"Token refresh failed: {response.status_code} {response.text}")
 
-            token_data = response.json()
-            logger.info("Successfully refreshed token")
+        token_data = response.json()
+        logger.info("Successfully refreshed token")
 
-            return token_data
+        return token_data
 
     async def get_user_info(self, access_token: str) -> Dict:
         """Get user information from Microsoft Graph"""
         headers = {"Authorization": f"Bearer {access_token}"}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/me", headers=headers)
+        response = await get_graph_http_client().get(f"{self.base_url}/me", headers=headers)
 
-            if response.status_code != 200:
-                logger.error(f"Get user info failed: {response.text}")
-                raise Exception(f"Get user info failed: {response.status_code} {response.text}")
+        if response.status_code != 200:
+            self.invalidate_user_info(access_token)
+            logger.error(f"Get user info failed: {response.text}")
+            raise Exception(f"Get user info failed: {response.status_code} {response.text}")
 
-            return response.json()
+        return response.json()
 
     async def get_upcoming_meetings(self, access_token: str, days_ahead: int = 30) -> List[Dict]:
         """Fetch upcoming meetings from user's calendar"""
@@ -105,20 +162,20 @@ class GraphAPIService:
             "$top": 100
         }
 
-        async with httpx.AsyncClient() as client:
-            url = f"{self.base_url}/me/events"
+        url = f"{self.base_url}/me/events"
 
-            response = await client.get(url, headers=headers, params=params)
+        response = await get_graph_http_client().get(url, headers=headers, params=params)
 
-            if response.status_code == 401:
-                logger.error("Unauthorized when fetching meetings – likely expired/invalid token")
-                raise Exception("401 Unauthorized – token expired or invalid")
-            elif response.status_code != 200:
-                logger.error(f"Graph API error {response.status_code}: {response.text}")
-                raise Exception(f"Graph API error {response.status_code}: {response.text}")
+        if response.status_code == 401:
+            self.invalidate_user_info(access_token)
+            logger.error("Unauthorized when fetching meetings – likely expired/invalid token")
+            raise Exception("401 Unauthorized – token expired or invalid")
+        elif response.status_code != 200:
+            logger.error(f"Graph API error {response.status_code}: {response.text}")
+            raise Exception(f"Graph API error {response.status_code}: {response.text}")
 
-            data = response.json()
-            return data.get("value", [])
+        data = response.json()
+        return data.get("value", [])
 
     async def get_meeting_transcript(self, access_token: str, meeting_id: str) -> Optional[str]:
         """Fetch meeting transcript (placeholder - actual Teams API needed)"""
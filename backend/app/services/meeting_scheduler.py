@@ -4,12 +4,18 @@ import logging
 import secrets
 import string
 import asyncio
+import time
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Any, Optional, Tuple, Union
 
+from pydantic import TypeAdapter
+
 from ..core.config import supabase
+from ..utils.cursors import encode_cursor, decode_keyset_cursor
+from ..utils.db import run_query
 from ..models.enhanced_schemas import (
     ScheduledMeeting,
+    MeetingWithParticipants,
     ScheduledMeetingCreate,
     ScheduledMeetingUpdate,
     MeetingStatus,
@@ -23,12 +29,33 @@ from ..models.enhanced_schemas import (
 
 logger = logging.getLogger(__name__)
 
+# Validates whole result sets in one call; lead_id normalisation is handled by the model itself
+_MEETING_LIST_ADAPTER = TypeAdapter(List[ScheduledMeeting])
+
+# How long an exact listing total from the first page is reused by the following pages
+MEETING_COUNT_CACHE_TTL_SECONDS = 30
+
 
 class MeetingSchedulerService:
     """Service for managing scheduled AI meetings"""
 
     def __init__(self):
-        pass
+        # (user_id, filters) -> (expiry on the monotonic clock, exact total)
+        self._meeting_counts: Dict[Tuple, Tuple[float, int]] = {}
+
+    def _get_cached_count(self, key: Tuple) -> Optional[int]:
+        """Return a still-fresh exact listing total, if one was recorded"""
+        cached = self._meeting_counts.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        return None
+
+    def _cache_count(self, key: Tuple, total: int) -> None:
+        """Remember an exact listing total, dropping expired entries as we go"""
+        now = time.monotonic()
+        if len(self._meeting_counts) > 1000:
+            self._meeting_counts = {k: v for k, v in self._meeting_counts.items() if v[0] > now}
+        self._meeting_counts[key] = (now + MEETING_COUNT_CACHE_TTL_SECONDS, total)
 
     def _prepare_meeting_data(self, raw_data: dict) -> dict:
         """Prepare raw database data for ScheduledMeeting model"""
@@ -77,12 +104,11 @@ class MeetingSchedulerService:
             meeting_room_id = self._generate_meeting_room_id()
 
             # Verify lead exists and belongs to user
-            lead_response = (
+            lead_response = await run_query(
                 supabase.table("leads")
                 .select("*")
                 .eq("id", meeting_dict["lead_id"])
                 .eq("user_id", user_id)
-                .execute()
             )
             if not lead_response.data:
                 raise ValueError("Lead not found or access denied")
@@ -121,7 +147,7 @@ class MeetingSchedulerService:
             )
 
             # Insert into DB
-            response = supabase.table("scheduled_meetings").insert(meeting_dict).execute()
+            response = await run_query(supabase.table("scheduled_meetings").insert(meeting_dict))
 
             if not response.data:
                 raise Exception("Failed to create scheduled meeting in DB")
@@ -134,7 +160,7 @@ class MeetingSchedulerService:
 
             # Schedule AI to auto-join (best-effort)
             try:
-                await self._schedule_ai_auto_join(created_meeting, lead_data)
+                await self._schedule_ai_auto_join(created_meeting)
             except Exception as schedule_err:
                 logger.exception(
                     "Failed to schedule AI auto-join after creating meeting %s: %s",
@@ -152,12 +178,11 @@ class MeetingSchedulerService:
     async def get_scheduled_meeting(self, meeting_id: str, user_id: str) -> Optional[ScheduledMeeting]:
         """Get a scheduled meeting by ID"""
         try:
-            response = (
+            response = await run_query(
                 supabase.table("scheduled_meetings")
                 .select("*")
                 .eq("id", meeting_id)
                 .eq("user_id", user_id)
-                .execute()
             )
 
             if response.data:
@@ -169,6 +194,58 @@ class MeetingSchedulerService:
             logger.error(f"Failed to get scheduled meeting {meeting_id}: {str(e)}")
             return None
 
+    async def get_owned_meeting_summary(self, meeting_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get the identifying columns of a meeting if it belongs to the user"""
+        response = await run_query(
+            supabase.table("scheduled_meetings")
+            .select("id, lead_id, meeting_room_id, question_set_id, status")
+            .eq("id", meeting_id)
+            .eq("user_id", user_id)
+            .maybe_single()
+        )
+
+        if not response.data:
+            return None
+        return self._prepare_meeting_data(response.data)
+
+    async def get_meeting_with_details(self, meeting_id: str, user_id: str) -> Optional[MeetingWithParticipants]:
+        """
+        Get a scheduled meeting together with its participants, lead and question set.
+        Uses a single PostgREST embedded select so Postgres resolves the relations in one round-trip.
+        """
+        try:
+            response = await run_query(
+                supabase.table("scheduled_meetings")
+                .select("*, meeting_participants(*), leads(id, user_id, name, email, company, status, score), question_sets(*)")
+                .eq("id", meeting_id)
+                .eq("user_id", user_id)
+            )
+
+            if not response.data:
+                return None
+
+            meeting_data = self._prepare_meeting_data(response.data[0])
+            participants = meeting_data.pop("meeting_participants", None) or []
+            lead_data = meeting_data.pop("leads", None)
+            question_set_data = meeting_data.pop("question_sets", None)
+
+            # Only expose related rows the user owns, as the separate lookups did
+            if lead_data and str(lead_data.get("user_id")) != str(user_id):
+                lead_data = None
+            if question_set_data and str(question_set_data.get("user_id")) != str(user_id):
+                question_set_data = None
+
+            return MeetingWithParticipants(
+                **meeting_data,
+                participants=participants,
+                lead=lead_data,
+                question_set=question_set_data
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to get scheduled meeting details {meeting_id}: {str(e)}")
+            return None
+
     async def get_user_scheduled_meetings(
         self, user_id: str, status: Optional[MeetingStatus] = None
     ) -> List[ScheduledMeeting]:
@@ -179,9 +256,9 @@ class MeetingSchedulerService:
             if status:
                 query = query.eq("status", status.value)
 
-            response = query.order("scheduled_time", desc=False).execute()
+            response = await run_query(query.order("scheduled_time", desc=False))
 
-            return [ScheduledMeeting(**self._prepare_meeting_data(meeting)) for meeting in response.data]
+            return _MEETING_LIST_ADAPTER.validate_python(response.data)
 
         except Exception as e:
             logger.error(f"Failed to get scheduled meetings for user {user_id}: {str(e)}")
@@ -200,12 +277,11 @@ class MeetingSchedulerService:
 
             update_dict["updated_at"] = datetime.now(timezone.utc).isoformat()
 
-            response = (
+            response = await run_query(
                 supabase.table("scheduled_meetings")
                 .update(update_dict)
                 .eq("id", meeting_id)
                 .eq("user_id", user_id)
-                .execute()
             )
 
             if not response.data:
@@ -232,12 +308,11 @@ class MeetingSchedulerService:
                 "updated_at": datetime.now(timezone.utc).isoformat(),
             }
 
-            response = (
+            response = await run_query(
                 supabase.table("scheduled_meetings")
                 .update(update_data)
                 .eq("id", meeting_id)
                 .eq("user_id", user_id)
-                .execute()
             )
 
             if response.data:
@@ -257,12 +332,11 @@ class MeetingSchedulerService:
                 "updated_at": datetime.now(timezone.utc).isoformat(),
             }
 
-            response = (
+            response = await run_query(
                 supabase.table("scheduled_meetings")
                 .update(update_data)
                 .eq("id", meeting_id)
                 .eq("user_id", user_id)
-                .execute()
             )
 
             if not response.data:
@@ -285,12 +359,11 @@ class MeetingSchedulerService:
                 "updated_at": datetime.now(timezone.utc).isoformat(),
             }
 
-            response = (
+            response = await run_query(
                 supabase.table("scheduled_meetings")
                 .update(update_data)
                 .eq("id", meeting_id)
                 .eq("user_id", user_id)
-                .execute()
             )
 
             if not response.data:
@@ -308,7 +381,7 @@ class MeetingSchedulerService:
     async def get_meetings_by_room_id(self, room_id: str) -> Optional[ScheduledMeeting]:
         """Get meeting by room ID"""
         try:
-            response = supabase.table("scheduled_meetings").select("*").eq("meeting_room_id", room_id).execute()
+            response = await run_query(supabase.table("scheduled_meetings").select("*").eq("meeting_room_id", room_id))
 
             if response.data:
                 meeting_data = self._prepare_meeting_data(response.data[0])
@@ -335,7 +408,7 @@ class MeetingSchedulerService:
             if exclude_meeting_id:
                 query = query.neq("id", exclude_meeting_id)
 
-            response = query.execute()
+            response = await run_query(query)
 
             conflicts = []
             for meeting_data in response.data:
@@ -353,19 +426,14 @@ class MeetingSchedulerService:
             logger.error(f"Failed to check meeting conflicts: {str(e)}")
             return []
 
-    async def _schedule_ai_auto_join(self, meeting: ScheduledMeeting, lead_data: Dict[str, Any]):
+    async def _schedule_ai_auto_join(self, meeting: ScheduledMeeting):
         """Schedule AI to automatically join the meeting"""
         try:
             # Import here to avoid circular imports
             from .ai_meeting_orchestrator import ai_meeting_orchestrator
 
             # Schedule AI to join at the meeting time
-            await ai_meeting_orchestrator.schedule_ai_join(
-                meeting.id,
-                meeting.scheduled_time,
-                meeting.meeting_room_id,
-                lead_data
-            )
+            await ai_meeting_orchestrator.schedule_ai_join(meeting.id, meeting.scheduled_time)
 
             logger.info(f"Scheduled AI auto-join for meeting {meeting.id} at {meeting.scheduled_time}")
 
@@ -380,7 +448,7 @@ class MeetingSchedulerService:
                 "updated_at": datetime.now(timezone.utc).isoformat()
             }
             
-            response = supabase.table("scheduled_meetings").update(update_data).eq("id", meeting_id).execute()
+            response = await run_query(supabase.table("scheduled_meetings").update(update_data).eq("id", meeting_id))
             
             if response.data:
                 logger.info(f"AI joined meeting {meeting_id}")
@@ -396,7 +464,7 @@ class MeetingSchedulerService:
         try:
             now = datetime.now(timezone.utc)
             
-            response = (
+            response = await run_query(
                 supabase.table("scheduled_meetings")
                 .select("*")
                 .eq("user_id", user_id)
@@ -404,15 +472,107 @@ class MeetingSchedulerService:
                 .neq("status", MeetingStatus.CANCELLED.value)
                 .order("scheduled_time", desc=False)
                 .limit(limit)
-                .execute()
             )
             
-            return [ScheduledMeeting(**self._prepare_meeting_data(meeting)) for meeting in response.data]
+            return _MEETING_LIST_ADAPTER.validate_python(response.data)
             
         except Exception as e:
             logger.error(f"Failed to get upcoming meetings for user {user_id}: {str(e)}")
             return []
 
+    async def get_meetings_page(
+        self,
+        user_id: str,
+        offset: int,
+        limit: int,
+        status_filter: Optional[MeetingStatus] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[ScheduledMeeting], int, Optional[str]]:
+        """
+        Get one page of a user's meetings, the total number of matching meetings and
+        a cursor for the following page (None on the last page).
+        Paging and counting happen in the database so only the requested rows are fetched.
+        When a cursor is given the page starts right after it and offset is ignored.
+        The first page counts exactly; later pages reuse that total for a short while
+        and otherwise fall back to the planner's row estimate.
+        Raises ValueError for a malformed cursor.
+        """
+        position = decode_keyset_cursor(cursor, "scheduled_time", "id") if cursor else None
+        date_range = bool(start_date and end_date)
+
+        def apply_filters(query):
+            if date_range:
+                query = query.gte("scheduled_time", start_date.isoformat()).lte("scheduled_time", end_date.isoformat())
+            if status_filter:
+                query = query.eq("status", status_filter.value)
+            return query
+
+        try:
+            count_key = (
+                user_id,
+                status_filter.value if status_filter else None,
+                start_date.isoformat() if date_range else None,
+                end_date.isoformat() if date_range else None,
+            )
+            first_page = not position and offset == 0
+            total_count = None if first_page else self._get_cached_count(count_key)
+
+            # The keyset filter would also narrow a count, so cursor pages count separately
+            count_mode = None
+            count_query = None
+            if first_page:
+                count_mode = "exact"
+            elif total_count is None and not position:
+                count_mode = "planned"
+            elif total_count is None:
+                count_query = apply_filters(
+                    supabase.table("scheduled_meetings").select("id", count="planned").eq("user_id", user_id)
+                ).limit(1)
+
+            query = apply_filters(
+                supabase.table("scheduled_meetings").select("*", count=count_mode).eq("user_id", user_id)
+            )
+
+            # Date-range listings read chronologically; the default listing shows newest first
+            descending = not date_range
+            query = query.order("scheduled_time", desc=descending).order("id", desc=descending)
+
+            # Fetch one extra row to know whether another page exists
+            if position:
+                op = "lt" if descending else "gt"
+                ts, last_id = position["scheduled_time"], position["id"]
+                query = query.or_(
+                    f'scheduled_time.{op}."{ts}",and(scheduled_time.eq."{ts}",id.{op}.{last_id})'
+                ).limit(limit + 1)
+            else:
+                query = query.range(offset, offset + limit)
+
+            if count_query is not None:
+                response, count_response = await asyncio.gather(run_query(query), run_query(count_query))
+                total_count = count_response.count
+            else:
+                response = await run_query(query)
+
+            rows = response.data[:limit]
+            meetings = _MEETING_LIST_ADAPTER.validate_python(rows)
+            if total_count is None:
+                total_count = response.count if response.count is not None else len(meetings)
+            if first_page and response.count is not None:
+                self._cache_count(count_key, response.count)
+
+            next_cursor = None
+            if len(response.data) > limit:
+                last_row = rows[-1]
+                next_cursor = encode_cursor({"scheduled_time": last_row["scheduled_time"], "id": last_row["id"]})
+
+            return meetings, total_count, next_cursor
+
+        except Exception as e:
+            logger.error(f"Failed to get meetings page for user {user_id}: {str(e)}")
+            return [], 0, None
+
     async def get_meetings_by_date_range(
         self, 
         user_id: str, 
@@ -433,9 +593,9 @@ class MeetingSchedulerService:
             if status_filter:
                 query = query.eq("status", status_filter.value)
                 
-            response = query.order("scheduled_time", desc=False).execute()
+            response = await run_query(query.order("scheduled_time", desc=False))
             
-            return [ScheduledMeeting(**self._prepare_meeting_data(meeting)) for meeting in response.data]
+            return _MEETING_LIST_ADAPTER.validate_python(response.data)
             
         except Exception as e:
             logger.error(f"Failed to get meetings by date range: {str(e)}")
@@ -4,9 +4,12 @@ Question Service for AI Meeting System
 Handles question set management and dynamic question generation
 """
 
+import hashlib
+import json
 import logging
 from typing import Dict, List, Optional, Any
 from ..core.config import supabase
+from ..utils.ttl_cache import TTLCache
 from .gemini import gemini_service
 
 logger = logging.getLogger(__name__)
@@ -15,7 +18,21 @@ class QuestionService:
     """Service for managing meeting questions and question sets"""
     
     def __init__(self):
-        pass
+        # Question sets change rarely; generated questions are the expensive part (a Gemini call)
+        self._question_set_cache = TTLCache(maxsize=1000, ttl=60)
+        self._set_questions_cache = TTLCache(maxsize=1000, ttl=60)
+        self._generated_questions_cache = TTLCache(maxsize=1000, ttl=600)
+    
+    def invalidate_question_set(self, question_set_id: str, user_id: str):
+        """Drop cached copies of a question set and its questions after it is written"""
+        self._question_set_cache.pop((question_set_id, user_id))
+        self._set_questions_cache.pop(question_set_id)
+    
+    @staticmethod
+    def _lead_fingerprint(lead_data: Dict[str, Any]) -> str:
+        """Digest of the lead fields, so edited leads get freshly generated questions"""
+        payload = json.dumps(lead_data, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
         
     async def generate_questions_for_lead(
         self, 
@@ -31,7 +48,17 @@ class QuestionService:
                     return questions
                     
             # Otherwise, use AI to generate personalized questions
-            return await gemini_service.generate_questions_for_lead(lead_data, question_set_id)
+            cache_key = (lead_data.get("id"), question_set_id, self._lead_fingerprint(lead_data))
+            cached = self._generated_questions_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+            
+            questions = await gemini_service.generate_questions_for_lead(lead_data, question_set_id)
+            
+            # Don't pin the canned fallback in place of a real answer
+            if questions and questions != gemini_service._get_default_questions():
+                self._generated_questions_cache.set(cache_key, list(questions))
+            return questions
             
         except Exception as e:
             logger.error(f"Failed to generate questions for lead: {e}")
@@ -40,10 +67,16 @@ class QuestionService:
     async def _get_questions_from_set(self, question_set_id: str) -> List[str]:
         """Get questions from a specific question set"""
         try:
+            cached = self._set_questions_cache.get(question_set_id)
+            if cached is not None:
+                return list(cached)
+            
             response = supabase.table("questions").select("question_text").eq("question_set_id", question_set_id).order("order_index").execute()
             
             if response.data:
-                return [q["question_text"] for q in response.data]
+                questions = [q["question_text"] for q in response.data]
+                self._set_questions_cache.set(question_set_id, questions)
+                return list(questions)
                 
             return []
             
@@ -68,16 +101,36 @@ class QuestionService:
     async def get_question_set(self, question_set_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific question set"""
         try:
+            cache_key = (question_set_id, user_id)
+            cached = self._question_set_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+            
             response = supabase.table("question_sets").select("*").eq("id", question_set_id).eq("user_id", user_id).execute()
             
             if response.data:
-                return response.data[0]
+                self._question_set_cache.set(cache_key, response.data[0])
+                return dict(response.data[0])
                 
             return None
             
         except Exception as e:
             logger.error(f"Failed to get question set {question_set_id}: {e}")
             return None
+            
+    async def get_questions_by_set(self, question_set_id: str, user_id: str) -> List[Dict[str, Any]]:
+        """Get the full question rows of one of the user's question sets, in order"""
+        try:
+            if not await self.get_question_set(question_set_id, user_id):
+                return []
+            
+            response = supabase.table("questions").select("*").eq("question_set_id", question_set_id).order("order_index").execute()
+            
+            return response.data or []
+            
+        except Exception as e:
+            logger.error(f"Failed to get questions for set {question_set_id}: {e}")
+            return []
 
     async def get_user_question_sets(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all question sets for a user"""
@@ -1,10 +1,15 @@
 import asyncio
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timezone
+from fastapi import status
 from ..core.config import supabase
+from ..core.errors import ServiceError, ServiceNotFoundError, ServiceValidationError
 from ..services.gemini import gemini_service
+from ..services.creatio import sync_meeting_insights_to_creatio
+from ..utils.cursors import encode_cursor, decode_keyset_cursor
+from ..utils.db import run_query
 from ..models.enhanced_schemas import (
     ConversationEventCreate, 
     MeetingAnalysisCreate, 
@@ -20,6 +25,20 @@ class RealTimeAnalysisService:
         self.analysis_cache = {}  # Cache for ongoing analysis
         self.score_adjustments = {}  # Track score changes during conversation
     
+    async def get_transcript_fingerprint(self, meeting_id: str) -> str:
+        """Row count and latest timestamp of a meeting's conversation events (used for ETags)
+        
+        Read from the database so it covers every writer and is the same on all workers.
+        """
+        
+        response = await run_query(
+            supabase.table("conversation_events").select("timestamp", count="exact").eq(
+                "meeting_id", meeting_id
+            ).order("timestamp", desc=True).limit(1)
+        )
+        latest = response.data[0]["timestamp"] if response.data else ""
+        return f"{response.count or 0}:{latest}"
+    
     async def process_conversation_chunk(
         self, 
         meeting_id: str, 
@@ -47,12 +66,12 @@ class RealTimeAnalysisService:
             
             if not event_response.data:
                 logger.error("Failed to save conversation event")
-                return {"error": "Failed to save conversation event"}
+                raise ServiceError(status.HTTP_500_INTERNAL_SERVER_ERROR, "Failed to save conversation event")
             
             # Get meeting and lead context
             context = await self._get_meeting_context(meeting_id)
             if not context:
-                return {"error": "Meeting context not found"}
+                raise ServiceNotFoundError("Meeting context not found")
             
             # Perform real-time analysis for human messages
             if speaker_type == "human" and len(message.strip()) > 10:
@@ -87,13 +106,50 @@ class RealTimeAnalysisService:
                 "processed": True
             }
             
+        except ServiceError:
+            raise
         except Exception as e:
             logger.error(f"Error processing conversation chunk: {str(e)}")
-            return {"error": str(e)}
+            raise
     
     async def generate_meeting_analysis(self, meeting_id: str) -> Dict[str, Any]:
         """Generate comprehensive meeting analysis from all conversation events"""
         
+        analysis, _ = await self._generate_meeting_analysis(meeting_id)
+        return analysis
+    
+    async def finalize_meeting(self, meeting_id: str, user_id: str, sync_to_crm: bool = True) -> Dict[str, Any]:
+        """Generate the meeting analysis, update the lead and optionally sync insights to CRM
+        
+        The meeting context loaded for the analysis is reused for the lead
+        update and CRM sync instead of being fetched again.
+        """
+        
+        analysis, context = await self._generate_meeting_analysis(meeting_id)
+        
+        # Update lead status based on analysis
+        await self.update_lead_status_from_analysis(context["lead_id"], analysis)
+        
+        # Sync to Creatio CRM if requested and lead has external_id
+        lead_external_id = context["lead_data"].get("external_id")
+        if sync_to_crm and lead_external_id:
+            try:
+                synced = await sync_meeting_insights_to_creatio(
+                    user_id=user_id,
+                    meeting_analysis=analysis,
+                    lead_external_id=lead_external_id
+                )
+                analysis["crm_sync_status"] = "success" if synced else "failed"
+            except Exception as e:
+                logger.error(f"Failed to sync to CRM: {str(e)}")
+                analysis["crm_sync_status"] = "failed"
+                analysis["crm_sync_error"] = str(e)
+        
+        return analysis
+    
+    async def _generate_meeting_analysis(self, meeting_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Generate the meeting analysis and return it with the meeting context it was built from"""
+        
         try:
             # Get all conversation events for the meeting
             events_response = supabase.table("conversation_events").select("*").eq(
@@ -101,12 +157,12 @@ class RealTimeAnalysisService:
             ).order("timestamp").execute()
             
             if not events_response.data:
-                return {"error": "No conversation events found"}
+                raise ServiceNotFoundError("No conversation events found")
             
             # Get meeting context
             context = await self._get_meeting_context(meeting_id)
             if not context:
-                return {"error": "Meeting context not found"}
+                raise ServiceNotFoundError("Meeting context not found")
             
             # Format conversation history
             conversation_history = []
@@ -187,11 +243,13 @@ class RealTimeAnalysisService:
             if meeting_id in self.analysis_cache:
                 del self.analysis_cache[meeting_id]
             
-            return comprehensive_analysis
+            return comprehensive_analysis, context
             
+        except ServiceError:
+            raise
         except Exception as e:
             logger.error(f"Error generating meeting analysis: {str(e)}")
-            return {"error": str(e)}
+            raise
     
     async def update_lead_status_from_analysis(self, lead_id: str, analysis: Dict[str, Any]) -> bool:
         """Update lead status based on AI analysis"""
@@ -241,7 +299,7 @@ class RealTimeAnalysisService:
             ).order("timestamp").execute()
             
             if not events_response.data:
-                return {"error": "No conversation found"}
+                raise ServiceNotFoundError("No conversation found")
             
             # Format transcript based on requested format
             if format_type == "json":
@@ -283,19 +341,29 @@ class RealTimeAnalysisService:
                     "message_count": len(events_response.data)
                 }
             
-            return {"error": "Invalid format type"}
+            raise ServiceValidationError("Invalid format type")
             
+        except ServiceError:
+            raise
         except Exception as e:
             logger.error(f"Error getting meeting transcript: {str(e)}")
-            return {"error": str(e)}
+            raise
     
     async def search_conversation_content(
         self, 
         user_id: str, 
         search_query: str, 
-        meeting_id: Optional[str] = None
+        meeting_id: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Search conversation content across meetings"""
+        """Search conversation content across meetings
+        
+        Matches are returned newest first, one page of `limit` events at a time.
+        Pass the returned `next_cursor` back in to fetch the following page.
+        """
         
         try:
             # Build query
@@ -307,15 +375,37 @@ class RealTimeAnalysisService:
             
             if meeting_id:
                 query = query.eq("meeting_id", meeting_id)
+            if date_from:
+                query = query.gte("timestamp", date_from.isoformat())
+            if date_to:
+                query = query.lte("timestamp", date_to.isoformat())
+            
+            # Keyset pagination on (timestamp, id) so deep pages stay cheap
+            if cursor:
+                try:
+                    position = decode_keyset_cursor(cursor, "last_ts", "last_id")
+                except ValueError:
+                    raise ServiceValidationError("Invalid search cursor")
+                last_ts, last_id = position["last_ts"], position["last_id"]
+                query = query.or_(
+                    f'timestamp.lt."{last_ts}",and(timestamp.eq."{last_ts}",id.lt.{last_id})'
+                )
             
-            response = query.limit(50).execute()
+            # Fetch one extra row to know whether another page exists
+            response = query.order("timestamp", desc=True).order("id", desc=True).limit(limit + 1).execute()
             
             if not response.data:
-                return {"results": [], "total": 0}
+                return {"results": [], "total": 0, "query": search_query, "next_cursor": None}
+            
+            events = response.data[:limit]
+            next_cursor = None
+            if len(response.data) > limit:
+                last_event = events[-1]
+                next_cursor = encode_cursor({"last_ts": last_event["timestamp"], "last_id": last_event["id"]})
             
             # Group results by meeting
             results_by_meeting = {}
-            for event in response.data:
+            for event in events:
                 meeting_id = event["meeting_id"]
                 if meeting_id not in results_by_meeting:
                     results_by_meeting[meeting_id] = {
@@ -334,13 +424,16 @@ class RealTimeAnalysisService:
             
             return {
                 "results": list(results_by_meeting.values()),
-                "total": len(response.data),
-                "query": search_query
+                "total": len(events),
+                "query": search_query,
+                "next_cursor": next_cursor
             }
             
+        except ServiceError:
+            raise
         except Exception as e:
             logger.error(f"Error searching conversation content: {str(e)}")
-            return {"error": str(e)}
+            raise
     
     # Helper methods
     
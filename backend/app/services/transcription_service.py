@@ -4,6 +4,7 @@ import logging
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timezone
 from ..core.config import supabase
+from ..core.errors import ServiceError, ServiceNotFoundError, ServiceValidationError
 from ..services.real_time_analysis import real_time_analysis_service
 
 logger = logging.getLogger(__name__)
@@ -14,6 +15,7 @@ class TranscriptionService:
     def __init__(self):
         self.active_sessions = {}  # Track active transcription sessions
         self.transcription_buffer = {}  # Buffer for partial transcriptions
+        self._cleanup_lock = asyncio.Lock()  # Serializes expired-session sweeps
     
     async def start_transcription_session(self, meeting_id: str, user_id: str) -> Dict[str, Any]:
         """Start a new transcription session for a meeting"""
@@ -25,13 +27,13 @@ class TranscriptionService:
             ).eq("user_id", user_id).execute()
             
             if not meeting_response.data:
-                return {"error": "Meeting not found or access denied"}
+                raise ServiceNotFoundError("Meeting not found or access denied")
             
             meeting_data = meeting_response.data[0]
             
             # Check if transcription is enabled for this meeting
             if not meeting_data.get("transcript_enabled", True):
-                return {"error": "Transcription is disabled for this meeting"}
+                raise ServiceValidationError("Transcription is disabled for this meeting")
             
             # Create session
             session_id = f"{meeting_id}_{user_id}_{int(datetime.now().timestamp())}"
@@ -65,9 +67,11 @@ class TranscriptionService:
                 }
             }
             
+        except ServiceError:
+            raise
         except Exception as e:
             logger.error(f"Error starting transcription session: {str(e)}")
-            return {"error": str(e)}
+            raise
     
     async def process_transcription_chunk(
         self, 
@@ -81,7 +85,7 @@ class TranscriptionService:
         
         try:
             if session_id not in self.active_sessions:
-                return {"error": "Invalid or expired session"}
+                raise ServiceNotFoundError("Invalid or expired session")
             
             session = self.active_sessions[session_id]
             buffer = self.transcription_buffer[session_id]
@@ -125,6 +129,7 @@ class TranscriptionService:
                 else:
                     # Clear buffer for short/empty text
                     buffer["partial_text"] = ""
+                    buffer["last_update"] = datetime.now(timezone.utc)
                     return {
                         "session_id": session_id,
                         "processed": False,
@@ -143,27 +148,32 @@ class TranscriptionService:
                     "confidence": confidence
                 }
                 
+        except ServiceError:
+            raise
         except Exception as e:
             logger.error(f"Error processing transcription chunk: {str(e)}")
-            return {"error": str(e)}
+            raise
     
     async def end_transcription_session(self, session_id: str) -> Dict[str, Any]:
         """End a transcription session"""
         
+        if session_id not in self.active_sessions:
+            raise ServiceNotFoundError("Session not found")
+        
         try:
-            if session_id not in self.active_sessions:
-                return {"error": "Session not found"}
-            
             session = self.active_sessions[session_id]
             buffer = self.transcription_buffer[session_id]
             
-            # Process any remaining partial text
+            # Process any remaining partial text; a failed save must not keep the session alive
             if buffer["partial_text"].strip():
-                await self.process_transcription_chunk(
-                    session_id, 
-                    buffer["partial_text"], 
-                    is_final=True
-                )
+                try:
+                    await self.process_transcription_chunk(
+                        session_id, 
+                        buffer["partial_text"], 
+                        is_final=True
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to save final partial text for session {session_id}: {str(e)}")
             
             # Calculate session statistics
             session_duration = datetime.now(timezone.utc) - session["started_at"]
@@ -178,177 +188,20 @@ class TranscriptionService:
                 "ended_at": datetime.now(timezone.utc).isoformat()
             }
             
-            # Clean up
-            del self.active_sessions[session_id]
-            del self.transcription_buffer[session_id]
-            
             logger.info(f"Ended transcription session {session_id} - {session['total_chunks']} chunks processed")
             
             return session_stats
             
         except Exception as e:
             logger.error(f"Error ending transcription session: {str(e)}")
-            return {"error": str(e)}
-    
-    async def get_session_status(self, session_id: str) -> Dict[str, Any]:
-        """Get current status of a transcription session"""
-        
-        if session_id not in self.active_sessions:
-            return {"error": "Session not found"}
-        
-        session = self.active_sessions[session_id]
-        buffer = self.transcription_buffer[session_id]
-        
-        session_duration = datetime.now(timezone.utc) - session["started_at"]
-        
-        return {
-            "session_id": session_id,
-            "meeting_id": session["meeting_id"],
-            "status": session["status"],
-            "duration_seconds": session_duration.total_seconds(),
-            "total_chunks": session["total_chunks"],
-            "current_partial_text": buffer["partial_text"],
-            "last_update": buffer["last_update"].isoformat(),
-            "buffer_size": len(buffer["partial_text"])
-        }
-    
-    async def get_meeting_transcript_live(self, meeting_id: str, user_id: str) -> Dict[str, Any]:
-        """Get live transcript for a meeting"""
-        
-        try:
-            # Verify access
-            meeting_response = supabase.table("scheduled_meetings").select("*").eq(
-                "id", meeting_id
-            ).eq("user_id", user_id).execute()
-            
-            if not meeting_response.data:
-                return {"error": "Meeting not found or access denied"}
-            
-            # Get conversation events
-            events_response = supabase.table("conversation_events").select("*").eq(
-                "meeting_id", meeting_id
-            ).order("timestamp").execute()
-            
-            transcript_entries = []
-            for event in events_response.data:
-                transcript_entries.append({
-                    "timestamp": event["timestamp"],
-                    "speaker": "AI Assistant" if event["speaker_type"] == "ai" else "Participant",
-                    "text": event["message_text"],
-                    "confidence": event.get("confidence_score"),
-                    "duration_ms": event.get("audio_duration_ms")
-                })
-            
-            # Add any active session partial text
-            active_session = None
-            for session_id, session in self.active_sessions.items():
-                if session["meeting_id"] == meeting_id and session["user_id"] == user_id:
-                    active_session = session_id
-                    break
-            
-            partial_text = ""
-            if active_session and active_session in self.transcription_buffer:
-                partial_text = self.transcription_buffer[active_session]["partial_text"]
-            
-            return {
-                "meeting_id": meeting_id,
-                "transcript": transcript_entries,
-                "total_entries": len(transcript_entries),
-                "active_session": active_session,
-                "partial_text": partial_text,
-                "last_updated": datetime.now(timezone.utc).isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"Error getting live transcript: {str(e)}")
-            return {"error": str(e)}
-    
-    async def search_transcripts(
-        self, 
-        user_id: str, 
-        search_query: str, 
-        meeting_id: Optional[str] = None,
-        date_from: Optional[datetime] = None,
-        date_to: Optional[datetime] = None
-    ) -> Dict[str, Any]:
-        """Search across meeting transcripts"""
-        
-        try:
-            # Use the real-time analysis service search functionality
-            search_results = await real_time_analysis_service.search_conversation_content(
-                user_id=user_id,
-                search_query=search_query,
-                meeting_id=meeting_id
-            )
-            
-            # Filter by date if provided
-            if date_from or date_to:
-                filtered_results = []
-                for result in search_results.get("results", []):
-                    for match in result["matches"]:
-                        match_date = datetime.fromisoformat(match["timestamp"].replace("Z", "+00:00"))
-                        
-                        if date_from and match_date < date_from:
-                            continue
-                        if date_to and match_date > date_to:
-                            continue
-                        
-                        filtered_results.append({
-                            **result,
-                            "matches": [match]
-                        })
-                
-                search_results["results"] = filtered_results
-                search_results["total"] = len(filtered_results)
-            
-            return search_results
-            
-        except Exception as e:
-            logger.error(f"Error searching transcripts: {str(e)}")
-            return {"error": str(e)}
-    
-    async def export_transcript(
-        self, 
-        meeting_id: str, 
-        user_id: str, 
-        format_type: str = "text"
-    ) -> Dict[str, Any]:
-        """Export meeting transcript in various formats"""
-        
-        try:
-            # Use real-time analysis service to get transcript
-            transcript_result = await real_time_analysis_service.get_meeting_transcript(
-                meeting_id=meeting_id,
-                format_type=format_type
-            )
-            
-            if "error" in transcript_result:
-                return transcript_result
-            
-            # Add metadata
-            meeting_response = supabase.table("scheduled_meetings").select(
-                "*, leads(name, company)"
-            ).eq("id", meeting_id).eq("user_id", user_id).execute()
-            
-            if meeting_response.data:
-                meeting_data = meeting_response.data[0]
-                transcript_result["metadata"] = {
-                    "meeting_id": meeting_id,
-                    "lead_name": meeting_data["leads"]["name"],
-                    "company": meeting_data["leads"]["company"],
-                    "scheduled_time": meeting_data["scheduled_time"],
-                    "exported_at": datetime.now(timezone.utc).isoformat(),
-                    "exported_by": user_id
-                }
-            
-            return transcript_result
-            
-        except Exception as e:
-            logger.error(f"Error exporting transcript: {str(e)}")
-            return {"error": str(e)}
+            raise
+        finally:
+            # Clean up
+            self.active_sessions.pop(session_id, None)
+            self.transcription_buffer.pop(session_id, None)
     
-    async def cleanup_expired_sessions(self, max_age_hours: int = 24) -> int:
-        """Clean up expired transcription sessions"""
+    async def _sweep_expired_sessions(self, max_age_hours: int) -> int:
+        """Scan active sessions and end the ones older than max_age_hours"""
         
         try:
             current_time = datetime.now(timezone.utc)
@@ -361,7 +214,10 @@ class TranscriptionService:
             
             # Clean up expired sessions
             for session_id in expired_sessions:
-                await self.end_transcription_session(session_id)
+                try:
+                    await self.end_transcription_session(session_id)
+                except Exception as e:
+                    logger.error(f"Error ending expired session {session_id}: {str(e)}")
             
             logger.info(f"Cleaned up {len(expired_sessions)} expired transcription sessions")
             return len(expired_sessions)
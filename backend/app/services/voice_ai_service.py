@@ -9,11 +9,17 @@ import os
 import asyncio
 import aiohttp
 import base64
-from typing import Optional, Dict, Any, List
+import hashlib
+from typing import Optional, Dict, Any, List, AsyncIterator, Iterable
 from io import BytesIO
+from ..utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Synthesized clips are reused for repeated phrases (greetings, prompts) with the same voice
+TTS_CACHE_MAX_ENTRIES = 256
+TTS_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
 class VoiceAIService:
     """Service for voice AI capabilities using Camb.ai"""
     
@@ -21,12 +27,29 @@ class VoiceAIService:
         self.camb_api_key = os.getenv("CAMB_TTS_API_KEY", "22f5d085-3559-4de1-9d02-fdfa6169485b")
         self.camb_base_url = "https://api.camb.ai/v1"
         self.voice_enabled = bool(self.camb_api_key)
+        self._tts_cache = TTLCache(maxsize=TTS_CACHE_MAX_ENTRIES, ttl=TTS_CACHE_TTL_SECONDS)
         
         if self.voice_enabled:
             logger.info("Voice AI enabled with Camb.ai TTS")
         else:
             logger.warning("Voice AI disabled - no Camb.ai API key")
     
+    @staticmethod
+    def tts_cache_key(text: str, voice_id: str, speed: float) -> str:
+        """Cache key for a synthesized clip"""
+        return hashlib.blake2b(f"{voice_id}|{speed}|{text}".encode(), digest_size=16).hexdigest()
+    
+    def has_cached_speech(self, cache_key: str) -> bool:
+        """Whether real Camb.ai audio (not the mock fallback) is cached under this key"""
+        return self._tts_cache.get(cache_key) is not None
+    
+    async def warm_tts_cache(self, texts: Iterable[str], voice_id: str = "en-US-AriaNeural", speed: float = 1.0):
+        """Synthesize fixed phrases ahead of time so their first use is served from cache"""
+        if not self.voice_enabled:
+            return
+        await asyncio.gather(*(self.text_to_speech(text, voice_id=voice_id, speed=speed) for text in texts))
+        logger.info("TTS cache warmed")
+    
     async def text_to_speech(
         self, 
         text: str, 
@@ -38,6 +61,11 @@ class VoiceAIService:
         if not self.voice_enabled:
             logger.warning("Voice AI not enabled")
             return None
+        
+        cache_key = self.tts_cache_key(text, voice_id, speed)
+        cached_audio = self._tts_cache.get(cache_key)
+        if cached_audio is not None:
+            return cached_audio
             
         try:
             # Prepare request payload for Camb.ai
@@ -73,6 +101,7 @@ class VoiceAIService:
                                 audio_base64 = response_data["audio"]
                                 audio_bytes = base64.b64decode(audio_base64)
                                 logger.info(f"Generated speech for text: '{text[:50]}...' ({len(audio_bytes)} bytes)")
+                                self._tts_cache.set(cache_key, audio_bytes)
                                 return audio_bytes
                             else:
                                 logger.error("No audio data in Camb.ai response")
@@ -81,6 +110,7 @@ class VoiceAIService:
                             # Direct binary audio response
                             audio_bytes = await response.read()
                             logger.info(f"Generated speech for text: '{text[:50]}...' ({len(audio_bytes)} bytes)")
+                            self._tts_cache.set(cache_key, audio_bytes)
                             return audio_bytes
                     else:
                         error_text = await response.text()
@@ -96,6 +126,83 @@ class VoiceAIService:
             # Try fallback TTS
             return await self._fallback_tts(text)
     
+    async def text_to_speech_stream(
+        self,
+        text: str,
+        voice_id: str = "en-US-AriaNeural",
+        speed: float = 1.0,
+        chunk_size: int = 16384
+    ) -> AsyncIterator[bytes]:
+        """Convert text to speech, yielding MP3 bytes as Camb.ai sends them"""
+        if not self.voice_enabled:
+            logger.warning("Voice AI not enabled")
+            return
+        
+        cache_key = self.tts_cache_key(text, voice_id, speed)
+        cached_audio = self._tts_cache.get(cache_key)
+        if cached_audio is not None:
+            yield cached_audio
+            return
+        
+        payload = {
+            "text": text,
+            "voice_id": voice_id,
+            "speed": speed,
+            "output_format": "mp3"
+        }
+        
+        headers = {
+            "Authorization": f"Bearer {self.camb_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        sent_bytes = 0
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(
+                    f"{self.camb_base_url}/tts",
+                    json=payload,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=30)
+                ) as response:
+                    
+                    if response.status != 200:
+                        error_text = await response.text()
+                        logger.error(f"Camb.ai TTS API error {response.status}: {error_text}")
+                    elif 'application/json' in response.headers.get('content-type', ''):
+                        # JSON responses carry the whole clip base64-encoded, so there is nothing to stream
+                        response_data = await response.json()
+                        if "audio" in response_data:
+                            audio_bytes = base64.b64decode(response_data["audio"])
+                            sent_bytes = len(audio_bytes)
+                            self._tts_cache.set(cache_key, audio_bytes)
+                            yield audio_bytes
+                        else:
+                            logger.error("No audio data in Camb.ai response")
+                            return
+                    else:
+                        chunks = []
+                        async for chunk in response.content.iter_chunked(chunk_size):
+                            sent_bytes += len(chunk)
+                            chunks.append(chunk)
+                            yield chunk
+                        self._tts_cache.set(cache_key, b"".join(chunks))
+            
+        except asyncio.TimeoutError:
+            logger.error("Camb.ai TTS API timeout")
+            return
+        except Exception as e:
+            logger.error(f"Camb.ai TTS error: {e}")
+        
+        if sent_bytes:
+            logger.info(f"Streamed speech for text: '{text[:50]}...' ({sent_bytes} bytes)")
+            return
+        
+        # Nothing was sent yet, so the mock clip can still stand in for the real one
+        fallback_audio = await self._fallback_tts(text)
+        if fallback_audio:
+            yield fallback_audio
+    
     async def _fallback_tts(self, text: str) -> Optional[bytes]:
         """Fallback TTS using system TTS or mock audio"""
         try:
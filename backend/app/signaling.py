@@ -3,6 +3,7 @@ from typing import Dict, Set, Optional, List
 import json
 import logging
 import asyncio
+import binascii
 import uuid
 from datetime import datetime, timedelta
 from .core.config import supabase
@@ -13,7 +14,7 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class Participant:
-    def __init__(self, user_id: str, websocket: WebSocket, participant_type: ParticipantType = ParticipantType.HUMAN, is_organizer: bool = False):
+    def __init__(self, user_id: str, websocket: WebSocket, participant_type: ParticipantType = ParticipantType.HUMAN, is_organizer: bool = False, binary_audio: bool = False):
         self.user_id = user_id
         self.websocket = websocket
         self.participant_type = participant_type
@@ -22,6 +23,7 @@ class Participant:
         self.audio_enabled = True
         self.voice_activity = False
         self.last_activity = datetime.now()
+        self.binary_audio = binary_audio  # client asked for AI audio as binary frames instead of base64
         
     def to_dict(self) -> dict:
         return {
@@ -102,6 +104,7 @@ class EnhancedSessionManager:
         self.meeting_rooms: Dict[str, MeetingRoom] = {}
         self.participant_to_room: Dict[str, str] = {}  # user_id -> room_id mapping
         self.ai_auto_join_tasks: Dict[str, asyncio.Task] = {}
+        self.human_join_waiters: Dict[str, List[asyncio.Future]] = {}  # room_id -> pending waits
         
     async def create_meeting_room(self, room_id: str, max_participants: int = 10) -> MeetingRoom:
         """Create a new meeting room"""
@@ -112,14 +115,14 @@ class EnhancedSessionManager:
         
     async def join_meeting_room(self, room_id: str, user_id: str, websocket: WebSocket, 
                                participant_type: ParticipantType = ParticipantType.HUMAN, 
-                               is_organizer: bool = False) -> bool:
+                               is_organizer: bool = False, binary_audio: bool = False) -> bool:
         """Join a participant to a meeting room"""
         # Create room if it doesn't exist
         if room_id not in self.meeting_rooms:
             await self.create_meeting_room(room_id)
             
         room = self.meeting_rooms[room_id]
-        participant = Participant(user_id, websocket, participant_type, is_organizer)
+        participant = Participant(user_id, websocket, participant_type, is_organizer, binary_audio)
         
         if room.add_participant(participant):
             self.participant_to_room[user_id] = room_id
@@ -127,6 +130,8 @@ class EnhancedSessionManager:
             # Store AI participant reference
             if participant_type == ParticipantType.AI:
                 room.ai_participant = participant
+            else:
+                self._notify_human_joined(room_id)
                 
             # Save to database
             await self._save_participant_to_db(room_id, participant)
@@ -143,6 +148,32 @@ class EnhancedSessionManager:
             return True
         return False
         
+    async def wait_for_human_participant(self, room_id: str, timeout: float) -> bool:
+        """Wait until a human is in the room; False if the timeout passes first"""
+        room = self.meeting_rooms.get(room_id)
+        if room and room.has_human_participants():
+            return True
+            
+        waiter = asyncio.get_running_loop().create_future()
+        self.human_join_waiters.setdefault(room_id, []).append(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            waiters = self.human_join_waiters.get(room_id)
+            if waiters is not None:
+                if waiter in waiters:
+                    waiters.remove(waiter)
+                if not waiters:
+                    del self.human_join_waiters[room_id]
+                    
+    def _notify_human_joined(self, room_id: str):
+        """Wake everything waiting for a human to join this room"""
+        for waiter in self.human_join_waiters.get(room_id, []):
+            if not waiter.done():
+                waiter.set_result(True)
+        
     async def leave_meeting_room(self, user_id: str) -> bool:
         """Remove a participant from their meeting room"""
         if user_id not in self.participant_to_room:
@@ -192,6 +223,46 @@ class EnhancedSessionManager:
         """Broadcast a message to all participants in a room"""
         await self._broadcast_to_room(room_id, message, exclude_user=sender_user_id)
         
+    async def broadcast_audio_to_room(self, room_id: str, message: dict, audio: bytes,
+                                      encoded_audio: Optional[str] = None,
+                                      sender_user_id: Optional[str] = None) -> Optional[str]:
+        """Broadcast an audio message: a JSON frame followed by a binary frame for clients that
+        opted into binary audio, or the JSON with base64 audio_data for everyone else.
+        Returns the base64 string if one was needed, so callers can reuse it."""
+        room = self.meeting_rooms.get(room_id)
+        if not room:
+            return encoded_audio
+            
+        message["timestamp"] = datetime.now().isoformat()
+        binary_header = None
+        text_payload = None
+        disconnected_participants = []
+        
+        for participant in room.participants.values():
+            if sender_user_id and participant.user_id == sender_user_id:
+                continue
+                
+            try:
+                if participant.binary_audio:
+                    if binary_header is None:
+                        binary_header = json.dumps({**message, "binary": True, "audio_bytes": len(audio)})
+                    await participant.websocket.send_text(binary_header)
+                    await participant.websocket.send_bytes(audio)
+                else:
+                    if text_payload is None:
+                        if encoded_audio is None:
+                            encoded_audio = binascii.b2a_base64(audio, newline=False).decode('ascii')
+                        text_payload = json.dumps({**message, "audio_data": encoded_audio})
+                    await participant.websocket.send_text(text_payload)
+            except Exception as e:
+                logger.error(f"Failed to send audio to {participant.user_id}: {e}")
+                disconnected_participants.append(participant.user_id)
+                
+        for user_id in disconnected_participants:
+            await self.leave_meeting_room(user_id)
+            
+        return encoded_audio
+        
     async def get_room_participants(self, room_id: str) -> List[dict]:
         """Get list of participants in a room"""
         room = self.meeting_rooms.get(room_id)
@@ -213,6 +284,7 @@ class EnhancedSessionManager:
             return
             
         message["timestamp"] = datetime.now().isoformat()
+        payload = json.dumps(message)
         disconnected_participants = []
         
         for participant in room.participants.values():
@@ -220,7 +292,7 @@ class EnhancedSessionManager:
                 continue
                 
             try:
-                await participant.websocket.send_text(json.dumps(message))
+                await participant.websocket.send_text(payload)
             except Exception as e:
                 logger.error(f"Failed to send message to {participant.user_id}: {e}")
                 disconnected_participants.append(participant.user_id)
@@ -328,7 +400,7 @@ async def _save_conversation_message(room_id: str, user_id: str, message: dict):
 # Global enhanced session manager
 enhanced_manager = EnhancedSessionManager()
 
-async def websocket_endpoint(websocket: WebSocket, room_id: str, user_id: str = None, participant_type: str = "human"):
+async def websocket_endpoint(websocket: WebSocket, room_id: str, user_id: str = None, participant_type: str = "human", binary_audio: bool = False):
     """Enhanced WebSocket endpoint for multi-user meeting rooms"""
     logger.info(f"WebSocket connection attempt for room {room_id}, user {user_id}")
     
@@ -347,7 +419,7 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str, user_id: str =
         logger.info(f"WebSocket accepted for room {room_id}, user {user_id}")
         
         # Join the meeting room
-        success = await enhanced_manager.join_meeting_room(room_id, user_id, websocket, p_type)
+        success = await enhanced_manager.join_meeting_room(room_id, user_id, websocket, p_type, binary_audio=binary_audio)
         if not success:
             await websocket.close(code=1000, reason="Room is full")
             return
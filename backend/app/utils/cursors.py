@@ -0,0 +1,41 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor string"""
+    payload = json.dumps(position, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, *keys: str) -> Dict[str, str]:
+    """
+    Decode a cursor produced by encode_cursor and return the requested keys as strings.
+    Raises ValueError if the cursor is malformed or missing a key.
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return {key: str(position[key]) for key in keys}
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def decode_keyset_cursor(cursor: str, timestamp_key: str, id_key: str) -> Dict[str, str]:
+    """
+    Decode a (timestamp, id) keyset cursor, checking that the timestamp is ISO 8601 and the
+    id a canonical UUID, since both values are interpolated into PostgREST filter strings.
+    Raises ValueError if the cursor is malformed or either value fails the check.
+    """
+    position = decode_cursor(cursor, timestamp_key, id_key)
+    try:
+        datetime.fromisoformat(position[timestamp_key])
+        canonical_id = str(uuid.UUID(position[id_key])) == position[id_key].lower()
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not canonical_id:
+        raise ValueError("Invalid cursor")
+    return position
@@ -0,0 +1,11 @@
+import asyncio
+from typing import Any
+
+
+async def run_query(query: Any) -> Any:
+    """
+    Execute a supabase-py query builder in a worker thread.
+    The Supabase client is synchronous, so calling execute() directly from a
+    request handler blocks the event loop for the whole database round-trip.
+    """
+    return await asyncio.to_thread(query.execute)
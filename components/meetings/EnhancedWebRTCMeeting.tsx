@@ -503,6 +503,12 @@ const joinMeetingRoom = async () => {
           timestamp: new Date().toISOString(),
         })
         break
+      case 'ai_voice_chunk':
+        // later audio segments of the current ai_voice_message; play after the ones already queued
+        if (typeof message.audio_data === 'string' && message.audio_data.length > 0) {
+          enqueueAiAudio(message.audio_data, message.audio_format || 'mp3')
+        }
+        break
     }
   }
 
@@ -0,0 +1,5 @@
+-- Keyset pagination index for scheduled meeting listings
+-- Supports cursor queries of the form (scheduled_time, id) < (cursor_ts, cursor_id) per user
+
+CREATE INDEX IF NOT EXISTS idx_scheduled_meetings_user_time_id
+    ON scheduled_meetings(user_id, scheduled_time DESC, id DESC);
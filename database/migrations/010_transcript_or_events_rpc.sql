@@ -0,0 +1,34 @@
+-- Transcript lookup for a scheduled meeting in a single round-trip
+-- Returns the latest analysis transcript, falling back to the raw conversation events
+-- when no analysis has been stored yet, or NULL when neither exists
+
+CREATE OR REPLACE FUNCTION get_transcript_or_events(p_meeting UUID)
+RETURNS JSON AS $$
+    SELECT COALESCE(
+        (
+            SELECT json_build_object(
+                'transcript', a.transcript,
+                'analysis_data', a.analysis_data
+            )
+            FROM meeting_analyses a
+            WHERE a.meeting_id = p_meeting
+            ORDER BY a.created_at DESC
+            LIMIT 1
+        ),
+        (
+            SELECT json_build_object(
+                'events', json_agg(
+                    json_build_object(
+                        'speaker_type', e.speaker_type,
+                        'message_text', e.message_text,
+                        'timestamp', e.timestamp
+                    )
+                    ORDER BY e.timestamp
+                )
+            )
+            FROM conversation_events e
+            WHERE e.meeting_id = p_meeting
+            HAVING COUNT(*) > 0
+        )
+    );
+$$ LANGUAGE sql STABLE;
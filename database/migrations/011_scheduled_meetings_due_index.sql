@@ -0,0 +1,6 @@
+-- Index for the AI join scheduler
+-- Supports "next scheduled meeting the AI has not joined yet" ordered by scheduled_time
+
+CREATE INDEX IF NOT EXISTS idx_scheduled_meetings_due
+    ON scheduled_meetings(scheduled_time)
+    WHERE status = 'scheduled' AND ai_joined_at IS NULL;
@@ -12,7 +12,8 @@ export interface EnhancedSignalingMessage extends Omit<SignalingMessage, 'type'>
         "room_joined" | "participant_joined" | "participant_left" | 
         "voice_activity" | "conversation_message" | "ai_joined" | 
         "ai_message" | "meeting_completed" | "ai_auto_join_scheduled" |
-        "ai_voice_message" | "ai_speaking_finished";
+        "ai_voice_message" | "ai_voice_chunk" | "ai_voice_stream_end" |
+        "ai_speaking_finished";
   
   // Enhanced fields
   room_id?: string;
@@ -21,6 +22,7 @@ export interface EnhancedSignalingMessage extends Omit<SignalingMessage, 'type'>
   is_active?: boolean;
   message?: string;
   audio_data?: string; // Base64 encoded audio data for AI voice messages
+  chunk_count?: number; // Number of audio segments sent for an AI utterance (ai_voice_stream_end)
   audio_duration?: number;
   confidence?: number;
   conversation_state?: string;